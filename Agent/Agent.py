@@ -3,41 +3,119 @@ import os
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from .utils import DatabaseManager, ContentAnalyzer, RecommendationEngine
+from .records import Character, StoryboardChapter
 from .config import AgentConfig
+from .incremental import AnalysisStore, IncrementalAnalysis
+from .analysis_cache import AnalysisCache
+from .conflicts import ConflictIndex
+from .manuscripts import content_hash
 
 class NovelAnalysisAgent:
     """
     소설 파일 추가 시 AI 분석을 수행하는 에이전트
     """
+
+    # 분석/충돌/추천 로직이 바뀌면 올려서 이전에 캐시된 결과를 쓰지 않게 함
+    ANALYSIS_VERSION = 1
     
     def __init__(self, database_path: str = "Database"):
         self.database_path = Path(database_path)
-        self.db_manager = DatabaseManager(database_path)
-        self.analyzer = ContentAnalyzer()
-        self.recommendation_engine = RecommendationEngine()
         self.config = AgentConfig()
+        self.db_manager = DatabaseManager.from_config(database_path, self.config)
+        self.analyzer = ContentAnalyzer(
+            self.config.get_analysis_setting("custom_keywords"),
+            self.config.get_analysis_setting("min_character_mentions", 2),
+            self.config.get_analysis_setting("context_window_size", 50),
+            self._analysis_limits()
+        )
+        self.recommendation_engine = RecommendationEngine()
+        self.analysis_store = AnalysisStore(database_path, "rule")
+        self.result_cache = AnalysisCache(
+            database_path,
+            self.config.get_analysis_setting("result_cache_max_entries", 128),
+            self.config.get_analysis_setting("result_cache_max_bytes", 64 * 1024 * 1024)
+        )
+        # 소설별 충돌 확인 색인 {소설 이름: (DB 상태 지문, ConflictIndex)}
+        self._conflict_indexes: Dict[str, tuple] = {}
     
-    def analyze_new_file(self, novel_name: str, file_name: str, file_content: str) -> Dict[str, Any]:
+    def _analysis_limits(self) -> Optional[Dict[str, int]]:
+        """budgeted_analysis 설정이 켜져 있으면 카테고리별 최대 개수"""
+        if not self.config.get_analysis_setting("budgeted_analysis", True):
+            return None
+        return {
+            "characters": self.config.get_analysis_setting("max_characters_per_analysis"),
+            "world_elements": self.config.get_analysis_setting("max_world_elements_per_analysis"),
+            "events": self.config.get_analysis_setting("max_events_per_analysis"),
+        }
+
+    def _result_cache_key(self, novel_name: str, file_content: str) -> str:
+        """분석 결과 캐시 키: 원고 내용, 소설 DB 상태, 분석 버전과 설정"""
+        return AnalysisCache.make_key(
+            analyzer="rule",
+            version=self.ANALYSIS_VERSION,
+            novel=novel_name,
+            content=content_hash(file_content),
+            database=self.db_manager.state_fingerprint(novel_name),
+            analysis_settings=self.config.analysis_settings,
+            conflict_detection=self.config.conflict_detection
+        )
+
+    def analyze_new_file(self, novel_name: str, file_name: str, file_content: str,
+                         force_refresh: bool = False) -> Dict[str, Any]:
         """
         새로 추가된 파일을 분석하고 결과를 반환
+
+        result_cache 설정이 켜져 있으면 원고 내용과 소설 DB가 그대로일 때 저장된 결과를 반환함 (cached=True)
+        incremental_analysis 설정이 켜져 있으면 같은 파일의 이전 분석과 문단 단위로 비교해 바뀐 구간만 다시 분석하고,
+        충돌 확인과 추천은 다시 분석한 부분(delta_analysis)에 대해서만 수행함
+        원고가 그대로이고 DB만 바뀌었으면 이전 내용 분석을 그대로 쓰고 충돌 확인과 추천만 전체에 대해 다시 함 (unchanged=True)
+        소설 DB의 기존 인물 이름은 인물 후보를 거를 때 항상 남김
         
         Args:
             novel_name: 소설 이름
             file_name: 파일 이름
             file_content: 파일 내용
+            force_refresh: True면 캐시와 이전 분석 상태를 쓰지 않고 전체를 다시 분석
             
         Returns:
             분석 결과 딕셔너리
         """
         try:
-            # 1. 파일 내용 분석
-            content_analysis = self.analyzer.analyze_content(file_content)
+            use_cache = self.config.get_analysis_setting("result_cache", True)
+            if use_cache:
+                cache_key = self._result_cache_key(novel_name, file_content)
+                if not force_refresh:
+                    cached = self.result_cache.get(cache_key)
+                    if cached is not None:
+                        return dict(cached, file_name=file_name, cached=True)
+
+            # 분석 이후 DB가 수정되었는지 extract_recommendations에서 확인하기 위한 위치
+            revision_marker = self.db_manager.revision_marker(novel_name)
+
+            # 1. 파일 내용 분석 (이전 분석이 있으면 바뀐 구간만)
+            known_names = self.db_manager.entity_names(novel_name, 'characters')
+            incremental_run = None
+            if self.config.get_analysis_setting("incremental_analysis", True):
+                # 구간은 최소 등장 횟수와 최대 개수 없이 분석하고 합친 결과에 적용함
+                incremental = IncrementalAnalysis(
+                    self.analysis_store,
+                    lambda text: self._analyze_content(text, known_names, min_mentions=1, limited=False),
+                    lambda parts: self.analyzer.merge_results(((start, analysis) for start, _, analysis in parts),
+                                                              known_names, self.analyzer.min_mentions, limited=True),
+                    self.config.get_analysis_setting("incremental_segment_size", 8000)
+                )
+                incremental_run = incremental.run(novel_name, file_name, file_content, reuse=not force_refresh)
+                content_analysis = incremental_run["content_analysis"]
+                # 원고가 그대로면 DB가 바뀐 것이므로 전체 내용으로 충돌과 추천을 다시 확인
+                delta_analysis = incremental_run["delta_analysis"] or content_analysis
+            else:
+                content_analysis = delta_analysis = self._analyze_content(file_content, known_names)
             
             # 2. 기존 데이터베이스와 충돌 확인
-            conflicts = self._check_conflicts(novel_name, content_analysis)
+            conflicts = self._check_conflicts(novel_name, delta_analysis)
             
             # 3. 추천 옵션 생성
-            recommendations = self._generate_recommendations(novel_name, content_analysis)
+            recommendations = self._generate_recommendations(novel_name, delta_analysis)
             
             # 4. 분석 결과 종합
             analysis_result = {
@@ -46,8 +124,17 @@ class NovelAnalysisAgent:
                 "content_analysis": content_analysis,
                 "conflicts": conflicts,
                 "recommendations": recommendations,
-                "summary": self._generate_summary(content_analysis, conflicts, recommendations)
+                "summary": self._generate_summary(content_analysis, conflicts, recommendations),
+                "revision_marker": revision_marker
             }
+            if incremental_run is not None:
+                analysis_result["delta_analysis"] = delta_analysis
+                analysis_result["incremental"] = dict(incremental_run["stats"], removed=incremental_run["removed"])
+                if incremental_run["unchanged"]:
+                    analysis_result["unchanged"] = True
+                incremental.save_result(novel_name, file_name, incremental_run, analysis_result)
+            if use_cache:
+                self.result_cache.put(cache_key, analysis_result)
             
             return analysis_result
             
@@ -58,6 +145,28 @@ class NovelAnalysisAgent:
                 "novel_name": novel_name
             }
     
+    def _analyze_content(self, file_content: str, known_names: Optional[List[str]] = None,
+                         min_mentions: Optional[int] = None, limited: bool = True) -> Dict[str, Any]:
+        """
+        원고 내용 분석 (parallel_analysis 설정이 켜져 있고 원고가 길면 여러 프로세스로 나눠 분석)
+
+        Args:
+            known_names: 소설 DB의 기존 인물 이름
+            min_mentions: 인물 후보 최소 등장 횟수 (None이면 분석기 설정)
+            limited: False면 카테고리별 최대 개수를 적용하지 않음
+        """
+        if (self.config.get_analysis_setting("parallel_analysis", False)
+                and len(file_content) >= self.config.get_analysis_setting("parallel_min_length", 262144)):
+            return self.analyzer.analyze_parallel(
+                file_content,
+                max_workers=self.config.get_analysis_setting("parallel_workers"),
+                shard_size=self.config.get_analysis_setting("parallel_shard_size", 65536),
+                known_names=known_names,
+                min_mentions=min_mentions,
+                limited=limited
+            )
+        return self.analyzer.analyze_content(file_content, known_names, min_mentions, limited)
+
     def _check_conflicts(self, novel_name: str, content_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """
         기존 데이터베이스와의 충돌을 확인
@@ -74,47 +183,52 @@ class NovelAnalysisAgent:
             "world_setting_conflicts": [],
             "timeline_conflicts": []
         }
+        index = self._conflict_index(novel_name)
         
         # 인물 충돌 확인
-        existing_characters = self.db_manager.get_characters(novel_name)
-        new_characters = content_analysis.get("characters", [])
-        
-        for new_char in new_characters:
-            for existing_char in existing_characters:
-                if self._is_character_conflict(new_char, existing_char):
-                    conflicts["character_conflicts"].append({
-                        "new_character": new_char,
-                        "existing_character": existing_char,
-                        "conflict_type": "character_overlap"
-                    })
+        for new_char in content_analysis.get("characters", []):
+            for existing_char in index.character_conflicts(new_char):
+                conflicts["character_conflicts"].append({
+                    "new_character": new_char,
+                    "existing_character": existing_char.to_dict(),
+                    "conflict_type": "character_overlap"
+                })
         
         # 세계관 설정 충돌 확인
-        existing_world_settings = self.db_manager.get_world_settings(novel_name)
-        new_world_elements = content_analysis.get("world_elements", [])
-        
-        for new_element in new_world_elements:
-            for existing_element in existing_world_settings:
-                if self._is_world_setting_conflict(new_element, existing_element):
-                    conflicts["world_setting_conflicts"].append({
-                        "new_element": new_element,
-                        "existing_element": existing_element,
-                        "conflict_type": "world_setting_conflict"
-                    })
+        for new_element in content_analysis.get("world_elements", []):
+            for existing_element in index.world_conflicts(new_element):
+                conflicts["world_setting_conflicts"].append({
+                    "new_element": new_element,
+                    "existing_element": existing_element.to_dict(),
+                    "conflict_type": "world_setting_conflict"
+                })
         
         # 타임라인 충돌 확인
-        existing_timeline = self.db_manager.get_timeline_events(novel_name)
-        new_events = content_analysis.get("events", [])
-        
-        for new_event in new_events:
-            for existing_event in existing_timeline:
-                if self._is_timeline_conflict(new_event, existing_event):
-                    conflicts["timeline_conflicts"].append({
-                        "new_event": new_event,
-                        "existing_event": existing_event,
-                        "conflict_type": "timeline_conflict"
-                    })
+        for new_event in content_analysis.get("events", []):
+            for existing_event in index.timeline_conflicts(new_event):
+                conflicts["timeline_conflicts"].append({
+                    "new_event": new_event,
+                    "existing_event": existing_event.to_dict(),
+                    "conflict_type": "timeline_conflict"
+                })
         
         return conflicts
+
+    def _conflict_index(self, novel_name: str) -> ConflictIndex:
+        """소설의 충돌 확인 색인 (DB 상태가 바뀌었을 때만 다시 만듦)"""
+        fingerprint = self.db_manager.state_fingerprint(novel_name)
+        cached = self._conflict_indexes.get(novel_name)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        index = ConflictIndex(
+            self.db_manager.get_records(novel_name, 'characters'),
+            self.db_manager.get_records(novel_name, 'world'),
+            self.db_manager.get_records(novel_name, 'Timeline'),
+            self.config.get_conflict_detection_setting("world_setting_keyword_overlap_threshold", 3),
+            self.config.get_conflict_detection_setting("timeline_event_similarity_threshold", 5)
+        )
+        self._conflict_indexes[novel_name] = (fingerprint, index)
+        return index
     
     def _generate_recommendations(self, novel_name: str, content_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -160,63 +274,6 @@ class NovelAnalysisAgent:
         
         return recommendations
     
-    def _is_character_conflict(self, new_char: Dict[str, Any], existing_char: Dict[str, Any]) -> bool:
-        """인물 충돌 여부 확인"""
-        # 이름이 같거나 유사한 경우
-        if new_char.get("name", "").lower() == existing_char.get("name", "").lower():
-            return True
-        
-        # 역할이나 특징이 충돌하는 경우
-        new_role = new_char.get("role", "")
-        existing_role = existing_char.get("role", "")
-        
-        if new_role and existing_role and new_role == existing_role:
-            return True
-        
-        return False
-    
-    def _is_world_setting_conflict(self, new_element: Dict[str, Any], existing_element: Dict[str, Any]) -> bool:
-        """세계관 설정 충돌 여부 확인"""
-        # 설정 이름이 같거나 유사한 경우
-        if new_element.get("name", "").lower() == existing_element.get("name", "").lower():
-            return True
-        
-        # 설정 내용이 충돌하는 경우
-        new_description = new_element.get("description", "")
-        existing_description = existing_element.get("description", "")
-        
-        # 간단한 키워드 기반 충돌 확인
-        new_keywords = set(new_description.lower().split())
-        existing_keywords = set(existing_description.lower().split())
-        
-        if len(new_keywords.intersection(existing_keywords)) > 3:  # 3개 이상 키워드가 겹치면 충돌로 간주
-            return True
-        
-        return False
-    
-    def _is_timeline_conflict(self, new_event: Dict[str, Any], existing_event: Dict[str, Any]) -> bool:
-        """타임라인 충돌 여부 확인"""
-        # 날짜가 같은 경우
-        new_date = new_event.get("date", "")
-        existing_date = existing_event.get("date", "")
-        
-        if new_date and existing_date and new_date == existing_date:
-            return True
-        
-        # 이벤트 내용이 유사한 경우
-        new_description = new_event.get("description", "")
-        existing_description = existing_event.get("description", "")
-        
-        if new_description and existing_description:
-            # 간단한 유사도 확인
-            new_words = set(new_description.lower().split())
-            existing_words = set(existing_description.lower().split())
-            
-            if len(new_words.intersection(existing_words)) > 5:  # 5개 이상 단어가 겹치면 충돌로 간주
-                return True
-        
-        return False
-    
     def _generate_summary(self, content_analysis: Dict[str, Any], conflicts: Dict[str, Any], recommendations: Dict[str, Any]) -> str:
         """분석 결과 요약 생성"""
         summary_parts = []
@@ -276,6 +333,19 @@ class NovelAnalysisAgent:
         report_parts.append(analysis_result['summary'])
         report_parts.append("")
         
+        # 증분 분석 정보
+        incremental = analysis_result.get('incremental')
+        if analysis_result.get('cached'):
+            report_parts.append("ℹ️ 원고와 DB가 이전 분석 때와 같아 저장된 분석 결과를 표시합니다.")
+            report_parts.append("")
+        elif analysis_result.get('unchanged'):
+            report_parts.append("ℹ️ 원고가 그대로여서 내용 분석은 이전 결과를 쓰고, 충돌과 추천은 현재 DB 기준으로 다시 확인했습니다.")
+            report_parts.append("")
+        elif incremental and incremental['reanalyzed_paragraphs'] < incremental['paragraphs']:
+            report_parts.append(f"ℹ️ 바뀐 문단이 든 {incremental['reanalyzed_paragraphs']}/{incremental['paragraphs']}개 문단만 다시 분석했으며, "
+                                f"충돌과 추천은 바뀐 부분 기준입니다.")
+            report_parts.append("")
+        
         # 충돌 정보
         conflicts = analysis_result.get('conflicts', {})
         if any(conflicts.values()):
@@ -334,9 +404,11 @@ class NovelAnalysisAgent:
         
         return "\n".join(report_parts)
 
-    def extract_recommendations(self, analysis_result, db_data):
+    def extract_recommendations(self, analysis_result, db_data=None):
         """
         분석 결과와 DB(스토리보드/인물)를 비교하여 추천 항목을 추출합니다.
+        db_data를 생략하면 전체 목록을 읽지 않고 이름/제목으로 해당 엔티티만 조회하며,
+        분석 이후 DB에서 수정된 필드는 수정 이력에서 찾아 "changed_since_analysis"로 함께 반환합니다.
         반환 예시:
         {
             "character_recommendations": {
@@ -354,13 +426,34 @@ class NovelAnalysisAgent:
             "storyboard_recommendations": {"add": [], "update": []}
         }
 
+        novel_name = analysis_result.get("novel_name")
+        marker = analysis_result.get("revision_marker")
+        changed = {}
+        if db_data is None and novel_name and marker is not None:
+            changed = self.db_manager.changed_since_marker(novel_name, marker)
+
+        db_index = None
+        if db_data is not None:
+            # name/이름, role/역할 같은 필드 이름 차이는 레코드로 한 번에 정규화
+            db_index = {
+                'characters': {r.name: r for r in map(Character.from_dict, db_data.get("characters", []))},
+                'Storyboard': {r.title: r for r in map(StoryboardChapter.from_dict, db_data.get("storyboards", []))}
+            }
+        record_types = {'characters': Character, 'Storyboard': StoryboardChapter}
+
+        def lookup(category, key):
+            if db_index is not None:
+                return db_index[category].get(key)
+            data = self.db_manager.get_entity(novel_name, category, key) if novel_name else None
+            return None if data is None else record_types[category].from_dict(data)
+
         # 인물 비교
-        db_characters = {c.get("name"): c for c in db_data.get("characters", [])}
         for char in analysis_result.get("characters", []):
             name = char.get("name")
             if not name:
                 continue
-            if name not in db_characters:
+            db_char = lookup('characters', name)
+            if db_char is None:
                 recommendations["character_recommendations"]["add"].append({
                     "name": name,
                     "reason": "DB에 없는 신규 인물",
@@ -368,7 +461,6 @@ class NovelAnalysisAgent:
                 })
             else:
                 # 주요 속성 비교(성격, 배경 등)
-                db_char = db_characters[name]
                 diff = {}
                 for k in ["role", "personality", "background"]:
                     if char.get(k) != db_char.get(k):
@@ -380,15 +472,17 @@ class NovelAnalysisAgent:
                         "data": char,
                         "diff": diff
                     }
+                    if name in changed.get('characters', {}):
+                        rec["changed_since_analysis"] = changed['characters'][name]
                     recommendations["character_recommendations"]["update"].append(rec)
 
         # 스토리보드(씬) 비교
-        db_scenes = {s.get("title"): s for s in db_data.get("storyboards", [])}
         for scene in analysis_result.get("events", []):
             title = scene.get("title")
             if not title:
                 continue
-            if title not in db_scenes:
+            db_scene = lookup('Storyboard', title)
+            if db_scene is None:
                 recommendations["storyboard_recommendations"]["add"].append({
                     "target": "scene",
                     "name": title,
@@ -396,7 +490,6 @@ class NovelAnalysisAgent:
                     "data": scene
                 })
             else:
-                db_scene = db_scenes[title]
                 diff = {}
                 for k in ["description", "date", "importance"]:
                     if scene.get(k) != db_scene.get(k):
@@ -409,6 +502,8 @@ class NovelAnalysisAgent:
                         "data": scene,
                         "diff": diff
                     }
+                    if title in changed.get('Storyboard', {}):
+                        rec["changed_since_analysis"] = changed['Storyboard'][title]
                     recommendations["storyboard_recommendations"]["update"].append(rec)
 
         return recommendations
@@ -8,6 +8,10 @@ from .Agent import NovelAnalysisAgent
 from .openai_agent import OpenAINovelAnalysisAgent
 from .utils import DatabaseManager, ContentAnalyzer, RecommendationEngine
 from .config import AgentConfig
+from .manuscripts import ManuscriptStore
+from .catalog import LibraryCatalog
+from .document import Document
+from .records import Character, WorldElement, TimelineEvent, StoryboardChapter, StoryboardScene
 
 __version__ = "1.0.0"
 __author__ = "Somniorum Library"
@@ -18,5 +22,13 @@ __all__ = [
     "DatabaseManager", 
     "ContentAnalyzer",
     "RecommendationEngine",
-    "AgentConfig"
+    "AgentConfig",
+    "ManuscriptStore",
+    "LibraryCatalog",
+    "Document",
+    "Character",
+    "WorldElement",
+    "TimelineEvent",
+    "StoryboardChapter",
+    "StoryboardScene"
 ] 
\ No newline at end of file
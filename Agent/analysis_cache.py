@@ -0,0 +1,113 @@
+"""
+분석 결과 캐시 (Database/.analysis_cache/)
+
+(소설, 원고 내용 해시, 소설 DB 상태 지문, 분석기/프롬프트 버전과 설정)을 키로 분석 결과 전체를 저장해 두고,
+원고와 DB가 그대로인 상태에서 같은 원고를 다시 분석하면 분석기나 OpenAI를 다시 호출하지 않고 저장된 결과를 돌려줌
+항목 수와 전체 크기가 한도를 넘으면 가장 오래 쓰지 않은 항목(파일 수정 시각 기준)부터 지움
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class AnalysisCache:
+    """
+    분석 결과 LRU 디스크 캐시
+
+    항목마다 <키>.json 파일 하나이며, 읽을 때 파일 수정 시각을 갱신해 최근 사용 순서로 씀
+
+    Args:
+        database_path: Database 폴더
+        max_entries: 최대 항목 수
+        max_bytes: 최대 전체 크기(바이트)
+    """
+
+    CACHE_DIR = '.analysis_cache'
+
+    def __init__(self, database_path: str = "Database", max_entries: int = 128, max_bytes: int = 64 * 1024 * 1024):
+        self.path = Path(database_path) / self.CACHE_DIR
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """키 구성 요소들(JSON으로 바꿀 수 있는 값)로 캐시 키를 만듦"""
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """저장된 결과 (없으면 None)"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"분석 캐시 파일 읽기 오류 {path}: {e}")
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """결과 저장 후 한도를 넘으면 오래 쓰지 않은 항목부터 지움"""
+        path = self._entry_path(key)
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.name.endswith('.json') and not entry.name.startswith('.') and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            # 방금 저장한 항목 하나는 한도보다 커도 남김
+            if (count <= self.max_entries and total <= self.max_bytes) or count <= 1:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            count -= 1
+            total -= size
+
+    def invalidate(self, key: str):
+        path = self._entry_path(key)
+        if path.exists():
+            path.unlink()
+
+    def clear(self):
+        """모든 항목 삭제"""
+        with self._lock:
+            if not self.path.exists():
+                return
+            for path in self.path.glob('*.json'):
+                path.unlink()
+
+    def stats(self) -> Dict[str, int]:
+        """{"entries": 항목 수, "bytes": 전체 크기}"""
+        if not self.path.exists():
+            return {"entries": 0, "bytes": 0}
+        sizes = [path.stat().st_size for path in self.path.glob('*.json')]
+        return {"entries": len(sizes), "bytes": sum(sizes)}
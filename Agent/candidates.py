@@ -0,0 +1,112 @@
+"""
+인물 이름 후보 거르기
+
+한국어 인명 패턴은 거의 모든 한글 낱말에 맞으므로 MentionIndex의 후보를
+불용어(대명사/일반 명사/부사 등) 사전, 최소 등장 횟수, 소설 DB의 기존 인물 이름(gazetteer)으로 걸러
+역할/설명 추출처럼 이름마다 하는 작업을 수십 개 후보에만 하도록 함
+"""
+
+import heapq
+from typing import Dict, List, Iterable, Optional, Set
+
+from .document import MentionIndex
+
+# 인명 패턴에 자주 걸리는 일반 낱말
+COMMON_WORDS = [
+    # 대명사/지시어
+    '그녀', '그들', '그것', '이것', '저것', '우리', '저희', '너희', '자신', '당신', '누구', '무엇', '여기', '거기', '저기',
+    '어디', '이곳', '그곳', '모두', '서로', '아무', '누군가', '무언가', '그녀석', '이놈', '그놈',
+    # 접속어/부사
+    '그리고', '그러나', '하지만', '그런데', '그래서', '그러면', '그러자', '그렇게', '이렇게', '저렇게', '어떻게', '왜냐하면',
+    '다시', '이미', '아직', '정말', '너무', '조금', '많이', '가장', '먼저', '함께', '혼자', '계속', '갑자기', '천천히',
+    '결국', '드디어', '마침내', '바로', '다만', '오직', '아주', '매우', '잠시', '잠깐', '어쩌면', '아마', '역시', '벌써',
+    '지금', '오늘', '내일', '어제', '이제', '언제', '항상', '가끔', '자주', '다음', '처음', '마지막', '순간',
+    '그날', '그때', '이때', '아침', '저녁', '오전', '오후', '다음날',
+    # 관형사/용언 활용형
+    '그런', '이런', '저런', '어떤', '같은', '다른', '모든', '있는', '없는', '하는', '했던', '있던', '없던', '하고',
+    '하며', '하면', '해서', '하지', '있고', '없고', '있어', '없어', '있을', '없을', '그렇지', '아니', '아니라', '않고',
+    # 일반 명사
+    '사람', '사람들', '생각', '마음', '얼굴', '눈물', '시간', '하늘', '세상', '세계', '이야기', '문제', '때문', '소리',
+    '목소리', '모습', '표정', '말투', '느낌', '기분', '이름', '정도', '사실', '자리', '방향', '상황', '이유', '대답',
+    '질문', '부분', '하나', '한번', '번째', '바람', '햇살', '여자', '남자', '아이', '소녀', '소년', '어머니', '아버지',
+    '엄마', '아빠',
+]
+
+# 이름 뒤에 붙어 함께 잡히는 조사 (긴 것부터 확인)
+PARTICLES = ('에게서', '한테서', '에서', '에게', '한테', '으로', '까지', '부터', '처럼', '보다', '이랑', '하고',
+             '은', '는', '이', '가', '을', '를', '의', '에', '도', '와', '과', '로', '만', '랑', '야', '아')
+
+# 서술어 끝 (했다/웃었다처럼 '다'로 끝나는 후보는 이름이 아닌 것으로 봄)
+PREDICATE_ENDINGS = ('다',)
+
+
+class CandidateFilter:
+    """
+    MentionIndex 후보 이름 필터
+
+    - 숫자나 글자 바로 뒤에서 시작한 등장("3일에"의 "일에", 긴 낱말의 뒷부분)은 버림
+    - 불용어이거나 조사를 뗀 형태가 불용어인 후보, 서술어 끝으로 끝나는 후보는 버림
+    - 뒤에 조사가 붙어 잡힌 후보("이영희는", "이영희가")는 조사를 뗀 이름("이영희")의 등장으로 합치고,
+      기존 인물 이름(known_names)이면 그 이름으로 합침
+    - 합친 등장 횟수가 min_mentions보다 적은 후보는 버림 (기존 인물 이름은 항상 남김)
+
+    Args:
+        stopwords: 불용어 목록
+        min_mentions: 남길 최소 등장 횟수 (기존 인물 이름은 예외)
+        known_names: 소설 DB의 기존 인물 이름
+    """
+
+    def __init__(self, stopwords: Iterable[str] = (), min_mentions: int = 1,
+                 known_names: Optional[Iterable[str]] = None):
+        self.stopwords: Set[str] = set(stopwords)
+        self.min_mentions = min_mentions
+        self.known_names: Set[str] = set(known_names or ())
+
+    @staticmethod
+    def strip_particle(name: str) -> str:
+        """뒤에 붙은 조사를 뗀 형태 (남는 부분이 두 글자 미만이면 그대로)"""
+        for particle in PARTICLES:
+            if name.endswith(particle) and len(name) - len(particle) >= 2:
+                return name[:-len(particle)]
+        return name
+
+    def canonical(self, name: str) -> Optional[str]:
+        """기존 인물 이름이면 그 이름 (조사가 붙은 형태 포함), 아니면 None"""
+        if name in self.known_names:
+            return name
+        stem = self.strip_particle(name)
+        return stem if stem in self.known_names else None
+
+    def is_stopword(self, name: str) -> bool:
+        return (name in self.stopwords or self.strip_particle(name) in self.stopwords
+                or name.endswith(PREDICATE_ENDINGS))
+
+    def apply(self, mentions: MentionIndex, min_mentions: Optional[int] = None) -> MentionIndex:
+        """
+        거른 후보만 담은 새 MentionIndex
+
+        Args:
+            mentions: 패턴으로 모은 후보 (ContentAnalyzer.mention_index)
+            min_mentions: 이번에만 쓸 최소 등장 횟수 (None이면 self.min_mentions)
+        """
+        min_mentions = self.min_mentions if min_mentions is None else min_mentions
+        text = mentions.document.text
+        grouped: Dict[str, List[List[int]]] = {}
+        for name, offsets in mentions.offsets.items():
+            offsets = [offset for offset in offsets if offset == 0 or not text[offset - 1].isalnum()]
+            if not offsets:
+                continue
+            canonical = self.canonical(name)
+            if canonical is None:
+                if self.is_stopword(name):
+                    continue
+                canonical = self.strip_particle(name)
+            grouped.setdefault(canonical, []).append(offsets)
+        kept: Dict[str, List[int]] = {}
+        for name, offset_lists in grouped.items():
+            offsets = offset_lists[0] if len(offset_lists) == 1 else list(heapq.merge(*offset_lists))
+            if len(offsets) >= min_mentions or name in self.known_names:
+                kept[name] = offsets
+        index = MentionIndex(mentions.document)
+        index.offsets = kept
+        return index
@@ -0,0 +1,141 @@
+"""
+서재 카탈로그 (Database/.catalog/catalog.json)
+
+소설마다 이름, 카테고리별 엔티티 수(저장소 백엔드별), 원고 파일 수/전체 크기, 마지막 수정 시각을 한 파일에 모아 둠
+DatabaseManager와 ManuscriptStore가 쓰기 후 갱신하므로 사이드바/서재 화면은 폴더를 훑지 않고 이 파일만 읽으면 됨
+카탈로그를 .catalog 폴더 안에 두어 카탈로그를 다시 써도 Database 폴더의 수정 시각은 바뀌지 않으며,
+Database 폴더의 수정 시각이 기록과 다를 때(소설 폴더가 외부에서 추가/삭제된 경우)만 소설 목록을 다시 맞춤
+"""
+
+import copy
+import datetime
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+
+class LibraryCatalog:
+    """
+    Database 폴더 하나의 소설 목록과 요약 정보
+
+    항목 형식:
+        {"name": 소설 이름, "counts": {백엔드: {카테고리: 엔티티 수}},
+         "manuscript_files": 원고 수, "manuscript_bytes": 원고 전체 바이트, "updated_at": ISO 시각}
+    아직 집계되지 않은 값은 항목에 없음 (DatabaseManager.library_overview()가 채움)
+    """
+
+    CATALOG_DIR = '.catalog'
+    FILE_NAME = 'catalog.json'
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, database_path: Path):
+        self.database_path = Path(database_path)
+        self.path = self.database_path / self.CATALOG_DIR / self.FILE_NAME
+        self.lock = threading.RLock()
+        self.novels_info = {}
+        self.database_mtime_ns = None  # 마지막으로 소설 목록을 맞춘 시점의 Database 폴더 수정 시각
+        self._file_mtime_ns = None  # 마지막으로 읽거나 쓴 시점의 카탈로그 파일 수정 시각
+
+    @classmethod
+    def shared(cls, database_path: Path) -> "LibraryCatalog":
+        """Database 폴더별로 하나의 인스턴스를 공유"""
+        key = str(Path(database_path).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(database_path)
+            return cls._instances[key]
+
+    def _refresh(self):
+        """다른 프로세스가 카탈로그를 고쳤으면 다시 읽음 (lock을 잡은 상태에서 호출)"""
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        if mtime_ns == self._file_mtime_ns:
+            return
+        data = {}
+        if mtime_ns is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"카탈로그 파일 읽기 오류 {self.path}: {e}")
+                data = {}
+        self.novels_info = data.get('novels', {})
+        self.database_mtime_ns = data.get('database_mtime_ns')
+        self._file_mtime_ns = mtime_ns
+
+    def _write(self):
+        payload = {"database_mtime_ns": self.database_mtime_ns, "novels": self.novels_info}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self._file_mtime_ns = self.path.stat().st_mtime_ns
+
+    def _sync_novels(self) -> bool:
+        """Database 폴더가 바뀌었으면 소설 폴더 목록과 항목을 맞춤, 바뀐 항목이 있으면 True"""
+        try:
+            mtime_ns = self.database_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime_ns == self.database_mtime_ns:
+            return False
+        names = {d.name for d in self.database_path.iterdir() if d.is_dir() and not d.name.startswith('.')}
+        for name in names - set(self.novels_info):
+            self.novels_info[name] = {"name": name}
+        for name in set(self.novels_info) - names:
+            del self.novels_info[name]
+        self.database_mtime_ns = mtime_ns
+        return True
+
+    def novels(self) -> List[str]:
+        """소설 이름 목록 (이름순)"""
+        return sorted(self.entries())
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """{소설 이름: 항목} (복사본)"""
+        with self.lock:
+            self._refresh()
+            if self._sync_novels():
+                self._write()
+            return copy.deepcopy(self.novels_info)
+
+    def get(self, novel_name: str) -> Optional[Dict[str, Any]]:
+        return self.entries().get(novel_name)
+
+    def update(self, novel_name: str, backend: Optional[str] = None, counts: Optional[Dict[str, int]] = None,
+               manuscripts: Optional[Dict[str, int]] = None, touch: bool = True):
+        """
+        소설 항목 갱신 (없으면 추가)
+
+        Args:
+            backend: counts를 집계한 저장소 백엔드 이름
+            counts: {카테고리: 엔티티 수} (주어진 카테고리만 덮어씀)
+            manuscripts: {"files": 원고 수, "bytes": 전체 바이트}
+            touch: False면 수정 시각을 바꾸지 않음 (빠진 집계만 채울 때)
+        """
+        with self.lock:
+            self._refresh()
+            # 새 소설 폴더가 생기며 바뀐 Database 수정 시각을 먼저 반영해야 다음 조회 때 다시 훑지 않음
+            self._sync_novels()
+            info = self.novels_info.setdefault(novel_name, {"name": novel_name})
+            if counts:
+                info.setdefault('counts', {}).setdefault(backend, {}).update(counts)
+            if manuscripts is not None:
+                info['manuscript_files'] = manuscripts['files']
+                info['manuscript_bytes'] = manuscripts['bytes']
+            if touch or 'updated_at' not in info:
+                info['updated_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+            self._write()
+
+    def remove(self, novel_name: str):
+        with self.lock:
+            self._refresh()
+            if self.novels_info.pop(novel_name, None) is not None:
+                self._write()
@@ -14,7 +14,19 @@ class AgentConfig:
             "max_world_elements_per_analysis": 15,  # 한 번에 분석할 최대 세계관 요소 수
             "max_events_per_analysis": 20,  # 한 번에 분석할 최대 이벤트 수
             "min_character_name_length": 2,  # 최소 인물 이름 길이
+            "min_character_mentions": 2,  # 인물 후보로 남길 최소 등장 횟수 (기존 인물 이름은 예외)
             "context_window_size": 50,  # 문맥 분석 윈도우 크기
+            "budgeted_analysis": True,  # 인물/세계관 요소/이벤트를 점수 상위 max_*_per_analysis개까지만 남길지 여부
+            "custom_keywords": {},  # 기본 키워드에 더할 사용자 키워드 {"role"/"world"/"time"/"theme"/"stopword": [키워드, ...]}
+            "parallel_analysis": False,  # 긴 원고를 구간으로 나눠 여러 프로세스에서 분석할지 여부
+            "parallel_workers": None,  # 병렬 분석 프로세스 수 (None이면 CPU 수)
+            "parallel_shard_size": 65536,  # 병렬 분석 구간 최소 크기(글자)
+            "parallel_min_length": 262144,  # 이 글자 수 이상인 원고만 병렬로 분석
+            "incremental_analysis": True,  # 이전에 분석한 원고는 바뀐 문단이 든 구간만 다시 분석
+            "incremental_segment_size": 8000,  # 증분 분석 구간(문단 블록) 크기(글자), 문단 하나를 고치면 이만큼 다시 분석
+            "result_cache": True,  # 원고와 DB가 그대로면 저장된 분석 결과를 그대로 사용
+            "result_cache_max_entries": 128,  # 분석 결과 캐시 최대 항목 수
+            "result_cache_max_bytes": 64 * 1024 * 1024,  # 분석 결과 캐시 최대 전체 크기(바이트)
         }
         
         # 충돌 감지 설정
@@ -41,6 +53,18 @@ class AgentConfig:
             "include_recommendation_reasons": True,  # 추천 이유 포함 여부
             "max_report_length": 2000,  # 최대 리포트 길이
         }
+        
+        # 저장소 설정
+        self.storage_settings = {
+            "backend": "json",  # 저장소 백엔드 (json: 엔티티별 JSON 파일, sqlite: SQLite 파일 하나, segment: 카테고리별 추가 전용 파일)
+            "sqlite_file": "library.sqlite3",  # sqlite 백엔드 사용 시 Database 폴더 아래 파일 이름
+            "segment_compact_ratio": 0.5,  # segment 백엔드: 덮어써진 레코드 비율이 이 값을 넘으면 압축
+            "segment_compact_min_records": 64,  # segment 백엔드: 압축을 고려할 최소 레코드 수
+            "load_workers": 8,  # json 백엔드: 파일을 병렬로 읽을 스레드 수 (1이면 순차)
+            "parallel_load_threshold": 32,  # json 백엔드: 이 개수 이상의 파일이 있을 때만 병렬로 읽음
+            "cache_enabled": True,  # get_* 읽기 캐시 사용 여부
+            "cache_max_novels": 8,  # 읽기 캐시에 유지할 최대 소설 수 (LRU)
+        }
     
     def get_analysis_setting(self, key: str, default=None):
         """분석 설정 값 가져오기"""
@@ -58,6 +82,10 @@ class AgentConfig:
         """출력 설정 값 가져오기"""
         return self.output_settings.get(key, default)
     
+    def get_storage_setting(self, key: str, default=None):
+        """저장소 설정 값 가져오기"""
+        return self.storage_settings.get(key, default)
+    
     def update_analysis_setting(self, key: str, value):
         """분석 설정 업데이트"""
         if key in self.analysis_settings:
@@ -78,13 +106,19 @@ class AgentConfig:
         if key in self.output_settings:
             self.output_settings[key] = value
     
+    def update_storage_setting(self, key: str, value):
+        """저장소 설정 업데이트"""
+        if key in self.storage_settings:
+            self.storage_settings[key] = value
+    
     def get_all_settings(self) -> dict:
         """모든 설정을 딕셔너리로 반환"""
         return {
             "analysis_settings": self.analysis_settings.copy(),
             "conflict_detection": self.conflict_detection.copy(),
             "recommendation_settings": self.recommendation_settings.copy(),
-            "output_settings": self.output_settings.copy()
+            "output_settings": self.output_settings.copy(),
+            "storage_settings": self.storage_settings.copy()
         }
     
     def load_settings_from_file(self, file_path: str):
@@ -102,6 +136,8 @@ class AgentConfig:
                 self.recommendation_settings.update(settings['recommendation_settings'])
             if 'output_settings' in settings:
                 self.output_settings.update(settings['output_settings'])
+            if 'storage_settings' in settings:
+                self.storage_settings.update(settings['storage_settings'])
                 
         except Exception as e:
             print(f"설정 파일 로드 오류: {e}")
@@ -0,0 +1,110 @@
+"""
+충돌 확인용 색인
+
+새 인물/세계관 요소/이벤트를 기존 레코드 전부와 짝지어 비교하지 않도록
+소설의 기존 레코드로 이름 해시맵, 역할 맵, 설명 낱말 역색인, 날짜 맵을 한 번 만들고
+새 항목마다 색인에서 찾은 후보만 충돌로 판정함
+- 인물: 이름(대소문자 무시)이나 역할이 같으면 충돌
+- 세계관: 이름(대소문자 무시)이 같거나 설명 낱말이 기준 개수보다 많이 겹치면 충돌
+- 타임라인: 날짜 문자열이 같거나, 둘 다 날짜 키가 있고 키가 같거나, 설명 낱말이 기준 개수보다 많이 겹치면 충돌
+"""
+
+from typing import Dict, List, Any, Iterable, Set
+
+from .records import Character, WorldElement, TimelineEvent
+
+
+def _words(text: Any) -> Set[str]:
+    return set(str(text).lower().split()) if text else set()
+
+
+def _overlapping(postings: Dict[str, List[int]], words: Set[str], threshold: int) -> Set[int]:
+    """words와 겹치는 낱말이 threshold개보다 많은 레코드 번호"""
+    counts: Dict[int, int] = {}
+    for word in words:
+        for index in postings.get(word, ()):
+            counts[index] = counts.get(index, 0) + 1
+    return {index for index, count in counts.items() if count > threshold}
+
+
+def _index_words(postings: Dict[str, List[int]], index: int, words: Iterable[str]):
+    for word in words:
+        postings.setdefault(word, []).append(index)
+
+
+class ConflictIndex:
+    """
+    소설 하나의 기존 인물/세계관/타임라인 레코드 색인
+
+    Args:
+        characters, world_elements, timeline_events: 기존 레코드 (DatabaseManager.get_records)
+        world_overlap_threshold: 세계관 설명 낱말이 이보다 많이 겹치면 충돌
+        timeline_overlap_threshold: 이벤트 설명 낱말이 이보다 많이 겹치면 충돌
+    """
+
+    def __init__(self, characters: List[Character], world_elements: List[WorldElement],
+                 timeline_events: List[TimelineEvent], world_overlap_threshold: int = 3,
+                 timeline_overlap_threshold: int = 5):
+        self.characters = characters
+        self.world_elements = world_elements
+        self.timeline_events = timeline_events
+        self.world_overlap_threshold = world_overlap_threshold
+        self.timeline_overlap_threshold = timeline_overlap_threshold
+
+        # 인물: 소문자 이름 -> 번호, 역할 -> 번호
+        self._character_names: Dict[str, List[int]] = {}
+        self._character_roles: Dict[str, List[int]] = {}
+        for index, character in enumerate(characters):
+            self._character_names.setdefault(str(character.name or "").lower(), []).append(index)
+            if character.role:
+                self._character_roles.setdefault(character.role, []).append(index)
+
+        # 세계관: 소문자 이름 -> 번호, 설명 낱말 역색인
+        self._world_names: Dict[str, List[int]] = {}
+        self._world_words: Dict[str, List[int]] = {}
+        for index, element in enumerate(world_elements):
+            self._world_names.setdefault(str(element.name or "").lower(), []).append(index)
+            _index_words(self._world_words, index, _words(element.description))
+
+        # 타임라인: 날짜 키 -> 번호, 날짜 문자열 -> 번호, 설명 낱말 역색인
+        self._event_by_key: Dict[int, List[int]] = {}
+        self._event_by_date: Dict[str, List[int]] = {}
+        self._event_words: Dict[str, List[int]] = {}
+        for index, event in enumerate(timeline_events):
+            key = event.sort_key
+            if key is not None:
+                self._event_by_key.setdefault(key, []).append(index)
+            if event.date:
+                self._event_by_date.setdefault(event.date, []).append(index)
+            _index_words(self._event_words, index, _words(event.description))
+
+    def character_conflicts(self, new_char: Dict[str, Any]) -> List[Character]:
+        """이름(대소문자 무시)이나 역할이 같은 기존 인물 (저장 순서)"""
+        candidates = set(self._character_names.get((new_char.get("name") or "").lower(), ()))
+        if new_char.get("role"):
+            candidates.update(self._character_roles.get(new_char["role"], ()))
+        return [self.characters[index] for index in sorted(candidates)]
+
+    def world_conflicts(self, new_element: Dict[str, Any]) -> List[WorldElement]:
+        """이름(대소문자 무시)이 같거나 설명 낱말이 world_overlap_threshold개보다 많이 겹치는 기존 세계관 요소"""
+        candidates = set(self._world_names.get((new_element.get("name") or "").lower(), ()))
+        candidates |= _overlapping(self._world_words, _words(new_element.get("description")),
+                                   self.world_overlap_threshold)
+        return [self.world_elements[index] for index in sorted(candidates)]
+
+    def timeline_conflicts(self, new_event: Dict[str, Any]) -> List[TimelineEvent]:
+        """
+        날짜가 같거나 설명 낱말이 timeline_overlap_threshold개보다 많이 겹치는 기존 이벤트
+
+        날짜 문자열이 같거나, 양쪽 모두 날짜 키가 있고 키가 같으면 같은 날짜로 봄
+        """
+        candidates = set()
+        new_key = new_event.get("date_key")
+        new_date = new_event.get("date")
+        if new_key is not None:
+            candidates.update(self._event_by_key.get(new_key, ()))
+        if new_date:
+            candidates.update(self._event_by_date.get(new_date, ()))
+        candidates |= _overlapping(self._event_words, _words(new_event.get("description")),
+                                   self.timeline_overlap_threshold)
+        return [self.timeline_events[index] for index in sorted(candidates)]
@@ -0,0 +1,222 @@
+"""
+날짜 표현 정규화
+
+"2024년 3월 15일", "3월 15일", "2024-03-15", "March 15, 2024" 같은 날짜와
+"사흘 뒤", "다음 날", "2 weeks later" 같은 상대 표현을 정렬 가능한 정수 키(date.toordinal())로 바꿈
+키는 저장/분석 시점에 한 번 계산해 이벤트의 date_key 필드로 보관하므로
+정렬, 기간 조회, 충돌 확인은 문자열을 다시 해석하지 않고 키만 비교함
+
+연도나 월이 없는 날짜("3월 15일", "15일")와 상대 표현은 기준 날짜(reference)의 연도/월을 따르며,
+기준이 없으면 키가 없음 (연도를 모르는 날짜를 임의의 연도로 정렬하지 않도록)
+따라서 DB에 저장할 때(기준 없음)는 연도까지 적힌 날짜만 키가 생기고, 분석 중에는 앞 이벤트 날짜로 추정한 키가 생김
+"""
+
+import datetime
+import re
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+_MONTH_NAMES = (r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+                r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)')
+
+# 한국어 기간 낱말: (단위, 수)
+_KOREAN_SPANS = {
+    '하루': ('day', 1), '이틀': ('day', 2), '사흘': ('day', 3), '나흘': ('day', 4), '닷새': ('day', 5),
+    '엿새': ('day', 6), '이레': ('day', 7), '여드레': ('day', 8), '열흘': ('day', 10), '보름': ('day', 15),
+    '일주일': ('week', 1), '한 달': ('month', 1), '한달': ('month', 1), '일 년': ('year', 1), '일년': ('year', 1),
+}
+_KOREAN_UNITS = {'일': 'day', '주': 'week', '주일': 'week', '달': 'month', '개월': 'month', '년': 'year'}
+_ENGLISH_NUMBERS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+}
+
+# 고정 상대 표현: (단위, 수)
+_RELATIVE_WORDS = {
+    '다음날': ('day', 1), '이튿날': ('day', 1), '익일': ('day', 1), '내일': ('day', 1), '모레': ('day', 2),
+    '글피': ('day', 3), '전날': ('day', -1), '그전날': ('day', -1), '어제': ('day', -1), '그저께': ('day', -2),
+    '그제': ('day', -2), '그날': ('day', 0), '같은날': ('day', 0), '당일': ('day', 0), '오늘': ('day', 0),
+    '다음주': ('week', 1), '지난주': ('week', -1), '다음달': ('month', 1), '지난달': ('month', -1),
+    '이듬해': ('year', 1), '다음해': ('year', 1), '내년': ('year', 1), '작년': ('year', -1), '지난해': ('year', -1),
+    'thenextday': ('day', 1), 'nextday': ('day', 1), 'thefollowingday': ('day', 1), 'thedayafter': ('day', 1),
+    'tomorrow': ('day', 1), 'thedaybefore': ('day', -1), 'thepreviousday': ('day', -1), 'yesterday': ('day', -1),
+    'thatday': ('day', 0), 'thesameday': ('day', 0), 'today': ('day', 0),
+    'nextweek': ('week', 1), 'lastweek': ('week', -1), 'nextmonth': ('month', 1), 'lastmonth': ('month', -1),
+    'nextyear': ('year', 1), 'lastyear': ('year', -1), 'thefollowingyear': ('year', 1),
+}
+
+
+def _words_pattern(words: Iterable[str]) -> str:
+    """낱말 목록을 긴 것부터 시도하는 정규식 (낱말 안의 공백은 있어도 없어도 됨)"""
+    return '|'.join(r'\s*'.join(re.escape(part) for part in word.split(' ')) if ' ' in word else re.escape(word)
+                    for word in sorted(words, key=len, reverse=True))
+
+
+_KOREAN_WORDS = ['다음 날', '이튿날', '익일', '내일', '모레', '글피', '그 전날', '전날', '어제', '그저께', '그제',
+                 '그 날', '같은 날', '당일', '오늘', '다음 주', '지난 주', '다음 달', '지난 달', '이듬해', '다음 해',
+                 '내년', '작년', '지난 해']
+_ENGLISH_WORDS = ['the next day', 'next day', 'the following day', 'the day after', 'tomorrow', 'the day before',
+                  'the previous day', 'yesterday', 'that day', 'the same day', 'today', 'next week', 'last week',
+                  'next month', 'last month', 'next year', 'last year', 'the following year']
+
+# '후/뒤/전' 뒤에 올 수 있는 것 ('3일 전투'의 '전'처럼 다른 낱말의 일부는 제외)
+_PARTICLE_AFTER = r'(?=[^가-힣]|$|에|의|엔|쯤|께|부터|까지|으로|로|인|이)'
+
+
+class DateNormalizer:
+    """
+    날짜 표현을 찾아 정렬 키로 바꾸는 파서
+
+    같은 위치에서 맞는 표현이 여럿이면 더 구체적인 것(연월일 > 연월 > 일)을 먼저 씀
+    """
+
+    # 같은 위치에서는 앞의 대안이 먼저 맞음
+    PATTERN = re.compile('|'.join([
+        r'(?<!\d)(?P<iso_y>\d{4})\s*[-./]\s*(?P<iso_m>\d{1,2})\s*[-./]\s*(?P<iso_d>\d{1,2})(?!\d)',
+        rf'(?<!\d)(?P<krn_n>\d+)\s*(?P<krn_u>개월|주일|일|주|달|년)\s*(?:이\s*)?(?P<krn_dir>후|뒤|전|만에){_PARTICLE_AFTER}',
+        r'(?<!\d)(?:(?P<kf_y>\d{1,4})\s*년\s*)?(?P<kf_m>\d{1,2})\s*월\s*(?P<kf_d>\d{1,2})\s*일',
+        r'(?<!\d)(?P<kym_y>\d{3,4})\s*년(?:\s*(?P<kym_m>\d{1,2})\s*월)?',
+        r'(?<!\d)(?P<kd_d>\d{1,2})\s*일(?!\s*(?:째|차|간|동안))',
+        rf'(?P<ks>{_words_pattern(_KOREAN_SPANS)})\s*(?:이\s*)?(?P<ks_dir>후|뒤|전|만에){_PARTICLE_AFTER}',
+        rf'(?P<kw>{_words_pattern(_KOREAN_WORDS)})(?!날)',
+        rf'\b(?P<emy_mon>{_MONTH_NAMES})\.?,?\s+(?P<emy_y>\d{{4}})\b',
+        rf'\b(?P<emd_mon>{_MONTH_NAMES})\.?\s+(?P<emd_d>\d{{1,2}})(?!\d)(?:st|nd|rd|th)?(?:,?\s+(?P<emd_y>\d{{4}})\b)?',
+        rf'\b(?P<edm_d>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<edm_mon>{_MONTH_NAMES})\b\.?(?:,?\s+(?P<edm_y>\d{{4}})\b)?',
+        rf'\b(?P<ern_n>\d+|{"|".join(_ENGLISH_NUMBERS)})\s+(?P<ern_u>day|week|month|year)s?\s+'
+        r'(?P<ern_dir>later|after(?:wards?)?|before|earlier|ago)\b',
+        rf'\b(?P<ew>{_words_pattern(_ENGLISH_WORDS)})\b',
+    ]), re.IGNORECASE)
+
+    def find(self, text: str, reference: Optional[int] = None) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        텍스트에서 처음 나오는 날짜 표현
+
+        Args:
+            text: 문장 또는 날짜 문자열
+            reference: 기준 날짜 키 (빠진 연/월과 상대 표현에 씀)
+
+        Returns:
+            (날짜 표현, 날짜 키) - 해석할 수 없는 날짜면 키는 None, 날짜 표현이 없으면 None
+        """
+        match = self.PATTERN.search(text)
+        if match is None:
+            return None
+        return match.group(), self._key(match.groupdict(), reference)
+
+    def key(self, text: str, reference: Optional[int] = None) -> Optional[int]:
+        """날짜 문자열의 정렬 키 (날짜 표현이 없거나 해석할 수 없으면 None)"""
+        if not text:
+            return None
+        found = self.find(str(text), reference)
+        return found[1] if found else None
+
+    def _key(self, groups: Dict[str, Optional[str]], reference: Optional[int]):
+        """맞은 대안의 날짜 키 (해석할 수 없으면 None)"""
+        base = datetime.date.fromordinal(reference) if reference is not None else None
+        if groups['iso_y']:
+            return _ordinal(groups['iso_y'], groups['iso_m'], groups['iso_d'])
+        if groups['krn_n']:
+            return _shift(base, _KOREAN_UNITS[groups['krn_u']], int(groups['krn_n']), groups['krn_dir'] == '전')
+        if groups['kf_m']:
+            return _ordinal(groups['kf_y'] or _part(base, 'year'), groups['kf_m'], groups['kf_d'])
+        if groups['kym_y']:
+            return _ordinal(groups['kym_y'], groups['kym_m'] or 1, 1)
+        if groups['kd_d']:
+            return _ordinal(_part(base, 'year'), _part(base, 'month'), groups['kd_d'])
+        if groups['ks']:
+            unit, count = _KOREAN_SPANS[re.sub(r'\s+', ' ', groups['ks'])]
+            return _shift(base, unit, count, groups['ks_dir'] == '전')
+        if groups['kw']:
+            unit, count = _RELATIVE_WORDS[re.sub(r'\s+', '', groups['kw'])]
+            return _shift(base, unit, count)
+        if groups['emy_mon']:
+            return _ordinal(groups['emy_y'], _MONTHS[groups['emy_mon'][:3].lower()], 1)
+        if groups['emd_mon']:
+            return _ordinal(groups['emd_y'] or _part(base, 'year'), _MONTHS[groups['emd_mon'][:3].lower()],
+                            groups['emd_d'])
+        if groups['edm_mon']:
+            return _ordinal(groups['edm_y'] or _part(base, 'year'), _MONTHS[groups['edm_mon'][:3].lower()],
+                            groups['edm_d'])
+        if groups['ern_n']:
+            count = groups['ern_n'].lower()
+            count = int(count) if count.isdigit() else _ENGLISH_NUMBERS[count]
+            return _shift(base, groups['ern_u'].lower(), count,
+                          groups['ern_dir'].lower() in ('before', 'earlier', 'ago'))
+        unit, count = _RELATIVE_WORDS[re.sub(r'\s+', '', groups['ew']).lower()]
+        return _shift(base, unit, count)
+
+
+def _part(base: Optional[datetime.date], field: str) -> Optional[int]:
+    return getattr(base, field) if base is not None else None
+
+
+def _ordinal(year, month, day) -> Optional[int]:
+    if year is None or month is None:
+        return None
+    try:
+        return datetime.date(int(year), int(month), int(day)).toordinal()
+    except ValueError:
+        return None
+
+
+def _add_months(base: datetime.date, months: int) -> datetime.date:
+    month_index = base.month - 1 + months
+    year = base.year + month_index // 12
+    month = month_index % 12 + 1
+    for day in range(base.day, 0, -1):
+        try:
+            return datetime.date(year, month, day)
+        except ValueError:
+            continue
+
+
+def _shift(base: Optional[datetime.date], unit: str, count: int, backwards: bool = False) -> Optional[int]:
+    """기준 날짜에서 count 단위만큼 옮긴 키 (기준이 없거나 범위를 벗어나면 None)"""
+    if base is None:
+        return None
+    if backwards:
+        count = -count
+    try:
+        if unit == 'day':
+            return (base + datetime.timedelta(days=count)).toordinal()
+        if unit == 'week':
+            return (base + datetime.timedelta(weeks=count)).toordinal()
+        return _add_months(base, count * 12 if unit == 'year' else count).toordinal()
+    except (ValueError, OverflowError):
+        return None
+
+
+_default_normalizer = DateNormalizer()
+
+
+def find_date(text: str, reference: Optional[int] = None) -> Optional[Tuple[str, Optional[int]]]:
+    """텍스트에서 처음 나오는 (날짜 표현, 날짜 키) (DateNormalizer.find)"""
+    return _default_normalizer.find(text, reference)
+
+
+def date_key(text: Any, reference: Optional[int] = None) -> Optional[int]:
+    """날짜 문자열의 정렬 키 (DateNormalizer.key)"""
+    return _default_normalizer.key(text, reference)
+
+
+def format_date_key(key: int) -> str:
+    """날짜 키를 YYYY-MM-DD 문자열로"""
+    return datetime.date.fromordinal(key).isoformat()
+
+
+def event_date_key(event: Dict[str, Any]) -> Optional[int]:
+    """이벤트의 저장된 date_key (없으면 date 필드로 계산, 예전에 저장된 이벤트용)"""
+    key = event.get('date_key')
+    if isinstance(key, int):
+        return key
+    return date_key(event.get('date') or event.get('날짜'))
+
+
+def sort_events(events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """이벤트를 date_key 순서로 정렬 (키가 없는 이벤트는 원래 순서대로 뒤에)"""
+    keyed = [(event_date_key(event), event) for event in events]
+    keyed.sort(key=lambda item: (item[0] is None, item[0] or 0))
+    return [event for _, event in keyed]
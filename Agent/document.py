@@ -0,0 +1,158 @@
+"""
+분석용 문서 모델
+
+ContentAnalyzer의 추출기들이 같은 텍스트를 각자 다시 나누지 않도록
+문장/장(chapter) 경계 오프셋과 소문자 텍스트를 입력마다 한 번만 만들어 공유함
+MentionIndex는 후보 이름마다 모든 등장 위치를 한 번의 훑기로 모아 둠
+"""
+
+import bisect
+import re
+from typing import Dict, List, Iterable, Iterator, Tuple, Optional
+
+from .manuscripts import CHAPTER_LINE_PATTERN
+
+
+class Document:
+    """
+    분석 입력 텍스트 하나
+
+    문장은 re.split(r'[.!?]', text)와 같은 조각이며 (시작, 끝) 오프셋으로만 보관하고
+    문장 텍스트는 필요할 때 잘라 씀
+    """
+
+    SENTENCE_DELIMITER = re.compile(r'[.!?]')
+
+    def __init__(self, text: str):
+        self.text = text
+        self._lower = None
+        self._chapter_starts = None
+        starts = [0]
+        ends = []
+        for match in self.SENTENCE_DELIMITER.finditer(text):
+            ends.append(match.start())
+            starts.append(match.end())
+        ends.append(len(text))
+        self.sentence_starts: List[int] = starts
+        self.sentence_ends: List[int] = ends
+
+    @property
+    def lower(self) -> str:
+        """소문자 텍스트 (처음 쓸 때 한 번 만듦, 원문과 오프셋이 같음)"""
+        if self._lower is None:
+            self._lower = self.text.lower()
+            if len(self._lower) != len(self.text):
+                # 소문자 변환으로 길이가 바뀌는 문자(예: 'İ')가 있으면 오프셋을 맞추기 위해 문자별로 변환
+                self._lower = ''.join(ch.lower()[:1] or ch for ch in self.text)
+        return self._lower
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_starts)
+
+    def sentence(self, index: int) -> str:
+        return self.text[self.sentence_starts[index]:self.sentence_ends[index]]
+
+    def lower_sentence(self, index: int) -> str:
+        return self.lower[self.sentence_starts[index]:self.sentence_ends[index]]
+
+    def sentences(self) -> Iterator[Tuple[int, str]]:
+        """(문장 번호, 문장 텍스트)"""
+        for index in range(self.sentence_count):
+            yield index, self.sentence(index)
+
+    def sentence_index_at(self, offset: int) -> int:
+        """오프셋이 속한 문장 번호 (구분 기호 위치면 그 앞 문장)"""
+        return max(bisect.bisect_right(self.sentence_starts, offset) - 1, 0)
+
+    def sentence_at(self, offset: int) -> str:
+        return self.sentence(self.sentence_index_at(offset))
+
+    def window(self, offset: int, length: int, margin: int) -> str:
+        """[offset, offset + length) 앞뒤로 margin 글자를 붙인 구간"""
+        return self.text[max(0, offset - margin):min(len(self.text), offset + length + margin)]
+
+    @property
+    def chapter_starts(self) -> List[int]:
+        """장별 시작 오프셋 (첫 장은 항상 0, 장 제목 줄이 없으면 [0])"""
+        if self._chapter_starts is None:
+            starts = [0]
+            for match in CHAPTER_LINE_PATTERN.finditer(self.text):
+                if match.start() > 0:
+                    starts.append(match.start())
+            self._chapter_starts = starts
+        return self._chapter_starts
+
+    def chapter_index_at(self, offset: int) -> int:
+        return bisect.bisect_right(self.chapter_starts, offset) - 1
+
+
+class MentionIndex:
+    """
+    후보 이름별 모든 등장 오프셋 (문서를 한 번 훑어 만듦)
+
+    이름은 앞뒤 공백을 뺀 형태로 모으므로 "철수"와 "철수 "처럼 패턴이 공백까지 잡은 등장도 같은 이름으로 셈
+    """
+
+    def __init__(self, document: Document):
+        self.document = document
+        self.offsets: Dict[str, List[int]] = {}
+
+    @classmethod
+    def from_pattern(cls, document: Document, pattern: "re.Pattern", min_length: int = 2) -> "MentionIndex":
+        """정규식에 맞는 모든 부분을 후보 이름으로 모음"""
+        index = cls(document)
+        offsets = index.offsets
+        for match in pattern.finditer(document.text):
+            name = match.group().strip()
+            if len(name) >= min_length:
+                if name in offsets:
+                    offsets[name].append(match.start())
+                else:
+                    offsets[name] = [match.start()]
+        return index
+
+    @classmethod
+    def from_matches(cls, document: Document, matches: Iterable[Tuple[int, int, str]]) -> "MentionIndex":
+        """(시작, 끝, 이름) 목록(KeywordMatcher.finditer 등)으로 만듦 - 기존 DB 이름의 등장을 셀 때"""
+        index = cls(document)
+        for start, _, name in sorted(matches):
+            index.offsets.setdefault(name, []).append(start)
+        return index
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def names(self) -> List[str]:
+        """처음 등장한 순서의 이름 목록"""
+        return sorted(self.offsets, key=lambda name: self.offsets[name][0])
+
+    def mentions(self, name: str) -> List[int]:
+        """등장 오프셋 목록 (오름차순)"""
+        return self.offsets.get(name, [])
+
+    def first(self, name: str) -> int:
+        """첫 등장 오프셋 (없으면 -1)"""
+        offsets = self.offsets.get(name)
+        return offsets[0] if offsets else -1
+
+    def count(self, name: str) -> int:
+        return len(self.offsets.get(name, ()))
+
+    def chapter_counts(self, name: str) -> List[int]:
+        """장별 등장 횟수 (Document.chapter_starts 순서)"""
+        counts = [0] * len(self.document.chapter_starts)
+        for offset in self.offsets.get(name, ()):
+            counts[self.document.chapter_index_at(offset)] += 1
+        return counts
+
+    def most_mentioned(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(이름, 등장 횟수)를 많이 등장한 순서로 (같으면 먼저 등장한 순서)"""
+        ranked = sorted(self.offsets.items(), key=lambda item: (-len(item[1]), item[1][0]))
+        return [(name, len(offsets)) for name, offsets in ranked[:limit]]
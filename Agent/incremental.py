@@ -0,0 +1,321 @@
+"""
+수정된 원고의 증분 재분석
+
+마지막으로 분석한 원고의 문단(줄) 해시와 구간(segment)별 분석 결과를
+Database/<소설>/.analysis/<분석기>/<파일 이름 해시>.json에 저장해 두고,
+다시 분석할 때 문단 단위 diff로 바뀌지 않은 구간의 결과는 재사용하고 바뀐 문단이 든 구간만 다시 분석함
+구간은 문단 경계에 맞춘 segment_size 글자 정도의 블록이므로, 문단 하나를 고치면 그 문단이 든 블록
+(segment_size 글자 + 문단 하나 정도)만 다시 분석함
+전체 분석 결과는 구간 결과를 합쳐 다시 만들고(patch), 다시 분석한 구간만 합친 결과는 delta로 돌려줌
+"""
+
+import bisect
+import difflib
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+from .manuscripts import content_hash
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """줄바꿈을 포함한 문단(줄) 목록 (이어 붙이면 원문과 같음)"""
+    return text.splitlines(keepends=True)
+
+
+def paragraph_hash(paragraph: str) -> str:
+    return hashlib.blake2b(paragraph.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _is_empty(value: Any) -> bool:
+    return value in (None, '', [], {}, '미정')
+
+
+def merge_analyses(parts: Iterable[Tuple[int, int, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    구간별 내용 분석 결과(OpenAI 분석 형식 포함)를 하나로 합침
+
+    - characters/world_elements: 이름(name/title)으로 합치고, 비어 있는 필드는 뒤 구간 값으로 채움
+      first_mention은 구간 시작 위치만큼 옮기고, mention_count는 더함
+    - events: 순서대로 이어 붙이되 (title, date, description)이 같은 이벤트는 한 번만
+    - locations/themes: 순서를 유지한 합집합
+    - 그 밖의 키(story_structure 등)는 원고 전체에 대한 값이므로 가장 긴 구간의 값을 쓰고,
+      딕셔너리 값은 필드마다 값이 있는 구간 중 가장 긴 구간의 것을 씀
+
+    Args:
+        parts: 텍스트 순서대로 (구간 시작 위치, 구간 끝 위치, 구간 분석 결과)
+    """
+    merged: Dict[str, Any] = {}
+    merged_lengths: Dict[Any, int] = {}  # 키 또는 (키, 필드) -> 값을 가져온 구간 길이
+    named = {"characters": {}, "world_elements": {}}
+    events = []
+    seen_events = set()
+    ordered = {"locations": {}, "themes": {}}
+    for base, end, analysis in parts:
+        length = end - base
+        for key, value in analysis.items():
+            if key in named:
+                for item in value or []:
+                    if not isinstance(item, dict):
+                        continue
+                    name = item.get('name') or item.get('title')
+                    current = named[key].get(name)
+                    if current is None:
+                        item = dict(item)
+                        if isinstance(item.get('first_mention'), int) and item['first_mention'] >= 0:
+                            item['first_mention'] += base
+                        named[key][name] = item
+                        continue
+                    if isinstance(item.get('mention_count'), int):
+                        current['mention_count'] = current.get('mention_count', 0) + item['mention_count']
+                    for field, field_value in item.items():
+                        if field not in ('first_mention', 'mention_count') and _is_empty(current.get(field)) \
+                                and not _is_empty(field_value):
+                            current[field] = field_value
+            elif key == 'events':
+                for event in value or []:
+                    identity = json.dumps([event.get('title'), event.get('date'), event.get('description')],
+                                          ensure_ascii=False) if isinstance(event, dict) else repr(event)
+                    if identity not in seen_events:
+                        seen_events.add(identity)
+                        events.append(event)
+            elif key in ordered:
+                for item in value or []:
+                    ordered[key].setdefault(item, None)
+            elif isinstance(value, dict):
+                fields = merged[key] if isinstance(merged.get(key), dict) else {}
+                for field, field_value in value.items():
+                    if not _is_empty(field_value) and length > merged_lengths.get((key, field), -1):
+                        fields[field] = field_value
+                        merged_lengths[(key, field)] = length
+                if fields:
+                    merged[key] = fields
+            elif not _is_empty(value) and length > merged_lengths.get(key, -1):
+                merged[key] = value
+                merged_lengths[key] = length
+    merged["characters"] = list(named["characters"].values())
+    merged["world_elements"] = list(named["world_elements"].values())
+    merged["events"] = events
+    merged["locations"] = list(ordered["locations"])
+    merged["themes"] = list(ordered["themes"])
+    return merged
+
+
+class AnalysisStore:
+    """
+    원고 파일별 마지막 분석 상태 저장소
+
+    저장 형식:
+        {"file_name": 이름, "content_hash": 전체 해시, "paragraphs": [문단 해시, ...],
+         "segments": [{"start": 첫 문단 번호, "end": 끝 문단 번호(미포함), "analysis": 구간 분석 결과}, ...],
+         "result": 마지막 분석 결과 전체(충돌/추천 포함)}
+    """
+
+    ANALYSIS_DIR = '.analysis'
+
+    def __init__(self, database_path: str = "Database", analyzer_name: str = "default"):
+        self.database_path = Path(database_path)
+        self.analyzer_name = analyzer_name
+        self._lock = threading.Lock()
+
+    def state_path(self, novel_name: str, file_name: str) -> Path:
+        name_digest = hashlib.sha1(file_name.encode('utf-8')).hexdigest()[:20]
+        return self.database_path / novel_name / self.ANALYSIS_DIR / self.analyzer_name / f"{name_digest}.json"
+
+    def load(self, novel_name: str, file_name: str) -> Optional[Dict[str, Any]]:
+        path = self.state_path(novel_name, file_name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"분석 상태 파일 읽기 오류 {path}: {e}")
+            return None
+        return state if state.get('file_name') == file_name else None
+
+    def save(self, novel_name: str, file_name: str, state: Dict[str, Any]):
+        path = self.state_path(novel_name, file_name)
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def delete(self, novel_name: str, file_name: str):
+        path = self.state_path(novel_name, file_name)
+        if path.exists():
+            path.unlink()
+
+
+class IncrementalAnalysis:
+    """
+    문단 diff 기반 증분 분석
+
+    Args:
+        store: 분석 상태 저장소
+        analyze: 텍스트 구간 -> 내용 분석 결과
+        merge: [(구간 시작 위치, 구간 끝 위치, 구간 분석 결과), ...] -> 합친 분석 결과 (기본 merge_analyses)
+        segment_size: 구간(블록) 크기(글자), 블록은 이 크기를 넘긴 문단 끝에서 끊음
+            작을수록 수정 때 다시 분석하는 범위가 좁고, 클수록 분석 호출 수가 적음
+    """
+
+    def __init__(self, store: AnalysisStore, analyze: Callable[[str], Dict[str, Any]],
+                 merge: Callable[[Iterable[Tuple[int, int, Dict[str, Any]]]], Dict[str, Any]] = merge_analyses,
+                 segment_size: int = 8000):
+        self.store = store
+        self.analyze = analyze
+        self.merge = merge
+        self.segment_size = segment_size
+
+    def _blocks(self, start: int, end: int, offsets: List[int]) -> List[Tuple[int, int]]:
+        """문단 범위 [start, end)를 segment_size 글자를 넘긴 문단 끝에서 끊은 블록 목록"""
+        blocks = []
+        while start < end:
+            block_end = bisect.bisect_left(offsets, offsets[start] + self.segment_size, start + 1, end)
+            blocks.append((start, block_end))
+            start = block_end
+        return blocks
+
+    def _plan(self, previous: Dict[str, Any], hashes: List[str],
+              offsets: List[int]) -> Tuple[List[Dict[str, Any]], List[Tuple[int, int]]]:
+        """
+        이전 구간과 새 문단을 비교해 (재사용할 구간, 다시 분석할 문단 범위 목록)을 정함
+
+        - 모든 문단이 그대로 이어져 남아 있는 이전 구간은 분석 결과를 재사용
+        - 나머지 문단(바뀐 문단과 수정된 구간에 함께 들었던 문단)은 이어진 범위마다 블록으로 나눠 다시 분석
+        """
+        old_hashes = previous['paragraphs']
+        # 같은 앞뒤 부분은 그대로 맞추고 가운데만 diff (반복되는 문단 때문에 어긋나게 맞춰지지 않도록)
+        prefix = 0
+        limit = min(len(old_hashes), len(hashes))
+        while prefix < limit and old_hashes[prefix] == hashes[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old_hashes[-1 - suffix] == hashes[-1 - suffix]:
+            suffix += 1
+        old_to_new = {index: index for index in range(prefix)}
+        for offset in range(1, suffix + 1):
+            old_to_new[len(old_hashes) - offset] = len(hashes) - offset
+        matcher = difflib.SequenceMatcher(None, old_hashes[prefix:len(old_hashes) - suffix],
+                                          hashes[prefix:len(hashes) - suffix], autojunk=False)
+        for tag, old_start, old_end, new_start, _ in matcher.get_opcodes():
+            if tag == 'equal':
+                for offset in range(old_end - old_start):
+                    old_to_new[prefix + old_start + offset] = prefix + new_start + offset
+
+        kept = []
+        covered = [False] * len(hashes)
+        for segment in previous['segments']:
+            start, end = segment['start'], segment['end']
+            new_start = old_to_new.get(start)
+            if new_start is not None and all(old_to_new.get(index) == new_start + index - start
+                                             for index in range(start, end)):
+                kept.append({"start": new_start, "end": new_start + end - start, "analysis": segment['analysis']})
+                for index in range(new_start, new_start + end - start):
+                    covered[index] = True
+
+        ranges = []
+        start = None
+        for index in range(len(hashes) + 1):
+            if index < len(hashes) and not covered[index]:
+                if start is None:
+                    start = index
+            elif start is not None:
+                ranges.extend(self._blocks(start, index, offsets))
+                start = None
+        kept.sort(key=lambda segment: segment['start'])
+        return kept, ranges
+
+    def run(self, novel_name: str, file_name: str, content: str, reuse: bool = True) -> Dict[str, Any]:
+        """
+        원고를 분석 (이전 분석 상태가 있으면 바뀐 구간만 다시 분석)
+
+        Args:
+            reuse: False면 이전 분석 상태를 쓰지 않고 전체를 다시 분석 (removed는 이전 결과와 비교함)
+
+        Returns:
+            {"content_analysis": 전체 분석 결과, "delta_analysis": 다시 분석한 구간만 합친 결과,
+             "unchanged": 이전 분석과 내용이 같으면 True, "previous_result": 이전 분석 결과 전체(없으면 None),
+             "removed": {"characters": [...], "world_elements": [...]} 수정으로 사라진 이름,
+             "stats": {"paragraphs", "reanalyzed_paragraphs", "segments", "reanalyzed_segments"},
+             "state": save_result()에 넘길 새 분석 상태}
+        """
+        previous = self.store.load(novel_name, file_name)
+        full_hash = content_hash(content)
+        if reuse and previous is not None and previous.get('content_hash') == full_hash \
+                and previous.get('result') is not None:
+            return {
+                "content_analysis": previous['result'].get('content_analysis', {}),
+                "delta_analysis": None,
+                "unchanged": True,
+                "previous_result": previous['result'],
+                "removed": {"characters": [], "world_elements": []},
+                "stats": {"paragraphs": len(previous['paragraphs']), "reanalyzed_paragraphs": 0,
+                          "segments": len(previous['segments']), "reanalyzed_segments": 0},
+                "state": previous,
+            }
+
+        paragraphs = split_paragraphs(content)
+        hashes = [paragraph_hash(paragraph) for paragraph in paragraphs]
+        offsets = [0]
+        for paragraph in paragraphs:
+            offsets.append(offsets[-1] + len(paragraph))
+
+        if reuse and previous is not None:
+            kept, ranges = self._plan(previous, hashes, offsets)
+        else:
+            # 처음 분석하는 원고도 블록으로 나눠 분석해 두어야 다음 수정 때 바뀐 블록만 다시 분석할 수 있음
+            kept, ranges = [], self._blocks(0, len(paragraphs), offsets)
+
+        reanalyzed = []
+        for start, end in ranges:
+            analysis = self.analyze(''.join(paragraphs[start:end]))
+            reanalyzed.append({"start": start, "end": end, "analysis": analysis})
+        segments = sorted(kept + reanalyzed, key=lambda segment: segment['start'])
+
+        content_analysis = self.merge((offsets[segment['start']], offsets[segment['end']], segment['analysis'])
+                                      for segment in segments)
+        delta_analysis = self.merge((offsets[segment['start']], offsets[segment['end']], segment['analysis'])
+                                    for segment in reanalyzed)
+
+        removed = {"characters": [], "world_elements": []}
+        previous_result = previous.get('result') if previous is not None else None
+        if previous_result:
+            previous_analysis = previous_result.get('content_analysis', {})
+            for key in removed:
+                current_names = {item.get('name') or item.get('title') for item in content_analysis.get(key, [])
+                                 if isinstance(item, dict)}
+                removed[key] = [item.get('name') or item.get('title') for item in previous_analysis.get(key, [])
+                                if isinstance(item, dict) and (item.get('name') or item.get('title')) not in current_names]
+
+        return {
+            "content_analysis": content_analysis,
+            "delta_analysis": delta_analysis,
+            "unchanged": False,
+            "previous_result": previous_result,
+            "removed": removed,
+            "stats": {
+                "paragraphs": len(paragraphs),
+                "reanalyzed_paragraphs": sum(segment['end'] - segment['start'] for segment in reanalyzed),
+                "segments": len(segments),
+                "reanalyzed_segments": len(reanalyzed),
+            },
+            "state": {
+                "file_name": file_name,
+                "content_hash": full_hash,
+                "paragraphs": hashes,
+                "segments": segments,
+                "result": None,
+            },
+        }
+
+    def save_result(self, novel_name: str, file_name: str, run_result: Dict[str, Any], analysis_result: Dict[str, Any]):
+        """분석이 끝난 뒤 전체 결과와 함께 상태 저장 (다음 분석의 비교 기준)"""
+        state = dict(run_result['state'])
+        state['result'] = analysis_result
+        self.store.save(novel_name, file_name, state)
@@ -0,0 +1,119 @@
+"""
+여러 키워드를 한 번의 훑기로 찾는 Aho-Corasick 매처
+
+키워드 목록으로 오토마톤을 한 번 만들어 두면 키워드 수와 관계없이 텍스트를 한 번만 훑어
+모든 키워드 등장 위치(겹치는 것 포함)를 찾음
+"""
+
+import re
+from typing import Dict, List, Iterable, Iterator, Tuple, Set, Union
+
+from .document import Document
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 다중 키워드 매처
+
+    Args:
+        keywords: 찾을 키워드 목록 (중복/빈 문자열은 무시, 순서는 priority()에 쓰임)
+        ignore_case: True면 대소문자를 구분하지 않음 (Document를 넘기면 Document.lower를 훑음)
+    """
+
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.keywords: List[str] = []
+        self._priority: Dict[str, int] = {}
+        for keyword in keywords:
+            if ignore_case:
+                keyword = keyword.lower()
+            if keyword and keyword not in self._priority:
+                self._priority[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+        self._build()
+
+    def _build(self):
+        # goto[상태]: 문자 -> 다음 상태, output[상태]: 이 상태에서 끝나는 키워드 번호들
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Tuple[int, ...]] = [()]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    output.append(())
+                state = next_state
+            output[state] = output[state] + (index,)
+
+        # 너비 우선으로 실패 링크를 만들고 실패 상태의 출력을 합침
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(ch, 0)
+                output[next_state] = output[next_state] + output[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+        # 루트 상태에서는 키워드 첫 글자가 나올 때까지 정규식으로 건너뜀
+        first_chars = ''.join(goto[0])
+        self._start_re = re.compile(f"[{re.escape(first_chars)}]") if first_chars else None
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _text(self, text: Union[str, Document]) -> str:
+        if isinstance(text, Document):
+            return text.lower if self.ignore_case else text.text
+        return text.lower() if self.ignore_case else text
+
+    def finditer(self, text: Union[str, Document]) -> Iterator[Tuple[int, int, str]]:
+        """모든 키워드 등장을 (시작, 끝, 키워드)로 끝 위치 순서대로 반환 (겹치는 등장 포함)"""
+        if self._start_re is None:
+            return
+        text = self._text(text)
+        goto, fail, output, keywords = self._goto, self._fail, self._output, self.keywords
+        search_start = self._start_re.search
+        length = len(text)
+        state = 0
+        position = 0
+        while position < length:
+            if state == 0:
+                match = search_start(text, position)
+                if match is None:
+                    return
+                position = match.start()
+            ch = text[position]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            position += 1
+            for index in output[state]:
+                keyword = keywords[index]
+                yield position - len(keyword), position, keyword
+
+    def findall(self, text: Union[str, Document]) -> List[Tuple[int, int, str]]:
+        return list(self.finditer(text))
+
+    def found(self, text: Union[str, Document]) -> Set[str]:
+        """텍스트에 등장하는 키워드 집합"""
+        return {keyword for _, _, keyword in self.finditer(text)}
+
+    def search(self, text: Union[str, Document]) -> bool:
+        """키워드가 하나라도 있으면 True (첫 등장에서 멈춤)"""
+        return next(self.finditer(text), None) is not None
+
+    def priority(self, keyword: str) -> int:
+        """키워드 목록에서의 순서 (앞일수록 작음)"""
+        return self._priority[keyword.lower() if self.ignore_case else keyword]
@@ -0,0 +1,515 @@
+"""
+소설 원고(Database/<소설>/Files) 저장소
+
+원고를 문단 경계에서 조각(chunk)으로 나누고 조각마다 SHA-256 해시를 이름으로 하는 blob으로 저장
+- Database/<소설>/.blobs/<해시 앞 2자리>/<해시>: 조각 내용 (같은 내용은 한 번만 저장)
+- Database/<소설>/.manifests/<이름 해시>.json: 파일 하나의 이름, 전체 해시, 조각 해시 목록
+조각 경계는 문단 내용으로 정해지므로 한 문단을 고치면 그 문단이 든 조각만 새로 기록됨
+기존 방식으로 Files/에 그대로 저장된 원고도 읽을 수 있으며, 다시 저장할 때 조각 저장소로 옮겨짐
+저장/삭제 후 원고 수와 전체 크기를 서재 카탈로그(LibraryCatalog)에 반영함
+open()은 원고 전체를 문자열로 만들지 않고 구간/장(chapter)/창(window) 단위로 읽는 ManuscriptView를 반환함
+"""
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from .catalog import LibraryCatalog
+
+
+def content_hash(content: str) -> str:
+    """원고 전체 내용의 해시 (분석 결과 캐시 키 등으로 사용)"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+# 장(chapter) 제목: "제3장 만남", "12화", "Chapter 4: ...", "프롤로그", 마크다운 제목 등
+CHAPTER_TITLE = (
+    r'(?:#{1,3}\s+\S.*'
+    r'|제\s*\d+\s*[장화편부](?:\s+.{0,30})?'
+    r'|(?:\d+\s*[장화]|chapter\s+\d+|프롤로그|에필로그|prologue|epilogue)(?:\s*[:.\-]\s*.{0,30})?)'
+)
+
+# 줄 하나가 장 제목인지 (한 줄 전체가 제목이어야 함)
+CHAPTER_PATTERN = re.compile(r'^\s*' + CHAPTER_TITLE + r'\s*$', re.IGNORECASE)
+
+# 여러 줄 텍스트에서 장 제목 줄을 찾는 패턴 (앞뒤 공백이 줄을 넘지 않음)
+CHAPTER_LINE_PATTERN = re.compile(r'^[ \t]*' + CHAPTER_TITLE + r'[ \t]*$', re.IGNORECASE | re.MULTILINE)
+
+
+class ManuscriptView:
+    """
+    원고 하나를 통째로 문자열로 만들지 않고 읽는 접근자 (ManuscriptStore.open()으로 생성)
+
+    Files/의 원고는 파일을 mmap으로 열고 BLOCK_SIZE 단위 블록으로, 조각 저장소의 원고는 조각 하나를 블록 하나로 다룸
+    바이트 구간은 해당 블록만 복사하고, 문자 구간은 처음 요청할 때 블록마다 시작 문자 위치를 한 번 세어 둔 뒤
+    필요한 블록만 디코딩함
+    """
+
+    BLOCK_SIZE = 65536
+
+    def __init__(self, legacy_path: Optional[Path] = None, blob_paths: Optional[List[Path]] = None):
+        self._file = None
+        self._map = None
+        self._blob_paths = blob_paths or []
+        self._byte_starts = []  # 블록별 시작 바이트 위치 (마지막에 전체 크기 추가)
+        self._char_starts = None  # 블록별 시작 문자 위치 (마지막에 전체 문자 수 추가)
+        self._cached_block = (None, b'')
+        if legacy_path is not None:
+            self._file = open(legacy_path, 'rb')
+            size = os.fstat(self._file.fileno()).st_size
+            if size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            position = 0
+            while position < size:
+                self._byte_starts.append(position)
+                position = min(position + self.BLOCK_SIZE, size)
+                # 블록 경계가 UTF-8 문자 중간에 오지 않게 뒤로 밂
+                while position < size and (self._map[position] & 0xC0) == 0x80:
+                    position += 1
+            self._byte_starts.append(size)
+        else:
+            position = 0
+            for path in self._blob_paths:
+                self._byte_starts.append(position)
+                position += path.stat().st_size
+            self._byte_starts.append(position)
+
+    def __enter__(self) -> "ManuscriptView":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def size(self) -> int:
+        """원고 크기(바이트)"""
+        return self._byte_starts[-1]
+
+    @property
+    def block_count(self) -> int:
+        return len(self._byte_starts) - 1
+
+    def _block(self, index: int) -> bytes:
+        if self._map is not None:
+            return self._map[self._byte_starts[index]:self._byte_starts[index + 1]]
+        cached_index, data = self._cached_block
+        if cached_index != index:
+            with open(self._blob_paths[index], 'rb') as f:
+                data = f.read()
+            self._cached_block = (index, data)
+        return data
+
+    def iter_blocks(self) -> Iterator[bytes]:
+        """블록 단위 바이트 (각 블록은 UTF-8 문자 경계에서 끝남)"""
+        for index in range(self.block_count):
+            yield self._block(index)
+
+    def byte_slice(self, start: int, end: Optional[int] = None) -> bytes:
+        """바이트 구간 [start, end)"""
+        end = self.size if end is None else min(end, self.size)
+        if start >= end:
+            return b''
+        if self._map is not None:
+            return self._map[start:end]
+        parts = []
+        index = bisect.bisect_right(self._byte_starts, start) - 1
+        while index < self.block_count and self._byte_starts[index] < end:
+            block_start = self._byte_starts[index]
+            parts.append(self._block(index)[max(start - block_start, 0):end - block_start])
+            index += 1
+        return b''.join(parts)
+
+    def _ensure_char_index(self):
+        if self._char_starts is not None:
+            return
+        char_starts = []
+        position = 0
+        for block in self.iter_blocks():
+            char_starts.append(position)
+            position += len(block.decode('utf-8'))
+        char_starts.append(position)
+        self._char_starts = char_starts
+
+    def char_length(self) -> int:
+        """원고 글자 수"""
+        self._ensure_char_index()
+        return self._char_starts[-1]
+
+    def char_slice(self, start: int, end: Optional[int] = None) -> str:
+        """문자 구간 [start, end) - 겹치는 블록만 디코딩"""
+        self._ensure_char_index()
+        end = self._char_starts[-1] if end is None else min(end, self._char_starts[-1])
+        if start >= end:
+            return ''
+        parts = []
+        index = bisect.bisect_right(self._char_starts, start) - 1
+        while index < self.block_count and self._char_starts[index] < end:
+            block_start = self._char_starts[index]
+            text = self._block(index).decode('utf-8')
+            parts.append(text[max(start - block_start, 0):end - block_start])
+            index += 1
+        return ''.join(parts)
+
+    def iter_lines(self) -> Iterator[str]:
+        """줄 단위 문자열 (줄바꿈 포함, 블록 경계에 걸친 줄도 한 줄로)"""
+        pending = b''
+        for block in self.iter_blocks():
+            data = pending + block if pending else block
+            start = 0
+            while True:
+                newline = data.find(b'\n', start)
+                if newline == -1:
+                    break
+                yield data[start:newline + 1].decode('utf-8')
+                start = newline + 1
+            pending = data[start:]
+        if pending:
+            yield pending.decode('utf-8')
+
+    def iter_windows(self, size: int, overlap: int = 0) -> Iterator[Tuple[int, str]]:
+        """
+        size 글자씩 잘라 (시작 문자 위치, 텍스트) 반환
+
+        Args:
+            size: 창 크기(글자)
+            overlap: 앞 창과 겹치는 글자 수 (창 경계에 걸친 문장을 놓치지 않게 할 때)
+        """
+        if size <= overlap:
+            raise ValueError("창 크기는 겹치는 글자 수보다 커야 합니다")
+        total = self.char_length()
+        start = 0
+        while start < total:
+            yield start, self.char_slice(start, start + size)
+            if start + size >= total:
+                break
+            start += size - overlap
+
+    def iter_chapters(self, pattern: "re.Pattern" = CHAPTER_PATTERN) -> Iterator[Tuple[str, int, str]]:
+        """
+        장 제목 줄(pattern)을 기준으로 나눠 (제목, 시작 문자 위치, 텍스트)를 한 장씩 반환
+
+        첫 제목 앞의 내용은 제목 ''인 장으로 반환하며, 제목 줄이 없으면 원고 전체가 한 장
+        """
+        title = ''
+        chapter_start = 0
+        lines = []
+        position = 0
+        for line in self.iter_lines():
+            if pattern.match(line):
+                if lines:
+                    yield title, chapter_start, ''.join(lines)
+                title = line.strip()
+                chapter_start = position
+                lines = []
+            lines.append(line)
+            position += len(line)
+        if lines:
+            yield title, chapter_start, ''.join(lines)
+
+
+class ManuscriptStore:
+    """
+    내용 주소 기반(content-addressed) 원고 저장소
+
+    조각 기록과 정리가 같은 잠금을 써야 하므로 Database 폴더별 공유 인스턴스(shared())로 사용함
+
+    Args:
+        database_path: Database 폴더 경로
+        min_chunk: 조각 최소 크기(바이트), 이보다 작으면 경계를 만들지 않음
+        max_chunk: 조각 최대 크기(바이트), 넘으면 문단 끝에서 강제로 자름
+        boundary_modulus: 문단 해시가 이 값으로 나누어떨어지면 조각 경계로 삼음 (클수록 조각이 큼)
+    """
+
+    FILES_DIR = 'Files'
+    BLOBS_DIR = '.blobs'
+    MANIFESTS_DIR = '.manifests'
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, database_path: str = "Database", min_chunk: int = 4096,
+                 max_chunk: int = 65536, boundary_modulus: int = 16):
+        self.database_path = Path(database_path)
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.boundary_modulus = boundary_modulus
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, database_path: str = "Database", **kwargs) -> "ManuscriptStore":
+        """Database 폴더별로 하나의 인스턴스를 공유"""
+        key = str(Path(database_path).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(database_path, **kwargs)
+            instance = cls._instances[key]
+        for name, value in kwargs.items():
+            setattr(instance, name, value)
+        return instance
+
+    def _novel_dir(self, novel_name: str) -> Path:
+        return self.database_path / novel_name
+
+    def _blob_path(self, novel_name: str, digest: str) -> Path:
+        return self._novel_dir(novel_name) / self.BLOBS_DIR / digest[:2] / digest
+
+    def _manifest_path(self, novel_name: str, file_name: str) -> Path:
+        name_digest = hashlib.sha1(file_name.encode('utf-8')).hexdigest()[:20]
+        return self._novel_dir(novel_name) / self.MANIFESTS_DIR / f"{name_digest}.json"
+
+    def _legacy_path(self, novel_name: str, file_name: str) -> Path:
+        return self._novel_dir(novel_name) / self.FILES_DIR / file_name
+
+    def chunk(self, content: str) -> List[bytes]:
+        """
+        내용을 문단(줄) 경계에서 조각으로 나눔
+
+        경계 여부는 그 줄의 내용만으로 정해지므로 앞부분을 고쳐도 뒤쪽 조각 경계는 그대로 유지됨
+        """
+        data = content.encode('utf-8')
+        chunks = []
+        start = 0
+        position = 0
+        length = len(data)
+        while position < length:
+            newline = data.find(b'\n', position)
+            line_end = length if newline == -1 else newline + 1
+            size = line_end - start
+            if size >= self.max_chunk and line_end - position > self.max_chunk:
+                # 줄바꿈 없는 아주 긴 줄은 최대 크기로 자름 (UTF-8 문자 중간을 피함)
+                if position > start:
+                    chunks.append(data[start:position])
+                    start = position
+                cut = start + self.max_chunk
+                while cut < line_end and (data[cut] & 0xC0) == 0x80:
+                    cut += 1
+                chunks.append(data[start:cut])
+                start = position = cut
+                continue
+            if size >= self.max_chunk or (
+                    size >= self.min_chunk
+                    and zlib.crc32(data[position:line_end]) % self.boundary_modulus == 0):
+                chunks.append(data[start:line_end])
+                start = line_end
+            position = line_end
+        if start < length:
+            chunks.append(data[start:])
+        return chunks
+
+    def _read_manifest(self, novel_name: str, file_name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._manifest_path(novel_name, file_name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_atomic(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def list_files(self, novel_name: str) -> List[str]:
+        """원고 파일 이름 목록 (조각 저장소 + 기존 Files/ 폴더, 이름순)"""
+        names = set()
+        manifest_dir = self._novel_dir(novel_name) / self.MANIFESTS_DIR
+        if manifest_dir.exists():
+            for path in manifest_dir.glob('*.json'):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        names.add(json.load(f)['name'])
+                except Exception as e:
+                    print(f"원고 목록 파일 읽기 오류 {path}: {e}")
+        files_dir = self._novel_dir(novel_name) / self.FILES_DIR
+        if files_dir.exists():
+            names.update(file.name for file in files_dir.iterdir() if file.is_file())
+        return sorted(names)
+
+    def stats(self, novel_name: str) -> Dict[str, int]:
+        """원고 수와 전체 크기 {"files": 원고 수, "bytes": 전체 바이트} (조각 내용은 읽지 않음)"""
+        sizes = {}
+        manifest_dir = self._novel_dir(novel_name) / self.MANIFESTS_DIR
+        if manifest_dir.exists():
+            for path in manifest_dir.glob('*.json'):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        manifest = json.load(f)
+                    sizes[manifest['name']] = manifest['size']
+                except Exception as e:
+                    print(f"원고 목록 파일 읽기 오류 {path}: {e}")
+        files_dir = self._novel_dir(novel_name) / self.FILES_DIR
+        if files_dir.exists():
+            for file in files_dir.iterdir():
+                if file.is_file():
+                    sizes.setdefault(file.name, file.stat().st_size)
+        return {"files": len(sizes), "bytes": sum(sizes.values())}
+
+    def _update_catalog(self, novel_name: str):
+        try:
+            LibraryCatalog.shared(self.database_path).update(novel_name, manuscripts=self.stats(novel_name))
+        except Exception as e:
+            print(f"카탈로그 갱신 오류 {novel_name}: {e}")
+
+    def read(self, novel_name: str, file_name: str) -> Optional[str]:
+        """원고 내용 (없으면 None)"""
+        manifest = self._read_manifest(novel_name, file_name)
+        if manifest is None:
+            legacy_path = self._legacy_path(novel_name, file_name)
+            if not legacy_path.is_file():
+                return None
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        parts = []
+        for digest in manifest['chunks']:
+            with open(self._blob_path(novel_name, digest), 'rb') as f:
+                parts.append(f.read())
+        return b''.join(parts).decode('utf-8')
+
+    def open(self, novel_name: str, file_name: str) -> Optional[ManuscriptView]:
+        """원고를 문자열로 읽지 않고 여는 접근자 (없으면 None, with 문으로 닫음)"""
+        manifest = self._read_manifest(novel_name, file_name)
+        if manifest is not None:
+            return ManuscriptView(blob_paths=[self._blob_path(novel_name, digest) for digest in manifest['chunks']])
+        legacy_path = self._legacy_path(novel_name, file_name)
+        if legacy_path.is_file():
+            return ManuscriptView(legacy_path=legacy_path)
+        return None
+
+    def size(self, novel_name: str, file_name: str) -> Optional[int]:
+        """원고 크기(바이트, 없으면 None) - 내용을 읽지 않음"""
+        manifest = self._read_manifest(novel_name, file_name)
+        if manifest is not None:
+            return manifest['size']
+        legacy_path = self._legacy_path(novel_name, file_name)
+        return legacy_path.stat().st_size if legacy_path.is_file() else None
+
+    def iter_chunks(self, novel_name: str, file_name: str) -> Iterator[bytes]:
+        """원고 내용을 조각 단위 UTF-8 바이트로 반환 (원고 전체를 메모리에 올리지 않음, 없으면 빈 반복)"""
+        manifest = self._read_manifest(novel_name, file_name)
+        if manifest is None:
+            legacy_path = self._legacy_path(novel_name, file_name)
+            if legacy_path.is_file():
+                with open(legacy_path, 'rb') as f:
+                    while True:
+                        block = f.read(self.max_chunk)
+                        if not block:
+                            break
+                        yield block
+            return
+        for digest in manifest['chunks']:
+            with open(self._blob_path(novel_name, digest), 'rb') as f:
+                yield f.read()
+
+    def content_hash(self, novel_name: str, file_name: str) -> Optional[str]:
+        """원고 전체 해시 (조각 저장소의 원고는 내용을 읽지 않고 manifest에서 가져옴)"""
+        manifest = self._read_manifest(novel_name, file_name)
+        if manifest is not None:
+            return manifest['hash']
+        content = self.read(novel_name, file_name)
+        return None if content is None else content_hash(content)
+
+    def write(self, novel_name: str, file_name: str, content: str) -> Dict[str, Any]:
+        """
+        원고 저장 - 이미 있는 조각은 다시 쓰지 않고, 기존 원고를 고쳐 쓰면 더 이상 참조되지 않는 이전 조각을 지움
+
+        Returns:
+            {"hash": 전체 해시, "chunks": 조각 수, "written": 새로 기록한 조각 수, "bytes_written": 기록한 바이트}
+        """
+        chunks = self.chunk(content)
+        digests = [hashlib.sha256(chunk).hexdigest() for chunk in chunks]
+        full_hash = content_hash(content)
+        written = 0
+        bytes_written = 0
+        with self._lock:
+            for digest, chunk in zip(digests, chunks):
+                blob_path = self._blob_path(novel_name, digest)
+                if not blob_path.exists():
+                    self._write_atomic(blob_path, chunk)
+                    written += 1
+                    bytes_written += len(chunk)
+            manifest = self._read_manifest(novel_name, file_name)
+            if manifest is None or manifest['hash'] != full_hash:
+                # 조각을 모두 기록한 뒤 manifest를 교체해야 읽는 쪽이 빠진 조각을 보지 않음
+                payload = {"name": file_name, "hash": full_hash, "size": len(content.encode('utf-8')), "chunks": digests}
+                self._write_atomic(self._manifest_path(novel_name, file_name),
+                                   json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+                if manifest is not None:
+                    self._remove_unreferenced(novel_name, set(manifest['chunks']) - set(digests))
+            legacy_path = self._legacy_path(novel_name, file_name)
+            if legacy_path.is_file():
+                legacy_path.unlink()
+        self._update_catalog(novel_name)
+        return {"hash": full_hash, "chunks": len(chunks), "written": written, "bytes_written": bytes_written}
+
+    def delete(self, novel_name: str, file_name: str) -> bool:
+        """원고 삭제 후 더 이상 참조되지 않는 조각 정리"""
+        deleted = False
+        with self._lock:
+            manifest_path = self._manifest_path(novel_name, file_name)
+            if manifest_path.exists():
+                manifest_path.unlink()
+                deleted = True
+            legacy_path = self._legacy_path(novel_name, file_name)
+            if legacy_path.is_file():
+                legacy_path.unlink()
+                deleted = True
+        if deleted:
+            self.collect_garbage(novel_name)
+            self._update_catalog(novel_name)
+        return deleted
+
+    def collect_garbage(self, novel_name: str) -> int:
+        """어떤 manifest도 참조하지 않는 조각을 지우고 지운 수 반환"""
+        with self._lock:
+            return self._remove_unreferenced(novel_name)
+
+    def _remove_unreferenced(self, novel_name: str, candidates: Optional[set] = None) -> int:
+        """
+        어떤 manifest도 참조하지 않는 조각 삭제 (잠금을 잡은 상태에서 호출)
+
+        Args:
+            candidates: 확인할 조각 해시 (None이면 모든 조각)
+        """
+        if candidates is not None and not candidates:
+            return 0
+        referenced = set()
+        manifest_dir = self._novel_dir(novel_name) / self.MANIFESTS_DIR
+        if manifest_dir.exists():
+            for path in manifest_dir.glob('*.json'):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        referenced.update(json.load(f)['chunks'])
+                except Exception as e:
+                    # manifest를 읽지 못하면 조각을 지우지 않음
+                    print(f"원고 목록 파일 읽기 오류 {path}: {e}")
+                    return 0
+        removed = 0
+        if candidates is None:
+            blob_dir = self._novel_dir(novel_name) / self.BLOBS_DIR
+            paths = blob_dir.glob('*/*') if blob_dir.exists() else []
+        else:
+            paths = [self._blob_path(novel_name, digest) for digest in candidates]
+        for path in paths:
+            if path.name not in referenced and not path.name.endswith('.tmp'):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                removed += 1
+        return removed
@@ -5,6 +5,9 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 from .utils import DatabaseManager
 from .config import AgentConfig
+from .incremental import AnalysisStore, IncrementalAnalysis
+from .analysis_cache import AnalysisCache
+from .manuscripts import content_hash
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -12,11 +15,14 @@ class OpenAINovelAnalysisAgent:
     """
     OpenAI API를 활용한 소설 파일 분석 에이전트
     """
+
+    # 프롬프트/모델/결과 형식이 바뀌면 올려서 이전에 캐시된 결과를 쓰지 않게 함
+    PROMPT_VERSION = 1
     
     def __init__(self, api_key: str = None, database_path: str = "Database"):
         self.database_path = Path(database_path)
-        self.db_manager = DatabaseManager(database_path)
         self.config = AgentConfig()
+        self.db_manager = DatabaseManager.from_config(database_path, self.config)
         
         # OpenAI API 키 설정
         if api_key:
@@ -25,8 +31,30 @@ class OpenAINovelAnalysisAgent:
             self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         else:
             raise ValueError("OpenAI API 키가 필요합니다. 환경변수 OPENAI_API_KEY를 설정하거나 api_key 매개변수를 전달하세요.")
+        
+        # 이전에 분석한 원고는 바뀐 문단이 든 구간만 OpenAI로 다시 분석
+        self.analysis_store = AnalysisStore(database_path, "openai")
+        # 원고와 DB가 그대로면 OpenAI를 다시 호출하지 않고 저장된 결과 사용
+        self.result_cache = AnalysisCache(
+            database_path,
+            self.config.get_analysis_setting("result_cache_max_entries", 128),
+            self.config.get_analysis_setting("result_cache_max_bytes", 64 * 1024 * 1024)
+        )
+
+    def _result_cache_key(self, novel_name: str, file_content: str) -> str:
+        """분석 결과 캐시 키: 원고 내용, 소설 DB 상태, 프롬프트 버전과 설정"""
+        return AnalysisCache.make_key(
+            analyzer="openai",
+            version=self.PROMPT_VERSION,
+            model="gpt-4o",
+            novel=novel_name,
+            content=content_hash(file_content),
+            database=self.db_manager.state_fingerprint(novel_name),
+            analysis_settings=self.config.analysis_settings
+        )
     
-    def analyze_new_file(self, novel_name: str, file_name: str, file_content: str, progress_callback=None) -> Dict[str, Any]:
+    def analyze_new_file(self, novel_name: str, file_name: str, file_content: str, progress_callback=None,
+                         force_refresh: bool = False) -> Dict[str, Any]:
         """
         OpenAI를 사용하여 새로 추가된 파일을 분석하고 결과를 반환
         
@@ -35,18 +63,35 @@ class OpenAINovelAnalysisAgent:
             file_name: 파일 이름
             file_content: 파일 내용
             progress_callback: 진행 메시지를 전달할 콜백 함수 (선택)
+            force_refresh: True면 캐시와 이전 분석 상태를 쓰지 않고 전체를 다시 분석
         
         Returns:
             분석 결과 딕셔너리
+
+        result_cache 설정이 켜져 있으면 원고 내용과 소설 DB가 그대로일 때 OpenAI를 호출하지 않고 저장된 결과를 반환함 (cached=True)
+        incremental_analysis 설정이 켜져 있으면 같은 파일의 이전 분석과 문단 단위로 비교해 바뀐 구간만 OpenAI로 다시 분석하고,
+        충돌/추천 분석에는 다시 분석한 부분(delta_analysis)만 넘김
+        원고가 그대로이고 DB만 바뀌었으면 이전 내용 분석을 그대로 쓰고 충돌/추천 분석만 전체 내용으로 다시 함 (unchanged=True)
         """
         try:
             if progress_callback:
                 progress_callback(f"🔍 분석 시작: {file_name}")
             print(f"🔍 분석 시작: {file_name}")
+
+            use_cache = self.config.get_analysis_setting("result_cache", True)
+            if use_cache:
+                cache_key = self._result_cache_key(novel_name, file_content)
+                cached = None if force_refresh else self.result_cache.get(cache_key)
+                if cached is not None:
+                    msg = "✅ 원고와 DB가 이전 분석 때와 같아 저장된 분석 결과를 사용합니다"
+                    if progress_callback:
+                        progress_callback(msg)
+                    print(msg)
+                    return dict(cached, file_name=file_name, cached=True)
             
-            # 1. 기존 데이터베이스 정보 수집
-            existing_data = self._collect_existing_data(novel_name)
-            msg = f"📊 기존 데이터 수집 완료: {len(existing_data)} 항목"
+            # 1. 기존 데이터베이스 정보 수집 (내용 분석에는 이름만 필요하므로 전체 레코드는 충돌 분석 직전에 읽음)
+            existing_names = self._collect_existing_names(novel_name)
+            msg = f"📊 기존 데이터 수집 완료: {sum(len(v) for v in existing_names.values())} 항목"
             if progress_callback:
                 progress_callback(msg)
             print(msg)
@@ -57,7 +102,27 @@ class OpenAINovelAnalysisAgent:
             print("🤖 OpenAI 분석 시작...")
             if progress_callback:
                 progress_callback("🤖 OpenAI API 호출 중...")
-            content_analysis = self._analyze_with_openai(file_content, existing_data)
+            incremental_run = None
+            if self.config.get_analysis_setting("incremental_analysis", True):
+                incremental = IncrementalAnalysis(
+                    self.analysis_store,
+                    lambda text: self._analyze_with_openai(text, existing_names),
+                    segment_size=self.config.get_analysis_setting("incremental_segment_size", 8000)
+                )
+                incremental_run = incremental.run(novel_name, file_name, file_content, reuse=not force_refresh)
+                content_analysis = incremental_run["content_analysis"]
+                # 원고가 그대로면 DB가 바뀐 것이므로 전체 내용으로 충돌/추천을 다시 분석
+                delta_analysis = incremental_run["delta_analysis"] or content_analysis
+                stats = incremental_run["stats"]
+                if incremental_run["unchanged"]:
+                    msg = "✅ 원고가 그대로여서 이전 내용 분석 결과를 사용합니다"
+                else:
+                    msg = f"✂️ 바뀐 문단만 분석: {stats['reanalyzed_paragraphs']}/{stats['paragraphs']} 문단 ({stats['reanalyzed_segments']}개 구간)"
+                if progress_callback:
+                    progress_callback(msg)
+                print(msg)
+            else:
+                content_analysis = delta_analysis = self._analyze_with_openai(file_content, existing_names)
             if progress_callback:
                 progress_callback("✅ OpenAI 응답 수신")
             msg = f"📋 파싱된 결과: {len(content_analysis)} 항목"
@@ -68,12 +133,13 @@ class OpenAINovelAnalysisAgent:
                 progress_callback(f"✅ 내용 분석 완료: {len(content_analysis)} 항목")
             
             # 3. 충돌 분석
+            existing_data = self._collect_existing_data(novel_name)
             if progress_callback:
                 progress_callback("⚠️ 충돌 분석 시작...")
             print("⚠️ 충돌 분석 시작...")
             if progress_callback:
                 progress_callback("🤖 충돌 분석 OpenAI API 호출 중...")
-            conflicts = self._analyze_conflicts_with_openai(content_analysis, existing_data)
+            conflicts = self._analyze_conflicts_with_openai(delta_analysis, existing_data)
             if progress_callback:
                 progress_callback("✅ 충돌 분석 OpenAI 응답 수신")
             msg = f"📋 충돌 분석 결과: {len(conflicts)} 항목"
@@ -89,7 +155,7 @@ class OpenAINovelAnalysisAgent:
             print("💡 추천 생성 시작...")
             if progress_callback:
                 progress_callback("🤖 추천 생성 OpenAI API 호출 중...")
-            recommendations = self._generate_recommendations_with_openai(content_analysis, existing_data, novel_name)
+            recommendations = self._generate_recommendations_with_openai(delta_analysis, existing_data, novel_name)
             if progress_callback:
                 progress_callback("✅ 추천 생성 OpenAI 응답 수신")
             msg = f"📋 추천 생성 결과: {len(recommendations)} 항목"
@@ -111,6 +177,14 @@ class OpenAINovelAnalysisAgent:
                 "recommendations": recommendations,
                 "summary": self._generate_summary_with_openai(content_analysis, conflicts, recommendations)
             }
+            if incremental_run is not None:
+                analysis_result["delta_analysis"] = delta_analysis
+                analysis_result["incremental"] = dict(incremental_run["stats"], removed=incremental_run["removed"])
+                if incremental_run["unchanged"]:
+                    analysis_result["unchanged"] = True
+                incremental.save_result(novel_name, file_name, incremental_run, analysis_result)
+            if use_cache:
+                self.result_cache.put(cache_key, analysis_result)
             if progress_callback:
                 progress_callback("🤖 요약 생성 OpenAI API 호출 중...")
             if progress_callback:
@@ -140,7 +214,15 @@ class OpenAINovelAnalysisAgent:
             "storyboards": self.db_manager.get_storyboards(novel_name)
         }
     
-    def _analyze_with_openai(self, content: str, existing_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _collect_existing_names(self, novel_name: str) -> Dict[str, List[str]]:
+        """기존 인물/세계관/이벤트의 이름만 수집 (레코드 본문은 메모리에 유지하지 않음)"""
+        return {
+            "characters": [char.get('name', '') for char in self.db_manager.iter_characters(novel_name, fields=['name'])],
+            "world_settings": [world.get('name', '') for world in self.db_manager.iter_world_settings(novel_name, fields=['name'])],
+            "timeline_events": [event.get('title', '') for event in self.db_manager.iter_timeline_events(novel_name, fields=['title'])]
+        }
+
+    def _analyze_with_openai(self, content: str, existing_names: Dict[str, List[str]]) -> Dict[str, Any]:
         """OpenAI를 사용한 고급 내용 분석"""
         
         system_prompt = """
@@ -160,9 +242,9 @@ class OpenAINovelAnalysisAgent:
 {content}
 
 기존 설정 정보:
-- 기존 인물: {json.dumps([char.get('name', '') for char in existing_data['characters']], ensure_ascii=False)}
-- 기존 세계관: {json.dumps([world.get('name', '') for world in existing_data['world_settings']], ensure_ascii=False)}
-- 기존 이벤트: {json.dumps([event.get('title', '') for event in existing_data['timeline_events']], ensure_ascii=False)}
+- 기존 인물: {json.dumps(existing_names['characters'], ensure_ascii=False)}
+- 기존 세계관: {json.dumps(existing_names['world_settings'], ensure_ascii=False)}
+- 기존 이벤트: {json.dumps(existing_names['timeline_events'], ensure_ascii=False)}
 
 분석 결과를 다음 JSON 형식으로 반환해주세요:
 {{
@@ -411,6 +493,19 @@ JSON 형식으로 반환해주세요:
         report_parts.append(analysis_result['summary'])
         report_parts.append("")
         
+        # 증분 분석 정보
+        incremental = analysis_result.get('incremental')
+        if analysis_result.get('cached'):
+            report_parts.append("ℹ️ 원고와 DB가 이전 분석 때와 같아 저장된 분석 결과를 표시합니다.")
+            report_parts.append("")
+        elif analysis_result.get('unchanged'):
+            report_parts.append("ℹ️ 원고가 그대로여서 내용 분석은 이전 결과를 쓰고, 충돌과 추천은 현재 DB 기준으로 다시 확인했습니다.")
+            report_parts.append("")
+        elif incremental and incremental['reanalyzed_paragraphs'] < incremental['paragraphs']:
+            report_parts.append(f"ℹ️ 바뀐 문단이 든 {incremental['reanalyzed_paragraphs']}/{incremental['paragraphs']}개 문단만 다시 분석했으며, "
+                                f"충돌과 추천은 바뀐 부분 기준입니다.")
+            report_parts.append("")
+        
         # 상세 분석
         content_analysis = analysis_result.get('content_analysis', {})
         
@@ -925,33 +1020,24 @@ class SomnniAI:
     """
     def __init__(self, database_path="Database"):
         from .utils import DatabaseManager
-        self.db = DatabaseManager(database_path)
+        self.db = DatabaseManager.from_config(database_path, AgentConfig())
 
     def answer_query(self, novel_name: str, query: str) -> str:
         """
         자연어 질문(query)에 대해 DB에서 관련 정보를 찾아 OpenAI로 답변 생성
         """
-        # DB에서 모든 정보 불러오기
-        characters = self.db.get_characters(novel_name)
-        world = self.db.get_world_settings(novel_name)
-        timeline = self.db.get_timeline_events(novel_name)
-        storyboards = self.db.get_storyboards(novel_name)
+        # DB에서 모든 정보 불러오기 (필드 이름은 레코드에서 정규화됨)
+        characters = self.db.get_records(novel_name, 'characters')
+        world = self.db.get_records(novel_name, 'world')
+        timeline = self.db.get_records(novel_name, 'Timeline')
+        storyboards = self.db.get_records(novel_name, 'Storyboard')
         # 간단한 키워드 매칭 기반 요약(향후 embedding 등으로 개선 가능)
-        import re
         query_lc = query.lower()
         matched = []
-        for char in characters:
-            if any(re.search(re.escape(str(val)), query_lc, re.IGNORECASE) for val in char.values() if isinstance(val, str)):
-                matched.append(f"[인물] {char.get('name','') or char.get('이름','')}: {char}")
-        for w in world:
-            if any(re.search(re.escape(str(val)), query_lc, re.IGNORECASE) for val in w.values() if isinstance(val, str)):
-                matched.append(f"[세계관] {w.get('title','') or w.get('name','')}: {w}")
-        for t in timeline:
-            if any(re.search(re.escape(str(val)), query_lc, re.IGNORECASE) for val in t.values() if isinstance(val, str)):
-                matched.append(f"[타임라인] {t.get('title','') or t.get('date','')}: {t}")
-        for s in storyboards:
-            if any(re.search(re.escape(str(val)), query_lc, re.IGNORECASE) for val in s.values() if isinstance(val, str)):
-                matched.append(f"[스토리보드] {s.get('title','')}: {s}")
+        for label, records in (("인물", characters), ("세계관", world), ("타임라인", timeline), ("스토리보드", storyboards)):
+            for record in records:
+                if any(val.lower() in query_lc for val in record.text_values()):
+                    matched.append(f"[{label}] {record.key or ''}: {record.to_dict()}")
         if not matched:
             matched.append("DB에서 관련 정보를 찾을 수 없습니다. 질문을 더 구체적으로 입력해 주세요.")
         # OpenAI에 전달할 프롬프트 구성
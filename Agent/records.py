@@ -0,0 +1,244 @@
+"""
+엔티티(인물, 세계관, 타임라인, 스토리보드) 레코드 클래스
+
+JSON에는 같은 의미의 필드가 여러 이름으로 들어옴 (인물 이름: name/이름, 세계관 이름: name/title 등)
+레코드를 만들 때 한 번만 정규화하여 record.name처럼 바로 쓸 수 있게 하고,
+to_dict()는 원래 필드 이름과 순서, 알 수 없는 필드까지 그대로 되돌려 기존 JSON과 호환됨
+__slots__를 써서 엔티티마다 딕셔너리를 두는 것보다 메모리를 적게 씀
+"""
+
+from typing import Dict, List, Any, Optional, Iterator
+
+from .dates import date_key
+from .storage import KEY_FIELDS
+
+
+class EntityRecord:
+    """
+    슬롯 기반 레코드 공통 기능
+
+    FIELD_ALIASES: 슬롯 이름 -> JSON 필드 후보 (앞쪽이 우선, 새로 쓸 때는 첫 번째 이름 사용)
+    NESTED: 슬롯 이름 -> 목록 원소를 변환할 레코드 클래스
+    KEY_SLOTS: 저장 키로 쓸 슬롯 (앞에서부터 값이 있는 첫 번째, storage.KEY_FIELDS와 같은 우선순위)
+    """
+
+    __slots__ = ('_layout', 'extra')
+
+    FIELD_ALIASES: Dict[str, tuple] = {}
+    NESTED: Dict[str, type] = {}
+    KEY_SLOTS: tuple = ()
+    _alias_to_slot: Dict[str, str] = {}
+    _layouts: Dict[tuple, tuple] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._alias_to_slot = {}
+        for slot, aliases in cls.FIELD_ALIASES.items():
+            for alias in aliases:
+                cls._alias_to_slot.setdefault(alias, slot)
+        # 같은 필드 순서를 가진 레코드들은 layout 튜플 하나를 공유
+        cls._layouts = {}
+
+    def __init__(self, **values):
+        for slot in self.FIELD_ALIASES:
+            setattr(self, slot, values.pop(slot, None))
+        self._layout = ()
+        self.extra = values or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EntityRecord":
+        """JSON 딕셔너리로부터 레코드 생성 (필드 이름 정규화)"""
+        record = cls.__new__(cls)
+        for slot in cls.FIELD_ALIASES:
+            setattr(record, slot, None)
+        # 슬롯마다 값이 있는 첫 번째 후보 필드를 씀 (entity_key와 같은 우선순위), 나머지 후보는 extra로
+        chosen = {}
+        for slot, aliases in cls.FIELD_ALIASES.items():
+            field = next((alias for alias in aliases if data.get(alias)), None)
+            if field is None:
+                field = next((alias for alias in aliases if alias in data), None)
+            if field is not None:
+                chosen[field] = slot
+        extra = None
+        layout = []
+        for field, value in data.items():
+            slot = chosen.get(field)
+            if slot is not None:
+                if slot in cls.NESTED and isinstance(value, list):
+                    value = [cls.NESTED[slot].from_dict(item) if isinstance(item, dict) else item
+                             for item in value]
+                setattr(record, slot, value)
+                layout.append((field, slot))
+                continue
+            if extra is None:
+                extra = {}
+            extra[field] = value
+            layout.append((field, None))
+        layout = tuple(layout)
+        record._layout = cls._layouts.setdefault(layout, layout)
+        record.extra = extra
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """원래 JSON 형태(필드 이름, 순서 포함)로 변환"""
+        data = {}
+        emitted = set()
+        extra = self.extra or {}
+        for field, slot in self._layout:
+            if slot is None:
+                if field in extra:
+                    data[field] = extra[field]
+            else:
+                data[field] = self._export(slot)
+                emitted.add(slot)
+        for slot, aliases in self.FIELD_ALIASES.items():
+            if slot not in emitted and getattr(self, slot) is not None:
+                data[aliases[0]] = self._export(slot)
+        for field, value in extra.items():
+            if field not in data:
+                data[field] = value
+        return data
+
+    def _export(self, slot: str) -> Any:
+        value = getattr(self, slot)
+        if slot in self.NESTED and isinstance(value, list):
+            return [item.to_dict() if isinstance(item, EntityRecord) else item for item in value]
+        return value
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """딕셔너리처럼 필드 조회 (정규화된 슬롯 이름이나 원래 JSON 필드 이름 모두 가능)"""
+        slot = field if field in self.FIELD_ALIASES else self._alias_to_slot.get(field)
+        if slot is not None:
+            value = getattr(self, slot)
+            return default if value is None else value
+        if self.extra and field in self.extra:
+            return self.extra[field]
+        return default
+
+    def text_values(self) -> Iterator[str]:
+        """문자열 필드 값 (검색용)"""
+        for slot in self.FIELD_ALIASES:
+            value = getattr(self, slot)
+            if isinstance(value, str):
+                yield value
+        if self.extra:
+            for value in self.extra.values():
+                if isinstance(value, str):
+                    yield value
+
+    @property
+    def key(self) -> Optional[str]:
+        """저장 키 (storage.entity_key와 같은 규칙)"""
+        for slot in self.KEY_SLOTS:
+            value = getattr(self, slot)
+            if value:
+                return str(value)
+        return None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Character(EntityRecord):
+    """인물 (name/이름 필드를 name으로 정규화)"""
+
+    FIELD_ALIASES = {
+        'name': tuple(KEY_FIELDS['characters']),
+        'role': ('role', '역할'),
+        'personality': ('personality', '성격'),
+        'background': ('background', '배경'),
+        'description': ('description', '설명'),
+        'gender': ('gender', '성별'),
+        'age': ('age', '나이'),
+    }
+    __slots__ = tuple(FIELD_ALIASES)
+    KEY_SLOTS = ('name',)
+
+
+class WorldElement(EntityRecord):
+    """세계관 요소 (name/title 필드를 name으로 정규화)"""
+
+    FIELD_ALIASES = {
+        'name': tuple(KEY_FIELDS['world']),
+        'category': ('category', '카테고리'),
+        'description': ('description', '설명'),
+        'content': ('content', '내용'),
+    }
+    __slots__ = tuple(FIELD_ALIASES)
+    KEY_SLOTS = ('name',)
+
+
+class TimelineEvent(EntityRecord):
+    """타임라인 이벤트"""
+
+    FIELD_ALIASES = {
+        'title': ('title', '제목'),
+        'date': ('date', '날짜'),
+        'date_key': ('date_key',),
+        'type': ('type',),
+        'explicit_events': ('explicit_events',),
+        'description': ('description', '설명'),
+        'importance': ('importance', '중요도'),
+        'participants': ('participants',),
+        'location': ('location',),
+    }
+    __slots__ = tuple(FIELD_ALIASES)
+    KEY_SLOTS = ('title', 'date')
+
+    @property
+    def sort_key(self) -> Optional[int]:
+        """날짜 정렬 키 (저장된 date_key, 없으면 date로 계산 - date_key 필드가 생기기 전에 저장된 이벤트용)"""
+        if isinstance(self.date_key, int):
+            return self.date_key
+        return date_key(self.date)
+
+    @property
+    def event_type(self) -> Optional[str]:
+        """'명시적'/'암묵적' (type이 없으면 explicit_events로 판단)"""
+        if self.type:
+            return self.type
+        if self.explicit_events is not None:
+            return '명시적' if self.explicit_events else '암묵적'
+        return None
+
+
+class StoryboardScene(EntityRecord):
+    """스토리보드 챕터 안의 씬"""
+
+    FIELD_ALIASES = {
+        'name': ('name', 'title'),
+        'description': ('description',),
+    }
+    __slots__ = tuple(FIELD_ALIASES)
+    KEY_SLOTS = ('name',)
+
+
+class StoryboardChapter(EntityRecord):
+    """스토리보드 챕터 (scenes는 StoryboardScene 목록)"""
+
+    FIELD_ALIASES = {
+        'title': tuple(KEY_FIELDS['Storyboard']),
+        'content': ('content',),
+        'scenes': ('scenes',),
+    }
+    NESTED = {'scenes': StoryboardScene}
+    __slots__ = tuple(FIELD_ALIASES)
+    KEY_SLOTS = ('title',)
+
+
+RECORD_TYPES = {
+    'characters': Character,
+    'world': WorldElement,
+    'Timeline': TimelineEvent,
+    'Storyboard': StoryboardChapter,
+}
+
+
+def to_record(category: str, data: Dict[str, Any]) -> EntityRecord:
+    """카테고리에 맞는 레코드 클래스로 변환"""
+    return RECORD_TYPES[category].from_dict(data)
+
+
+def to_records(category: str, records: List[Dict[str, Any]]) -> List[EntityRecord]:
+    record_type = RECORD_TYPES[category]
+    return [record_type.from_dict(record) for record in records]
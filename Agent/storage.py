@@ -0,0 +1,1298 @@
+"""
+DatabaseManager 저장소 백엔드
+
+- JsonFileStorage: Database/<소설>/<카테고리>/*.json (엔티티당 파일 1개, 기본값)
+- SQLiteStorage: Database/library.sqlite3 (엔티티당 행 1개, 카테고리 로드는 인덱스 조회 1회)
+- SegmentStorage: Database/<소설>/<카테고리>/segment.jsonl (추가 전용 JSON-Lines, 백그라운드 압축)
+- EntityCache: 백엔드 앞단의 읽기 캐시 (수정 시각으로 유효성 확인, 소설 단위 LRU)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator
+
+# 카테고리(=소설 폴더 아래 디렉토리 이름)
+CATEGORIES = ['characters', 'world', 'Timeline', 'Storyboard']
+
+# 카테고리별 JSON 파일 접두어
+FILE_PREFIXES = {
+    'characters': 'character',
+    'world': 'world',
+    'Timeline': 'timeline',
+    'Storyboard': 'storyboard',
+}
+
+# 카테고리별 오류 메시지용 이름
+CATEGORY_LABELS = {
+    'characters': '인물',
+    'world': '세계관 설정',
+    'Timeline': '타임라인',
+    'Storyboard': '스토리보드',
+}
+
+# 카테고리별 엔티티 키 필드(앞에서부터 우선)
+KEY_FIELDS = {
+    'characters': ['name', '이름'],
+    'world': ['name', 'title'],
+    'Timeline': ['title', 'date'],
+    'Storyboard': ['title'],
+}
+
+
+def safe_filename(s):
+    """
+    문자열에서 한글, 영문, 숫자만 남기고 나머지는 _로 치환. 길이 제한(40자)
+    """
+    return re.sub(r'[^가-힣a-zA-Z0-9]', '_', str(s))[:40]
+
+
+def entity_key(category: str, record: Dict[str, Any]) -> Optional[str]:
+    """엔티티의 키(이름/제목) 반환, 키 필드가 없으면 None"""
+    for field in KEY_FIELDS[category]:
+        value = record.get(field)
+        if value:
+            return str(value)
+    return None
+
+
+def _read_json_file(file: Path) -> tuple:
+    """(레코드, 오류) 반환 - 스레드 풀 작업용"""
+    try:
+        with open(file, 'r', encoding='utf-8') as f:
+            return json.load(f), None
+    except Exception as e:
+        return None, e
+
+
+class _KeyIndex:
+    """카테고리 하나의 엔티티 키 -> 파일 이름 매핑"""
+
+    def __init__(self, keys: Optional[Dict[str, str]] = None, mtime_ns: Optional[int] = None):
+        self.keys = dict(keys or {})
+        self.files = set(self.keys.values())
+        self.mtime_ns = mtime_ns  # 인덱스가 반영한 시점의 디렉토리 수정 시각
+
+    def assign(self, key: str, filename: str):
+        old = self.keys.get(key)
+        if old is not None and old != filename:
+            self.files.discard(old)
+        self.keys[key] = filename
+        self.files.add(filename)
+
+    def remove(self, key: str):
+        filename = self.keys.pop(key, None)
+        if filename is not None:
+            self.files.discard(filename)
+
+    def allocate(self, category: str, key: str, category_dir: Path) -> str:
+        """
+        키가 쓸 파일 이름 반환
+        이미 있는 키는 기존 파일, 새 키는 safe_filename 결과가 다른 키와 겹치면 _2, _3 ... 접미사를 붙임
+        """
+        filename = self.keys.get(key)
+        if filename is not None:
+            return filename
+        base = f"{FILE_PREFIXES[category]}_{safe_filename(key)}"
+        filename = f"{base}.json"
+        suffix = 2
+        # 인덱스에 없는 파일(키가 없거나 읽을 수 없는 파일)도 덮어쓰지 않음
+        while filename in self.files or (category_dir / filename).exists():
+            filename = f"{base}_{suffix}.json"
+            suffix += 1
+        return filename
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mtime_ns": self.mtime_ns, "keys": self.keys}
+
+
+class JsonFileStorage:
+    """
+    엔티티마다 JSON 파일 하나를 두는 기존 저장 방식
+
+    파일이 parallel_threshold개 이상이면 load_workers개 스레드로 나눠 읽음
+    (느린 디스크/네트워크 드라이브에서 파일 열기 대기 시간을 겹치게 함)
+
+    Database/<소설>/index.json에 카테고리별 키 -> 파일 이름 인덱스를 두어
+    - 이름 하나로 조회/갱신할 때 디렉토리를 훑지 않음
+    - safe_filename이 같아지는 서로 다른 키는 접미사가 붙은 다른 파일에 저장됨
+    디렉토리 수정 시각이 인덱스에 기록된 값과 다르면(외부에서 파일 추가/삭제) 새 파일만 읽어 인덱스를 보충함
+    """
+
+    INDEX_FILE = 'index.json'
+    # 프론트엔드나 사용자가 DatabaseManager를 거치지 않고 파일을 고칠 수 있음 (변경 기록 검증에 사용)
+    external_edits = True
+
+    def __init__(self, database_path: Path, load_workers: int = 8, parallel_threshold: int = 32):
+        self.database_path = Path(database_path)
+        self.load_workers = load_workers
+        self.parallel_threshold = parallel_threshold
+        self._indexes = {}  # novel -> {category: _KeyIndex}
+        self._index_lock = threading.RLock()
+
+    def category_dir(self, novel_name: str, category: str) -> Path:
+        return self.database_path / novel_name / category
+
+    def index_path(self, novel_name: str) -> Path:
+        return self.database_path / novel_name / self.INDEX_FILE
+
+    def _novel_indexes(self, novel_name: str) -> Dict[str, _KeyIndex]:
+        indexes = self._indexes.get(novel_name)
+        if indexes is None:
+            indexes = {}
+            try:
+                with open(self.index_path(novel_name), 'r', encoding='utf-8') as f:
+                    for category, entry in json.load(f).items():
+                        indexes[category] = _KeyIndex(entry.get("keys"), entry.get("mtime_ns"))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"인덱스 파일 읽기 오류 {self.index_path(novel_name)}: {e}")
+            self._indexes[novel_name] = indexes
+        return indexes
+
+    def _write_index(self, novel_name: str):
+        """인덱스 파일을 임시 파일 + rename으로 교체"""
+        path = self.index_path(novel_name)
+        indexes = self._indexes.get(novel_name, {})
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({category: index.to_dict() for category, index in indexes.items()}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # 인덱스는 디렉토리에서 다시 만들 수 있으므로 저장 실패는 경고만 함
+            print(f"인덱스 파일 저장 오류 {path}: {e}")
+
+    def _dir_mtime(self, category_dir: Path) -> Optional[int]:
+        try:
+            return category_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _key_index(self, novel_name: str, category: str, rebuild: bool = False) -> _KeyIndex:
+        """
+        최신 상태의 카테고리 인덱스 반환 (_index_lock을 잡은 상태에서 호출)
+
+        디렉토리 수정 시각이 기록과 같으면 그대로 쓰고, 다르면 사라진 파일을 지우고 새 파일만 읽어 보충
+        rebuild=True이면 모든 파일을 다시 읽음 (파일 내용이 제자리에서 바뀐 경우)
+        """
+        indexes = self._novel_indexes(novel_name)
+        index = indexes.get(category)
+        category_dir = self.category_dir(novel_name, category)
+        mtime_ns = self._dir_mtime(category_dir)
+        if index is not None and not rebuild and index.mtime_ns == mtime_ns:
+            return index
+
+        names = set()
+        if mtime_ns is not None:
+            with os.scandir(category_dir) as it:
+                names = {entry.name for entry in it if entry.name.endswith('.json') and entry.is_file()}
+        keys = {} if index is None or rebuild else {
+            key: filename for key, filename in index.keys.items() if filename in names
+        }
+        index = _KeyIndex(keys, mtime_ns)
+        for filename in sorted(names - index.files):
+            record, error = _read_json_file(category_dir / filename)
+            if error is not None:
+                continue
+            key = entity_key(category, record)
+            if key and key not in index.keys:
+                index.assign(key, filename)
+        indexes[category] = index
+        if mtime_ns is not None:
+            self._write_index(novel_name)
+        return index
+
+    def entity_path(self, novel_name: str, category: str, key: str) -> Optional[Path]:
+        """키가 저장된 파일 경로 (없으면 None)"""
+        with self._index_lock:
+            filename = self._key_index(novel_name, category).keys.get(key)
+        return None if filename is None else self.category_dir(novel_name, category) / filename
+
+    def get(self, novel_name: str, category: str, key: str) -> Optional[Dict[str, Any]]:
+        """키로 엔티티 하나를 읽음 (인덱스 조회 + 파일 하나)"""
+        for rebuild in (False, True):
+            with self._index_lock:
+                filename = self._key_index(novel_name, category, rebuild).keys.get(key)
+            if filename is None:
+                return None
+            record, error = _read_json_file(self.category_dir(novel_name, category) / filename)
+            if error is None and entity_key(category, record) == key:
+                return record
+            # 파일이 외부에서 제자리 수정되어 키가 바뀌었으면 전체를 다시 읽고 한 번 더 시도
+        return None
+
+    def signature(self, novel_name: str, category: str) -> Optional[tuple]:
+        """캐시 유효성 확인용 값: 디렉토리와 각 JSON 파일의 (수정 시각, 크기)"""
+        category_dir = self.category_dir(novel_name, category)
+        try:
+            dir_stat = category_dir.stat()
+            entries = []
+            with os.scandir(category_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json') and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            return None
+        entries.sort()
+        return (dir_stat.st_mtime_ns, tuple(entries))
+
+    def load(self, novel_name: str, category: str) -> List[Dict[str, Any]]:
+        """카테고리의 모든 엔티티를 파일 이름 순서로 읽음"""
+        category_dir = self.category_dir(novel_name, category)
+        if not category_dir.exists():
+            return []
+
+        files = sorted(category_dir.glob('*.json'))
+        if self.load_workers > 1 and len(files) >= self.parallel_threshold:
+            # map은 입력 순서대로 결과를 돌려주므로 순서가 유지됨
+            with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+                results = list(executor.map(_read_json_file, files))
+        else:
+            results = [_read_json_file(file) for file in files]
+
+        records = []
+        for file, (record, error) in zip(files, results):
+            if error is not None:
+                print(f"{CATEGORY_LABELS[category]} 파일 읽기 오류 {file}: {error}")
+            else:
+                records.append(record)
+        return records
+
+    def iter(self, novel_name: str, category: str) -> Iterator[Dict[str, Any]]:
+        """엔티티를 파일 이름 순서로 하나씩 읽어 반환"""
+        category_dir = self.category_dir(novel_name, category)
+        if not category_dir.exists():
+            return
+        for file in sorted(category_dir.glob('*.json')):
+            record, error = _read_json_file(file)
+            if error is not None:
+                print(f"{CATEGORY_LABELS[category]} 파일 읽기 오류 {file}: {error}")
+            else:
+                yield record
+
+    def count(self, novel_name: str, category: str) -> int:
+        """파일을 열지 않고 엔티티 수만 셈"""
+        category_dir = self.category_dir(novel_name, category)
+        if not category_dir.exists():
+            return 0
+        return sum(1 for _ in category_dir.glob('*.json'))
+
+    def save(self, novel_name: str, category: str, key: str, record: Dict[str, Any]):
+        """엔티티 저장 (같은 키의 파일이 있으면 덮어씀)"""
+        category_dir = self.category_dir(novel_name, category)
+        category_dir.mkdir(parents=True, exist_ok=True)
+        with self._index_lock:
+            index = self._key_index(novel_name, category)
+            filename = index.allocate(category, key, category_dir)
+            with open(category_dir / filename, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False, indent=2)
+            index.assign(key, filename)
+            index.mtime_ns = self._dir_mtime(category_dir)
+            self._write_index(novel_name)
+
+    def delete(self, novel_name: str, category: str, key: str) -> bool:
+        """키의 파일을 지움 (없으면 False)"""
+        if self.get(novel_name, category, key) is None:
+            return False
+        category_dir = self.category_dir(novel_name, category)
+        with self._index_lock:
+            index = self._key_index(novel_name, category)
+            filename = index.keys.get(key)
+            if filename is None:
+                return False
+            try:
+                (category_dir / filename).unlink()
+            except FileNotFoundError:
+                pass
+            index.remove(key)
+            index.mtime_ns = self._dir_mtime(category_dir)
+            self._write_index(novel_name)
+        return True
+
+    def save_rows(self, novel_name: str, category: str, rows: List[tuple]):
+        """
+        (key, record) 목록을 전부 저장하거나 하나도 저장하지 않음
+
+        1. 모든 레코드를 먼저 직렬화 (실패하면 디스크는 그대로)
+        2. 임시 파일에 기록
+        3. 기존 파일을 백업 이름으로 옮긴 뒤 임시 파일을 제자리로 rename
+        4. 디렉토리 fsync 1회 후 백업 삭제
+        도중에 실패하면 옮긴 파일을 되돌리고 임시 파일을 지움
+        """
+        category_dir = self.category_dir(novel_name, category)
+        category_dir.mkdir(parents=True, exist_ok=True)
+        with self._index_lock:
+            index = self._key_index(novel_name, category)
+            self._save_rows(category_dir, category, index, rows)
+            index.mtime_ns = self._dir_mtime(category_dir)
+            self._write_index(novel_name)
+
+    def _save_rows(self, category_dir: Path, category: str, index: _KeyIndex, rows: List[tuple]):
+        # 같은 키의 레코드는 마지막 것만 남김
+        payloads = {}
+        for key, record in rows:
+            payloads[key] = json.dumps(record, ensure_ascii=False, indent=2)
+
+        # 새 키끼리도 파일 이름이 겹치지 않도록 인덱스 사본에 차례로 배정
+        allocation = _KeyIndex(index.keys)
+        paths = {}
+        for key in payloads:
+            filename = allocation.allocate(category, key, category_dir)
+            allocation.assign(key, filename)
+            paths[key] = category_dir / filename
+
+        staged = []  # (임시 파일, 대상 파일)
+        replaced = []  # (대상 파일, 백업 파일 또는 None)
+        try:
+            for key, payload in payloads.items():
+                path = paths[key]
+                tmp_path = path.with_name(f".{path.name}.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                staged.append((tmp_path, path))
+
+            for tmp_path, path in staged:
+                backup_path = None
+                if path.exists():
+                    backup_path = path.with_name(f".{path.name}.bak")
+                    os.replace(path, backup_path)
+                replaced.append((path, backup_path))
+                os.replace(tmp_path, path)
+        except Exception:
+            for path, backup_path in reversed(replaced):
+                if backup_path is not None:
+                    os.replace(backup_path, path)
+                elif path.exists():
+                    path.unlink()
+            for tmp_path, _ in staged:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+            raise
+
+        self._sync_dir(category_dir)
+        for _, backup_path in replaced:
+            if backup_path is not None:
+                backup_path.unlink()
+        for key, path in paths.items():
+            index.assign(key, path.name)
+
+    @staticmethod
+    def _sync_dir(directory: Path):
+        """디렉토리 항목(rename 결과)을 디스크에 반영"""
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return  # Windows는 디렉토리를 열 수 없음
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+class SQLiteStorage:
+    """
+    모든 소설의 엔티티를 SQLite 파일 하나에 저장하는 방식
+    (novel, category) 인덱스로 카테고리 전체를 쿼리 한 번에 읽음
+    """
+
+    external_edits = False
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entities (
+        novel TEXT NOT NULL,
+        category TEXT NOT NULL,
+        key TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (novel, category, key)
+    );
+    CREATE INDEX IF NOT EXISTS idx_entities_novel_category ON entities (novel, category);
+    """
+
+    def __init__(self, database_path: Path, db_file: str = "library.sqlite3"):
+        self.database_path = Path(database_path)
+        self.database_path.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.database_path / db_file
+        # Streamlit은 스크립트를 여러 스레드에서 실행하므로 연결 하나를 잠금과 함께 공유
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def signature(self, novel_name: str, category: str) -> Optional[tuple]:
+        """캐시 유효성 확인용 값: DB 파일과 WAL 파일의 (수정 시각, 크기)"""
+        stats = []
+        for path in (self.db_path, Path(f"{self.db_path}-wal")):
+            try:
+                stat = path.stat()
+                stats.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stats.append(None)
+        return tuple(stats)
+
+    def load(self, novel_name: str, category: str) -> List[Dict[str, Any]]:
+        """카테고리의 모든 엔티티를 읽음"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, data FROM entities WHERE novel = ? AND category = ? ORDER BY rowid",
+                (novel_name, category)
+            ).fetchall()
+
+        records = []
+        for key, data in rows:
+            try:
+                records.append(json.loads(data))
+            except Exception as e:
+                print(f"{CATEGORY_LABELS[category]} 레코드 읽기 오류 {novel_name}/{category}/{key}: {e}")
+        return records
+
+    def iter(self, novel_name: str, category: str) -> Iterator[Dict[str, Any]]:
+        """엔티티를 커서로 하나씩 읽어 반환 (공유 연결을 잡지 않도록 읽기 전용 연결 사용)"""
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            cursor = conn.execute(
+                "SELECT key, data FROM entities WHERE novel = ? AND category = ? ORDER BY rowid",
+                (novel_name, category)
+            )
+            for key, data in cursor:
+                try:
+                    record = json.loads(data)
+                except Exception as e:
+                    print(f"{CATEGORY_LABELS[category]} 레코드 읽기 오류 {novel_name}/{category}/{key}: {e}")
+                    continue
+                yield record
+        finally:
+            conn.close()
+
+    def count(self, novel_name: str, category: str) -> int:
+        """레코드를 읽지 않고 엔티티 수만 셈"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM entities WHERE novel = ? AND category = ?",
+                (novel_name, category)
+            ).fetchone()[0]
+
+    def get(self, novel_name: str, category: str, key: str) -> Optional[Dict[str, Any]]:
+        """기본 키로 엔티티 하나를 읽음"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM entities WHERE novel = ? AND category = ? AND key = ?",
+                (novel_name, category, key)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def save(self, novel_name: str, category: str, key: str, record: Dict[str, Any]):
+        """엔티티 저장 (같은 키가 있으면 덮어씀)"""
+        self.save_rows(novel_name, category, [(key, record)])
+
+    def delete(self, novel_name: str, category: str, key: str) -> bool:
+        """키의 행을 지움 (없으면 False)"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM entities WHERE novel = ? AND category = ? AND key = ?",
+                (novel_name, category, key)
+            )
+        return cursor.rowcount > 0
+
+    def save_rows(self, novel_name: str, category: str, rows: List[tuple]):
+        """(key, record) 목록을 트랜잭션 하나로 저장"""
+        payload = [
+            (novel_name, category, key, json.dumps(record, ensure_ascii=False))
+            for key, record in rows
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO entities (novel, category, key, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (novel, category, key) DO UPDATE SET data = excluded.data",
+                payload
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Segment:
+    """
+    카테고리 하나의 추가 전용 세그먼트 파일과 메모리 오프셋 인덱스
+
+    한 줄이 레코드 하나: {"key": ..., "data": {...}} 또는 {"key": ..., "deleted": true}
+    같은 키가 다시 기록되면 앞의 줄은 쓰레기(superseded)가 되며 압축 때 제거됨
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.index = {}  # key -> (offset, length), 처음 저장된 순서 유지
+        self.records = 0  # 파일 안의 전체 줄 수 (쓰레기 포함)
+        self.end = 0  # 인덱스에 반영된 파일 끝 위치
+        self.inode = None
+        self.compacting = False
+        self._handle = None
+
+    def _open(self):
+        """파일을 열고 처음부터 끝까지 한 번 읽어 인덱스를 만듦"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._handle is not None:
+            self._handle.close()
+        self._handle = open(self.path, 'ab')
+        self.index = {}
+        self.records = 0
+        self.end = 0
+        self.inode = os.fstat(self._handle.fileno()).st_ino
+        self._scan_tail()
+
+    def _scan_tail(self):
+        """인덱스에 반영되지 않은 파일 끝부분(다른 프로세스가 추가한 줄)을 읽어 인덱스 갱신"""
+        with open(self.path, 'rb') as f:
+            f.seek(self.end)
+            offset = self.end
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # 쓰는 중인 마지막 줄은 다음에 다시 읽음
+                self._index_line(line, offset)
+                offset += len(line)
+        self.end = offset
+
+    def _index_line(self, line: bytes, offset: int):
+        try:
+            entry = json.loads(line)
+        except Exception as e:
+            print(f"세그먼트 레코드 읽기 오류 {self.path}@{offset}: {e}")
+            return
+        self.records += 1
+        if entry.get('deleted'):
+            self.index.pop(entry['key'], None)
+        else:
+            self.index[entry['key']] = (offset, len(line))
+
+    def ensure_current(self):
+        """다른 프로세스의 추가/압축을 반영"""
+        if self._handle is None:
+            self._open()
+            return
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._open()
+            return
+        if stat.st_ino != self.inode or stat.st_size < self.end:
+            self._open()
+        elif stat.st_size > self.end:
+            self._scan_tail()
+
+    def append(self, entries: List[Dict[str, Any]], sync: bool = False):
+        """
+        여러 레코드를 write 한 번으로 추가
+        쓰기 도중 실패하면 파일을 추가 전 길이로 잘라 일부만 기록되지 않게 함
+        """
+        lines = [(json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8') for entry in entries]
+        with self.lock:
+            self.ensure_current()
+            try:
+                self._handle.write(b''.join(lines))
+                self._handle.flush()
+                if sync:
+                    os.fsync(self._handle.fileno())
+            except Exception:
+                self._handle.close()
+                self._handle = None
+                os.truncate(self.path, self.end)
+                raise
+            offset = self.end
+            for entry, line in zip(entries, lines):
+                self.records += 1
+                if entry.get('deleted'):
+                    self.index.pop(entry['key'], None)
+                else:
+                    self.index[entry['key']] = (offset, len(line))
+                offset += len(line)
+            self.end = offset
+
+    def read_all(self) -> List[tuple]:
+        """파일 전체를 순차로 한 번 읽어 (key, data) 목록 반환"""
+        with self.lock:
+            self.ensure_current()
+            with open(self.path, 'rb') as f:
+                buffer = f.read(self.end)
+            locations = list(self.index.items())
+
+        rows = []
+        for key, (offset, length) in locations:
+            try:
+                rows.append((key, json.loads(buffer[offset:offset + length])['data']))
+            except Exception as e:
+                print(f"세그먼트 레코드 읽기 오류 {self.path}/{key}: {e}")
+        return rows
+
+    def iter_live(self) -> Iterator[tuple]:
+        """파일을 앞에서부터 한 줄씩 읽으며 살아 있는 (key, data)만 반환"""
+        # 압축으로 파일이 교체되어도 인덱스와 같은 파일을 읽도록 잠금 안에서 연다
+        with self.lock:
+            self.ensure_current()
+            live = {offset: key for key, (offset, _) in self.index.items()}
+            end = self.end
+            f = open(self.path, 'rb')
+        with f:
+            offset = 0
+            for line in f:
+                if offset >= end:
+                    break
+                key = live.get(offset)
+                if key is not None:
+                    try:
+                        yield key, json.loads(line)['data']
+                    except Exception as e:
+                        print(f"세그먼트 레코드 읽기 오류 {self.path}/{key}: {e}")
+                offset += len(line)
+
+    def read_one(self, key: str) -> Optional[Dict[str, Any]]:
+        """인덱스로 레코드 하나만 읽음"""
+        with self.lock:
+            self.ensure_current()
+            location = self.index.get(key)
+            if location is None:
+                return None
+            with open(self.path, 'rb') as f:
+                f.seek(location[0])
+                line = f.read(location[1])
+        return json.loads(line)['data']
+
+    def garbage_ratio(self) -> float:
+        if self.records == 0:
+            return 0.0
+        return 1 - len(self.index) / self.records
+
+    def compact(self):
+        """살아 있는 레코드만 새 파일에 쓰고 원자적으로 교체"""
+        with self.lock:
+            try:
+                self.ensure_current()
+                tmp_path = self.path.with_suffix('.jsonl.compact')
+                with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                    new_index = {}
+                    offset = 0
+                    for key, (old_offset, length) in self.index.items():
+                        src.seek(old_offset)
+                        line = src.read(length)
+                        dst.write(line)
+                        new_index[key] = (offset, length)
+                        offset += length
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                self._handle.close()
+                os.replace(tmp_path, self.path)
+                self._handle = open(self.path, 'ab')
+                self.inode = os.fstat(self._handle.fileno()).st_ino
+                self.index = new_index
+                self.records = len(new_index)
+                self.end = offset
+            except Exception as e:
+                print(f"세그먼트 압축 오류 {self.path}: {e}")
+                self._handle = None  # 다음 접근 때 파일에서 다시 인덱스를 만듦
+            finally:
+                self.compacting = False
+
+
+class SegmentStorage:
+    """
+    카테고리마다 추가 전용 JSON-Lines 세그먼트 파일 하나에 저장하는 방식
+
+    - save: 파일을 열고 자르는 대신 버퍼에 한 줄을 추가하고 flush (write 1회)
+    - load: 세그먼트를 순차로 한 번 읽고 메모리 인덱스로 최신 레코드만 골라냄
+    - 덮어써진 레코드 비율이 compact_ratio를 넘으면 백그라운드 스레드에서 압축
+    같은 폴더를 쓰는 인스턴스는 파일 핸들과 인덱스를 공유해야 하므로 shared()로 얻음
+    (쓰기는 한 프로세스에서 하는 것을 전제로 하며, 다른 프로세스의 추가/압축은 읽을 때 반영)
+    """
+
+    SEGMENT_FILE = 'segment.jsonl'
+    external_edits = False
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, database_path: Path, compact_ratio: float = 0.5, compact_min_records: int = 64):
+        self.database_path = Path(database_path)
+        self.compact_ratio = compact_ratio
+        self.compact_min_records = compact_min_records
+        self._segments = {}
+        self._segments_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, database_path: Path, **kwargs) -> "SegmentStorage":
+        """경로별로 하나의 인스턴스를 공유"""
+        key = str(Path(database_path).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(database_path, **kwargs)
+            instance = cls._instances[key]
+        for name, value in kwargs.items():
+            setattr(instance, name, value)
+        return instance
+
+    def segment_path(self, novel_name: str, category: str) -> Path:
+        return self.database_path / novel_name / category / self.SEGMENT_FILE
+
+    def _segment(self, novel_name: str, category: str) -> _Segment:
+        with self._segments_lock:
+            segment = self._segments.get((novel_name, category))
+            if segment is None:
+                segment = _Segment(self.segment_path(novel_name, category))
+                self._segments[(novel_name, category)] = segment
+            return segment
+
+    def signature(self, novel_name: str, category: str) -> Optional[tuple]:
+        """캐시 유효성 확인용 값: 세그먼트 파일의 (inode, 수정 시각, 크기)"""
+        try:
+            stat = self.segment_path(novel_name, category).stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def load(self, novel_name: str, category: str) -> List[Dict[str, Any]]:
+        """카테고리의 모든 엔티티를 읽음"""
+        if not self.segment_path(novel_name, category).exists():
+            return []
+        return [data for _, data in self._segment(novel_name, category).read_all()]
+
+    def iter(self, novel_name: str, category: str) -> Iterator[Dict[str, Any]]:
+        """엔티티를 세그먼트 순서대로 하나씩 읽어 반환"""
+        if not self.segment_path(novel_name, category).exists():
+            return
+        for _, data in self._segment(novel_name, category).iter_live():
+            yield data
+
+    def count(self, novel_name: str, category: str) -> int:
+        """메모리 인덱스의 키 수"""
+        if not self.segment_path(novel_name, category).exists():
+            return 0
+        segment = self._segment(novel_name, category)
+        with segment.lock:
+            segment.ensure_current()
+            return len(segment.index)
+
+    def get(self, novel_name: str, category: str, key: str) -> Optional[Dict[str, Any]]:
+        """메모리 인덱스로 엔티티 하나를 읽음"""
+        if not self.segment_path(novel_name, category).exists():
+            return None
+        return self._segment(novel_name, category).read_one(key)
+
+    def save(self, novel_name: str, category: str, key: str, record: Dict[str, Any]):
+        """엔티티 저장 (같은 키가 있으면 새 줄이 이전 줄을 대체)"""
+        segment = self._segment(novel_name, category)
+        segment.append([{"key": key, "data": record}])
+        self._maybe_compact(segment)
+
+    def delete(self, novel_name: str, category: str, key: str) -> bool:
+        """삭제 표시 줄을 추가 (없는 키면 False)"""
+        if not self.segment_path(novel_name, category).exists():
+            return False
+        segment = self._segment(novel_name, category)
+        with segment.lock:
+            segment.ensure_current()
+            if key not in segment.index:
+                return False
+            segment.append([{"key": key, "deleted": True}])
+        self._maybe_compact(segment)
+        return True
+
+    def save_rows(self, novel_name: str, category: str, rows: List[tuple]):
+        """(key, record) 목록을 write 한 번 + fsync 한 번으로 추가 (실패하면 전부 취소)"""
+        segment = self._segment(novel_name, category)
+        segment.append([{"key": key, "data": record} for key, record in rows], sync=True)
+        self._maybe_compact(segment)
+
+    def _maybe_compact(self, segment: _Segment):
+        with segment.lock:
+            if (segment.compacting or segment.records < self.compact_min_records
+                    or segment.garbage_ratio() < self.compact_ratio):
+                return
+            segment.compacting = True
+        threading.Thread(target=segment.compact, daemon=True).start()
+
+    def close(self):
+        pass
+
+
+def signature_digest(signature: Optional[tuple]) -> str:
+    """signature()를 변경 기록/커서에 넣을 짧은 문자열로 요약"""
+    return hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:16]
+
+
+class ChangeLog:
+    """
+    소설 하나의 변경 기록 (Database/<소설>/changes_<backend>.jsonl)
+
+    한 줄이 변경 하나: {"seq": 1, "category": ..., "key": ..., "op": "upsert" 또는 "delete"}
+    파일을 외부에서 고칠 수 있는 저장소는 쓰기 직전/직후 카테고리 signature 요약(before/after)도 함께 기록해
+    커서 이후 기록되지 않은 변경이 끼어들었는지 확인할 수 있게 함
+    줄 수가 max_entries를 넘으면 최근 절반만 남기며, 그보다 오래된 커서는 전체 다시 읽기가 필요함
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: Path, max_entries: int = 2000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.lock = threading.RLock()
+        self.entries = []
+        self.base_seq = 0  # 이 값 이하의 seq는 기록에서 잘려 나감
+        self.last_seq = 0
+        self._size = None  # 마지막으로 읽거나 쓴 시점의 파일 크기
+
+    @classmethod
+    def shared(cls, path: Path) -> "ChangeLog":
+        """경로별로 하나의 인스턴스를 공유"""
+        key = str(Path(path).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(path)
+            return cls._instances[key]
+
+    def _refresh(self):
+        """다른 프로세스가 기록했거나 파일이 지워졌으면 다시 읽음 (lock을 잡은 상태에서 호출)"""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = None
+        if size == self._size:
+            return
+        entries = []
+        if size is not None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break  # 기록 도중 끊긴 마지막 줄
+        self.entries = entries
+        self.base_seq = entries[0]['seq'] - 1 if entries else 0
+        self.last_seq = entries[-1]['seq'] if entries else 0
+        self._size = size
+
+    def append(self, category: str, ops: List[tuple], before: Optional[str] = None,
+               after: Optional[str] = None) -> int:
+        """(key, op) 목록을 기록하고 마지막 seq 반환"""
+        with self.lock:
+            self._refresh()
+            new_entries = []
+            for key, op in ops:
+                self.last_seq += 1
+                entry = {"seq": self.last_seq, "category": category, "key": key, "op": op}
+                if before is not None:
+                    entry["before"] = before
+                    entry["after"] = after
+                new_entries.append(entry)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in new_entries))
+            self.entries.extend(new_entries)
+            self._size = self.path.stat().st_size
+            if len(self.entries) > self.max_entries:
+                self._trim()
+            return self.last_seq
+
+    def _trim(self):
+        keep = self.entries[-(self.max_entries // 2):]
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in keep))
+        os.replace(tmp_path, self.path)
+        self.entries = keep
+        self.base_seq = keep[0]['seq'] - 1
+        self._size = self.path.stat().st_size
+
+    def head(self) -> int:
+        """마지막 seq"""
+        with self.lock:
+            self._refresh()
+            return self.last_seq
+
+    def since(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """seq 이후의 기록 (잘려 나갔거나 파일이 새로 만들어져 알 수 없으면 None)"""
+        with self.lock:
+            self._refresh()
+            if seq < self.base_seq or seq > self.last_seq:
+                return None
+            return [entry for entry in self.entries if entry['seq'] > seq]
+
+
+_MISSING = object()
+
+
+def field_delta(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> tuple:
+    """두 레코드의 최상위 필드 차이 (바뀌거나 추가된 필드, 사라진 필드 목록)"""
+    old = old or {}
+    changed = {field: value for field, value in new.items() if old.get(field, _MISSING) != value}
+    removed = [field for field in old if field not in new]
+    return changed, removed
+
+
+class RevisionLog:
+    """
+    소설 하나의 엔티티 수정 이력 (Database/<소설>/revisions_<backend>.jsonl)
+
+    한 줄이 리비전 하나:
+    {"seq": 전체 순번, "category": ..., "key": ..., "rev": 엔티티별 번호(1부터),
+     "set": {바뀐 필드: 새 값}, "unset": [사라진 필드], "snapshot": true면 set이 레코드 전체, "deleted": true면 삭제}
+    엔티티마다 snapshot_interval번째 리비전마다 전체 레코드를 기록해 복원할 때 읽는 줄 수를 제한함
+    메모리에는 (카테고리, 키)별 리비전 위치만 두고, 내용은 필요한 줄만 seek해서 읽음
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: Path, snapshot_interval: int = 16):
+        self.path = Path(path)
+        self.snapshot_interval = snapshot_interval
+        self.lock = threading.RLock()
+        self.index = {}  # (category, key) -> [(rev, seq, offset, length, snapshot)]
+        self.last_seq = 0
+        self.end = 0
+        self.inode = None
+
+    @classmethod
+    def shared(cls, path: Path) -> "RevisionLog":
+        """경로별로 하나의 인스턴스를 공유"""
+        key = str(Path(path).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(path)
+            return cls._instances[key]
+
+    def _refresh(self):
+        """파일이 바뀌었으면 인덱스를 갱신 (추가된 줄만 읽고, 교체/축소되었으면 처음부터)"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self.index, self.last_seq, self.end, self.inode = {}, 0, 0, None
+            return
+        if stat.st_ino != self.inode or stat.st_size < self.end:
+            self.index, self.last_seq, self.end = {}, 0, 0
+            self.inode = stat.st_ino
+        if stat.st_size == self.end:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self.end)
+            offset = self.end
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # 기록 도중 끊긴 마지막 줄
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._index_entry(entry, offset, len(line))
+                offset += len(line)
+        self.end = offset
+
+    def _index_entry(self, entry: Dict[str, Any], offset: int, length: int):
+        self.index.setdefault((entry['category'], entry['key']), []).append(
+            (entry['rev'], entry['seq'], offset, length, bool(entry.get('snapshot')))
+        )
+        self.last_seq = max(self.last_seq, entry['seq'])
+
+    def _read_entries(self, locations: List[tuple]) -> List[Dict[str, Any]]:
+        entries = []
+        with open(self.path, 'rb') as f:
+            for _, _, offset, length, _ in locations:
+                f.seek(offset)
+                entries.append(json.loads(f.read(length)))
+        return entries
+
+    def _state(self, category: str, key: str, rev: Optional[int] = None) -> tuple:
+        """(rev 시점의 레코드 또는 None, 실제 rev) - lock을 잡은 상태에서 호출"""
+        locations = self.index.get((category, key), [])
+        if rev is not None:
+            locations = [location for location in locations if location[0] <= rev]
+        if not locations:
+            return None, 0
+        start = 0
+        for i in range(len(locations) - 1, -1, -1):
+            if locations[i][4]:
+                start = i
+                break
+        record = None
+        for entry in self._read_entries(locations[start:]):
+            if entry.get('deleted'):
+                record = None
+            elif entry.get('snapshot'):
+                record = dict(entry['set'])
+            else:
+                record = dict(record or {})
+                record.update(entry['set'])
+                for field in entry.get('unset', []):
+                    record.pop(field, None)
+        return record, locations[-1][0]
+
+    def append(self, category: str, changes: List[tuple]) -> int:
+        """
+        (key, 레코드 또는 삭제면 None) 목록을 리비전으로 기록하고 마지막 seq 반환
+        이전 리비전과 내용이 같으면 기록하지 않음
+        """
+        with self.lock:
+            self._refresh()
+            states = {}
+            lines = []
+            for key, record in changes:
+                if key in states:
+                    previous, rev, since_snapshot = states[key]
+                else:
+                    previous, rev = self._state(category, key)
+                    locations = self.index.get((category, key), [])
+                    since_snapshot = next((len(locations) - 1 - i for i in range(len(locations) - 1, -1, -1)
+                                           if locations[i][4]), len(locations))
+                if record is None:
+                    if previous is None:
+                        continue
+                    entry = {"deleted": True}
+                    since_snapshot = self.snapshot_interval  # 다시 저장되면 전체 레코드부터 시작
+                else:
+                    changed, removed = field_delta(previous, record)
+                    if previous is not None and not changed and not removed:
+                        continue
+                    if previous is None or since_snapshot + 1 >= self.snapshot_interval:
+                        entry = {"set": record, "snapshot": True}
+                        since_snapshot = 0
+                    else:
+                        entry = {"set": changed, "unset": removed}
+                        since_snapshot += 1
+                self.last_seq += 1
+                rev += 1
+                entry = {"seq": self.last_seq, "category": category, "key": key, "rev": rev, **entry}
+                lines.append(entry)
+                states[key] = (None if record is None else dict(record), rev, since_snapshot)
+            if not lines:
+                return self.last_seq
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            encoded = [(json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8') for entry in lines]
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                f.write(b''.join(encoded))
+            if self.inode is None:
+                self.inode = self.path.stat().st_ino
+            if offset != self.end:
+                # 다른 프로세스가 사이에 기록했으면 처음부터 다시 읽음
+                self.index, self.last_seq, self.end = {}, 0, 0
+                self._refresh()
+            else:
+                for entry, line in zip(lines, encoded):
+                    self._index_entry(entry, offset, len(line))
+                    offset += len(line)
+                self.end = offset
+            return self.last_seq
+
+    def head(self) -> int:
+        """마지막 seq"""
+        with self.lock:
+            self._refresh()
+            return self.last_seq
+
+    def latest_rev(self, category: str, key: str) -> int:
+        with self.lock:
+            self._refresh()
+            locations = self.index.get((category, key))
+            return locations[-1][0] if locations else 0
+
+    def get(self, category: str, key: str, rev: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """rev 시점의 레코드 (rev가 None이면 최신, 삭제되었거나 이력이 없으면 None)"""
+        with self.lock:
+            self._refresh()
+            return self._state(category, key, rev)[0]
+
+    def diff(self, category: str, key: str, from_rev: int, to_rev: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        from_rev 이후 to_rev까지 바뀐 필드만 {필드: {"old": ..., "new": ...}}로 반환
+        바뀐 필드는 그 사이 리비전의 delta에서 모으고, 값 비교는 그 필드에 대해서만 함
+        """
+        with self.lock:
+            self._refresh()
+            locations = self.index.get((category, key), [])
+            between = [location for location in locations
+                       if location[0] > from_rev and (to_rev is None or location[0] <= to_rev)]
+            if not between:
+                return {}
+            old, _ = self._state(category, key, from_rev)
+            new, _ = self._state(category, key, between[-1][0])
+            fields = set()
+            for entry in self._read_entries(between):
+                if entry.get('deleted') or entry.get('snapshot'):
+                    fields.update((old or {}).keys())
+                    fields.update((new or {}).keys())
+                else:
+                    fields.update(entry['set'].keys())
+                    fields.update(entry.get('unset', []))
+        diff = {}
+        for field in sorted(fields):
+            old_value = (old or {}).get(field)
+            new_value = (new or {}).get(field)
+            if old_value != new_value or (field in (old or {})) != (field in (new or {})):
+                diff[field] = {"old": old_value, "new": new_value}
+        return diff
+
+    def changed_since(self, seq: int, category: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """seq 이후 수정된 엔티티별 필드 차이 {카테고리: {키: diff}}"""
+        with self.lock:
+            self._refresh()
+            targets = []
+            for (entry_category, key), locations in self.index.items():
+                if category is not None and entry_category != category:
+                    continue
+                if locations[-1][1] <= seq:
+                    continue
+                from_rev = max((location[0] for location in locations if location[1] <= seq), default=0)
+                targets.append((entry_category, key, from_rev))
+            result = {}
+            for entry_category, key, from_rev in targets:
+                diff = self.diff(entry_category, key, from_rev)
+                if diff:
+                    result.setdefault(entry_category, {})[key] = diff
+            return result
+
+
+class EntityCache:
+    """
+    (소설, 카테고리)별 엔티티 목록 읽기 캐시
+
+    - 저장소의 signature()가 바뀌면 무효 (외부에서 파일을 고쳐도 감지)
+    - save_* 호출 시 invalidate()로 즉시 무효화
+    - 소설 단위 LRU: max_novels개를 넘으면 가장 오래 안 쓴 소설부터 제거
+    - 호출자가 받은 레코드를 수정해도 캐시가 오염되지 않도록 직렬화된 JSON을 보관하고
+      적중 시 json.loads로 새 객체를 만들어 반환 (deepcopy보다 빠름)
+    """
+
+    def __init__(self, max_novels: int = 8):
+        self.max_novels = max_novels
+        self._entries = OrderedDict()  # (root, novel) -> {category: (signature, payload)}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, root: str, novel_name: str, category: str, signature) -> Optional[List[Dict[str, Any]]]:
+        """유효한 캐시가 있으면 레코드 목록, 없으면 None"""
+        novel_key = (root, novel_name)
+        with self._lock:
+            categories = self._entries.get(novel_key)
+            entry = categories.get(category) if categories else None
+            if entry is None or signature is None or entry[0] != signature:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(novel_key)
+            self.hits += 1
+            payload = entry[1]
+        return json.loads(payload)
+
+    def put(self, root: str, novel_name: str, category: str, signature, records: List[Dict[str, Any]]):
+        """레코드 목록을 캐시에 저장"""
+        if signature is None:
+            return
+        payload = json.dumps(records, ensure_ascii=False)
+        novel_key = (root, novel_name)
+        with self._lock:
+            self._entries.setdefault(novel_key, {})[category] = (signature, payload)
+            self._entries.move_to_end(novel_key)
+            while len(self._entries) > self.max_novels:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, root: str, novel_name: str, category: Optional[str] = None):
+        """소설(또는 소설의 한 카테고리) 캐시 무효화"""
+        novel_key = (root, novel_name)
+        with self._lock:
+            if category is None:
+                self._entries.pop(novel_key, None)
+            elif novel_key in self._entries:
+                self._entries[novel_key].pop(category, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """적중/실패/제거 횟수와 캐시된 소설 수"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "novels": len(self._entries),
+            }
+
+
+# 프로세스 안의 DatabaseManager들이 함께 쓰는 기본 캐시
+# (Streamlit은 rerun마다 에이전트를 새로 만들기 때문에 인스턴스별 캐시로는 효과가 없음)
+shared_entity_cache = EntityCache()
+
+
+def migrate_json_storage(target, database_path: str = "Database",
+                         novel_name: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """
+    기존 Database/<소설>/{characters,world,Timeline,Storyboard}/*.json 을 다른 저장소로 일괄 이전
+
+    Args:
+        target: save_rows(novel, category, rows)를 가진 저장소 (SQLiteStorage, SegmentStorage)
+        database_path: Database 폴더 경로
+        novel_name: 특정 소설만 이전할 경우 소설 이름 (None이면 전체)
+
+    Returns:
+        {소설: {카테고리: 이전된 레코드 수}}
+    """
+    source = JsonFileStorage(Path(database_path))
+    novels = [novel_name] if novel_name else sorted(
+        d.name for d in Path(database_path).iterdir() if d.is_dir() and not d.name.startswith('.')
+    )
+
+    summary = {}
+    for novel in novels:
+        summary[novel] = {}
+        for category in CATEGORIES:
+            category_dir = source.category_dir(novel, category)
+            rows = []
+            seen = set()
+            for file in sorted(category_dir.glob('*.json')) if category_dir.exists() else []:
+                try:
+                    with open(file, 'r', encoding='utf-8') as f:
+                        record = json.load(f)
+                except Exception as e:
+                    print(f"{CATEGORY_LABELS[category]} 파일 읽기 오류 {file}: {e}")
+                    continue
+                # 키가 없거나 겹치는 레코드는 파일 이름으로 구분해 유실을 막음
+                key = entity_key(category, record) or file.stem
+                if key in seen:
+                    key = f"{key}#{file.stem}"
+                seen.add(key)
+                rows.append((key, record))
+            if rows:
+                target.save_rows(novel, category, rows)
+            summary[novel][category] = len(rows)
+
+    return summary
+
+
+def migrate_json_to_sqlite(database_path: str = "Database", novel_name: Optional[str] = None,
+                           db_file: str = "library.sqlite3") -> Dict[str, Dict[str, int]]:
+    """JSON 파일 DB를 SQLite 저장소로 이전"""
+    target = SQLiteStorage(Path(database_path), db_file)
+    try:
+        return migrate_json_storage(target, database_path, novel_name)
+    finally:
+        target.close()
+
+
+def migrate_json_to_segments(database_path: str = "Database",
+                             novel_name: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """JSON 파일 DB를 세그먼트 저장소로 이전"""
+    return migrate_json_storage(SegmentStorage.shared(Path(database_path)), database_path, novel_name)
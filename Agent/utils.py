@@ -1,144 +1,655 @@
+import bisect
+import codecs
+import heapq
 import json
 import re
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Iterable, BinaryIO, Set
 import datetime
-
-def safe_filename(s):
-    """
-    문자열에서 한글, 영문, 숫자만 남기고 나머지는 _로 치환. 길이 제한(40자)
-    """
-    return re.sub(r'[^가-힣a-zA-Z0-9]', '_', str(s))[:40]
+from .candidates import CandidateFilter, COMMON_WORDS
+from .catalog import LibraryCatalog
+from .dates import DateNormalizer, date_key, event_date_key, sort_events
+from .document import Document, MentionIndex
+from .keywords import KeywordMatcher
+from .manuscripts import ManuscriptStore
+from .records import EntityRecord, to_record, to_records
+from .storage import CATEGORIES, KEY_FIELDS, JsonFileStorage, SQLiteStorage, SegmentStorage, EntityCache, ChangeLog, RevisionLog, shared_entity_cache, entity_key, signature_digest
 
 class DatabaseManager:
     """
     데이터베이스 파일들을 관리하는 클래스
+
+    backend="json"이면 엔티티마다 JSON 파일, "sqlite"이면 Database/library.sqlite3,
+    "segment"이면 카테고리마다 추가 전용 segment.jsonl 파일에 저장
+    get_* 결과는 EntityCache에 캐시되며 파일 수정 시각이 바뀌거나 save_*가 호출되면 다시 읽음
+    save_*/save_many/delete_entity는 소설별 변경 기록(ChangeLog)에 남고 changes_since()로 조회할 수 있음
+    같은 쓰기는 엔티티별 수정 이력(RevisionLog)에 필드 단위 delta로도 남아 get_revision()/diff_revisions()로 조회할 수 있음
+    쓰기 후 해당 카테고리 엔티티 수는 서재 카탈로그(LibraryCatalog)에 반영되어 novel_names()/library_overview()로 조회할 수 있음
     """
     
-    def __init__(self, database_path: str = "Database"):
+    def __init__(self, database_path: str = "Database", backend: str = "json", sqlite_file: str = "library.sqlite3",
+                 cache: Optional[EntityCache] = shared_entity_cache, segment_options: Optional[Dict[str, Any]] = None,
+                 load_workers: int = 8, parallel_load_threshold: int = 32):
         self.database_path = Path(database_path)
+        self.backend = backend
+        self.cache = cache
+        self._cache_root = f"{backend}:{self.database_path.resolve()}"
+        self.catalog = LibraryCatalog.shared(self.database_path)
+        self.manuscripts = ManuscriptStore.shared(str(self.database_path))
+        if backend == "sqlite":
+            self.storage = SQLiteStorage(self.database_path, sqlite_file)
+        elif backend == "segment":
+            self.storage = SegmentStorage.shared(self.database_path, **(segment_options or {}))
+        elif backend == "json":
+            self.storage = JsonFileStorage(self.database_path, load_workers, parallel_load_threshold)
+        else:
+            raise ValueError(f"지원하지 않는 저장소 백엔드입니다: {backend}")
+
+    @classmethod
+    def from_config(cls, database_path: str, config) -> "DatabaseManager":
+        """AgentConfig.storage_settings에 맞춰 생성"""
+        cache = shared_entity_cache if config.get_storage_setting("cache_enabled", True) else None
+        if cache is not None:
+            cache.max_novels = config.get_storage_setting("cache_max_novels", cache.max_novels)
+        return cls(
+            database_path,
+            backend=config.get_storage_setting("backend", "json"),
+            sqlite_file=config.get_storage_setting("sqlite_file", "library.sqlite3"),
+            cache=cache,
+            segment_options={
+                "compact_ratio": config.get_storage_setting("segment_compact_ratio", 0.5),
+                "compact_min_records": config.get_storage_setting("segment_compact_min_records", 64),
+            },
+            load_workers=config.get_storage_setting("load_workers", 8),
+            parallel_load_threshold=config.get_storage_setting("parallel_load_threshold", 32)
+        )
+
+    def _load(self, novel_name: str, category: str) -> List[Dict[str, Any]]:
+        """캐시를 거쳐 카테고리 전체를 읽음"""
+        if self.cache is None:
+            return self.storage.load(novel_name, category)
+        # 저장소를 읽기 전에 signature를 잡아 두어야 읽는 도중 바뀐 내용이 다음 호출에서 감지됨
+        signature = self.storage.signature(novel_name, category)
+        records = self.cache.get(self._cache_root, novel_name, category, signature)
+        if records is None:
+            records = self.storage.load(novel_name, category)
+            self.cache.put(self._cache_root, novel_name, category, signature, records)
+        return records
+
+    def _prepare(self, category: str, record: dict) -> dict:
+        """카테고리별 저장 전 필드 보정"""
+        if category == 'Timeline' and 'explicit_events' in record:
+            # explicit_events -> type 필드로 변환
+            record['type'] = '명시적' if record['explicit_events'] else '암묵적'
+        if category == 'Timeline':
+            # 정렬/기간 조회/충돌 확인용 날짜 키 (해석할 수 없는 날짜면 None)
+            record['date_key'] = date_key(record.get('date') or record.get('날짜'))
+        return record
+
+    def _change_log(self, novel_name: str) -> ChangeLog:
+        return ChangeLog.shared(self.database_path / novel_name / f"changes_{self.backend}.jsonl")
+
+    def _revision_log(self, novel_name: str) -> RevisionLog:
+        return RevisionLog.shared(self.database_path / novel_name / f"revisions_{self.backend}.jsonl")
+
+    def _category_digest(self, novel_name: str, category: str) -> Optional[str]:
+        """외부 수정을 확인해야 하는 저장소에서만 카테고리 signature 요약 반환"""
+        if not self.storage.external_edits:
+            return None
+        return signature_digest(self.storage.signature(novel_name, category))
+
+    def _write(self, novel_name: str, category: str, rows: List[tuple], write):
+        """
+        write()를 실행하고 성공하면 (key, 레코드 또는 삭제면 None) 목록을 변경 기록과 수정 이력에 남김
+        (write()가 False를 반환하면 기록하지 않음)
+        쓰기 전후 signature 요약을 같은 잠금 안에서 잡아 기록 사이에 외부 수정이 끼었는지 판별할 수 있게 함
+        """
+        log = self._change_log(novel_name)
+        with log.lock:
+            before = self._category_digest(novel_name, category)
+            try:
+                result = write()
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(self._cache_root, novel_name, category)
+            if rows and result is not False:
+                ops = [(key, 'upsert' if record is not None else 'delete') for key, record in rows]
+                log.append(category, ops, before, self._category_digest(novel_name, category))
+                self._revision_log(novel_name).append(category, rows)
+        if rows and result is not False:
+            self._update_catalog(novel_name, category)
+        return result
+
+    def _update_catalog(self, novel_name: str, category: str):
+        try:
+            self.catalog.update(novel_name, self.backend, {category: self.storage.count(novel_name, category)})
+        except Exception as e:
+            print(f"카탈로그 갱신 오류 {novel_name}: {e}")
+
+    def _save(self, novel_name: str, category: str, record: dict):
+        """엔티티 저장 후 해당 카테고리 캐시 무효화"""
+        record = self._prepare(category, record)
+        key = self._record_key(category, record)
+        self._write(novel_name, category, [(key, record)],
+                    lambda: self.storage.save(novel_name, category, key, record))
+
+    def save_many(self, novel_name: str, category: str, records: List[dict]) -> int:
+        """
+        한 카테고리의 여러 엔티티를 한 번에 저장 (전부 저장되거나 하나도 저장되지 않음)
+
+        Args:
+            novel_name: 소설 이름
+            category: 'characters', 'world', 'Timeline', 'Storyboard' 중 하나
+            records: 저장할 엔티티 목록
+
+        Returns:
+            저장한 엔티티 수
+        """
+        if category not in CATEGORIES:
+            raise ValueError(f"알 수 없는 카테고리입니다: {category}")
+        if not records:
+            return 0
+        rows = []
+        for record in records:
+            record = self._prepare(category, record)
+            rows.append((self._record_key(category, record), record))
+        self._write(novel_name, category, rows,
+                    lambda: self.storage.save_rows(novel_name, category, rows))
+        return len(rows)
+
+    def delete_entity(self, novel_name: str, category: str, key: str) -> bool:
+        """
+        키(이름/제목)로 엔티티 하나를 삭제
+
+        Returns:
+            삭제했으면 True, 없는 키면 False
+        """
+        if category not in CATEGORIES:
+            raise ValueError(f"알 수 없는 카테고리입니다: {category}")
+        return self._write(novel_name, category, [(key, None)],
+                           lambda: self.storage.delete(novel_name, category, key))
+
+    def get_revision(self, novel_name: str, key: str, rev: Optional[int] = None,
+                     category: str = 'characters') -> Optional[Dict[str, Any]]:
+        """
+        엔티티의 특정 리비전을 수정 이력에서 복원
+
+        Args:
+            novel_name: 소설 이름
+            key: 엔티티 키(이름/제목)
+            rev: 리비전 번호 (1부터, None이면 최신)
+            category: 'characters', 'world', 'Timeline', 'Storyboard' 중 하나
+
+        Returns:
+            해당 시점의 엔티티, 그 시점에 없었거나(삭제 포함) 이력이 없으면 None
+        """
+        if category not in CATEGORIES:
+            raise ValueError(f"알 수 없는 카테고리입니다: {category}")
+        return self._revision_log(novel_name).get(category, key, rev)
+
+    def latest_revision(self, novel_name: str, key: str, category: str = 'characters') -> int:
+        """엔티티의 마지막 리비전 번호 (이력이 없으면 0)"""
+        return self._revision_log(novel_name).latest_rev(category, key)
+
+    def diff_revisions(self, novel_name: str, key: str, from_rev: int, to_rev: Optional[int] = None,
+                       category: str = 'characters') -> Dict[str, Dict[str, Any]]:
+        """두 리비전 사이에 바뀐 필드 {필드: {"old": ..., "new": ...}}"""
+        return self._revision_log(novel_name).diff(category, key, from_rev, to_rev)
+
+    def revision_marker(self, novel_name: str) -> int:
+        """현재 수정 이력 위치 (분석 시점 등을 기억했다가 changed_since_marker에 넘김)"""
+        return self._revision_log(novel_name).head()
+
+    def state_fingerprint(self, novel_name: str) -> str:
+        """
+        소설 DB 상태 지문 (분석 결과 캐시 키용)
+
+        수정 이력 위치와 카테고리별 저장소 signature로 만들므로 save_*/delete_entity뿐 아니라
+        파일을 직접 고친 경우에도 바뀜
+        """
+        state = [self.backend, self.revision_marker(novel_name)]
+        state.extend(self.storage.signature(novel_name, category) for category in CATEGORIES)
+        return signature_digest(tuple(state))
+
+    def changed_since_marker(self, novel_name: str, marker: int,
+                             category: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """marker 이후 수정된 엔티티의 필드 차이 {카테고리: {키: {필드: {"old", "new"}}}}"""
+        return self._revision_log(novel_name).changed_since(marker, category)
+
+    def changes_since(self, novel_name: str, cursor: Optional[Dict[str, Any]] = None,
+                      categories: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        커서 이후 추가/수정/삭제된 엔티티만 반환
+
+        Args:
+            novel_name: 소설 이름
+            cursor: 이전 호출이 돌려준 cursor (None이면 전체를 돌려줌)
+            categories: 확인할 카테고리 (기본값: 전체)
+
+        Returns:
+            {
+                "cursor": 다음 호출에 넘길 값,
+                "changes": {
+                    카테고리: {"reset": bool, "upserted": [엔티티...], "deleted": [키...]}
+                }
+            }
+            변경이 없는 카테고리는 changes에 없음
+            reset이 True이면 upserted가 카테고리 전체이며 호출자는 기존 목록을 통째로 바꿔야 함
+            (첫 호출, 변경 기록이 잘려 나간 경우, 기록되지 않은 외부 파일 수정이 감지된 경우)
+        """
+        categories = list(categories or CATEGORIES)
+        log = self._change_log(novel_name)
+        with log.lock:
+            last_seq = log.head()
+            entries = None if cursor is None else log.since(cursor.get("seq", 0))
+            digests = {category: self._category_digest(novel_name, category) for category in categories}
+
+        changes = {}
+        for category in categories:
+            if entries is None or category not in cursor.get("digests", {}):
+                reset = True
+                category_entries = []
+            else:
+                category_entries = [entry for entry in entries if entry['category'] == category]
+                reset = not self._chain_matches(cursor["digests"][category], category_entries, digests[category])
+            if reset:
+                changes[category] = {"reset": True, "upserted": self._load(novel_name, category), "deleted": []}
+                continue
+            if not category_entries:
+                continue
+            ops = {}
+            for entry in category_entries:
+                ops.pop(entry['key'], None)  # 마지막 변경 순서를 유지
+                ops[entry['key']] = entry['op']
+            upserted, deleted = [], []
+            for key, op in ops.items():
+                record = self.get_entity(novel_name, category, key) if op == 'upsert' else None
+                if record is None:
+                    deleted.append(key)
+                else:
+                    upserted.append(record)
+            changes[category] = {"reset": False, "upserted": upserted, "deleted": deleted}
+
+        return {"cursor": {"seq": last_seq, "digests": digests}, "changes": changes}
+
+    @staticmethod
+    def _chain_matches(start: Optional[str], entries: List[Dict[str, Any]], current: Optional[str]) -> bool:
+        """
+        커서 시점의 signature 요약에서 기록된 쓰기들의 before -> after를 이어 현재 요약에 도달하는지 확인
+        중간에 이어지지 않으면 기록되지 않은 변경(외부 파일 수정)이 있었던 것
+        """
+        digest = start
+        for entry in entries:
+            if 'before' not in entry:
+                continue  # 외부 수정 확인이 필요 없는 저장소
+            if entry['before'] == digest:
+                digest = entry['after']
+            elif entry['after'] != digest:  # 같은 묶음(save_many)의 나머지 줄이면 after가 이미 같음
+                return False
+        return digest == current
+
+    def novel_names(self) -> List[str]:
+        """서재 카탈로그의 소설 이름 목록 (이름순)"""
+        return self.catalog.novels()
+
+    def library_overview(self) -> List[Dict[str, Any]]:
+        """
+        소설별 요약 목록 (이름순)
+
+        Returns:
+            [{"name": 소설 이름, "counts": {카테고리: 엔티티 수}, "manuscript_files": 원고 수,
+              "manuscript_bytes": 원고 전체 바이트, "updated_at": 마지막 수정 시각}, ...]
+            카탈로그에 아직 집계가 없는 소설(외부에서 추가된 폴더 등)은 이번에 한 번 집계해 카탈로그에 저장함
+        """
+        overview = []
+        for name, info in sorted(self.catalog.entries().items()):
+            counts = info.get('counts', {}).get(self.backend, {})
+            missing = [category for category in CATEGORIES if category not in counts]
+            if missing or 'manuscript_files' not in info:
+                counts = dict(counts)
+                counts.update({category: self.storage.count(name, category) for category in missing})
+                manuscripts = self.manuscripts.stats(name)
+                self.catalog.update(name, self.backend, counts, manuscripts, touch=False)
+                info = self.catalog.get(name) or info
+            overview.append({
+                "name": name,
+                "counts": {category: counts.get(category, 0) for category in CATEGORIES},
+                "manuscript_files": info.get('manuscript_files', 0),
+                "manuscript_bytes": info.get('manuscript_bytes', 0),
+                "updated_at": info.get('updated_at'),
+            })
+        return overview
+
+    # 내보내기 아카이브 형식 버전 (manifest.json의 "format")
+    ARCHIVE_FORMAT = 1
+    # 가져오기 시 save_many 한 번에 넘기는 최대 레코드 수
+    IMPORT_BATCH_SIZE = 1000
+    # 아카이브 멤버를 만들 때 이 크기까지는 메모리에, 넘으면 임시 파일에 모음
+    SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+    def _add_archive_member(self, archive: tarfile.TarFile, name: str, chunks: Iterable[bytes]) -> int:
+        """바이트 조각들을 임시 버퍼에 모아 크기를 정한 뒤 아카이브 멤버 하나로 추가"""
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as buffer:
+            for chunk in chunks:
+                buffer.write(chunk)
+            info = tarfile.TarInfo(name)
+            info.size = buffer.tell()
+            info.mtime = int(time.time())
+            buffer.seek(0)
+            archive.addfile(info, buffer)
+            return info.size
+
+    def _iter_entity_lines(self, novel_name: str, category: str, counter: Dict[str, int]) -> Iterator[bytes]:
+        for record in self.iter_entities(novel_name, category):
+            counter[category] = counter.get(category, 0) + 1
+            yield (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+    def export_novel(self, novel_name: str, fileobj: BinaryIO) -> Dict[str, Any]:
+        """
+        소설 하나(모든 카테고리 엔티티와 원고)를 tar.gz 아카이브 하나로 스트리밍 저장
+
+        아카이브 구성 (이 순서로 기록):
+            manifest.json: 형식 버전, 소설 이름, 원고 이름 목록
+            entities/<카테고리>.jsonl: 한 줄에 엔티티 하나
+            manuscripts/<번호>: manifest의 원고 이름 순서대로 원고 내용
+        변경 기록/수정 이력은 저장소별 기록이므로 포함하지 않음
+
+        Args:
+            novel_name: 소설 이름
+            fileobj: 쓰기 가능한 바이너리 파일 객체 (탐색(seek) 불필요)
+
+        Returns:
+            {"entities": {카테고리: 엔티티 수}, "manuscripts": 원고 수}
+        """
+        counts = {}
+        manuscript_names = self.manuscripts.list_files(novel_name)
+        manifest = {
+            "format": self.ARCHIVE_FORMAT,
+            "novel": novel_name,
+            "manuscripts": manuscript_names,
+            "exported_at": datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+        with tarfile.open(fileobj=fileobj, mode='w|gz') as archive:
+            self._add_archive_member(archive, "manifest.json",
+                                     [json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')])
+            for category in CATEGORIES:
+                counts[category] = 0
+                self._add_archive_member(archive, f"entities/{category}.jsonl",
+                                         self._iter_entity_lines(novel_name, category, counts))
+            for index, file_name in enumerate(manuscript_names):
+                self._add_archive_member(archive, f"manuscripts/{index}",
+                                         self.manuscripts.iter_chunks(novel_name, file_name))
+        return {"entities": counts, "manuscripts": len(manuscript_names)}
+
+    def _import_entities(self, novel_name: str, category: str, source: BinaryIO) -> int:
+        """JSON-Lines 멤버를 IMPORT_BATCH_SIZE개씩 save_many로 저장"""
+        imported = 0
+        batch = []
+        for line in source:
+            if not line.strip():
+                continue
+            batch.append(json.loads(line.decode('utf-8')))
+            if len(batch) >= self.IMPORT_BATCH_SIZE:
+                imported += self.save_many(novel_name, category, batch)
+                batch = []
+        if batch:
+            imported += self.save_many(novel_name, category, batch)
+        return imported
+
+    def import_novel(self, fileobj: BinaryIO, novel_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        export_novel()로 만든 아카이브를 앞에서부터 한 번 읽으며 복원 (같은 키의 엔티티/같은 이름의 원고는 덮어씀)
+
+        엔티티는 IMPORT_BATCH_SIZE개씩 save_many로 저장하고, 원고는 ManuscriptStore에 저장함
+
+        Args:
+            fileobj: 읽기 가능한 바이너리 파일 객체 (탐색(seek) 불필요)
+            novel_name: 다른 이름으로 가져올 경우 소설 이름 (None이면 아카이브의 이름)
+
+        Returns:
+            {"novel": 소설 이름, "entities": {카테고리: 엔티티 수}, "manuscripts": 원고 수}
+        """
+        counts = {}
+        imported_manuscripts = 0
+        manifest = None
+        with tarfile.open(fileobj=fileobj, mode='r|gz') as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                source = archive.extractfile(member)
+                if manifest is None:
+                    if member.name != 'manifest.json':
+                        raise ValueError("소설 아카이브 형식이 올바르지 않습니다: manifest.json이 처음에 없습니다")
+                    manifest = json.loads(source.read().decode('utf-8'))
+                    if manifest.get('format') != self.ARCHIVE_FORMAT:
+                        raise ValueError(f"지원하지 않는 소설 아카이브 형식입니다: {manifest.get('format')}")
+                    novel_name = novel_name or manifest['novel']
+                    continue
+                kind, _, name = member.name.partition('/')
+                if kind == 'entities' and name.endswith('.jsonl') and name[:-len('.jsonl')] in CATEGORIES:
+                    category = name[:-len('.jsonl')]
+                    counts[category] = self._import_entities(novel_name, category, source)
+                elif kind == 'manuscripts' and name.isdigit() and int(name) < len(manifest['manuscripts']):
+                    self.manuscripts.write(novel_name, manifest['manuscripts'][int(name)],
+                                           source.read().decode('utf-8'))
+                    imported_manuscripts += 1
+                else:
+                    print(f"소설 아카이브의 알 수 없는 항목을 건너뜀: {member.name}")
+        if manifest is None:
+            raise ValueError("소설 아카이브 형식이 올바르지 않습니다: manifest.json이 없습니다")
+        return {"novel": novel_name, "entities": counts, "manuscripts": imported_manuscripts}
+
+    def cache_stats(self) -> Dict[str, int]:
+        """읽기 캐시 적중/실패 통계"""
+        if self.cache is None:
+            return {"hits": 0, "misses": 0, "evictions": 0, "novels": 0}
+        return self.cache.stats()
     
     def get_characters(self, novel_name: str) -> List[Dict[str, Any]]:
         """소설의 인물 정보를 가져옴"""
-        characters = []
-        characters_dir = self.database_path / novel_name / 'characters'
-        
-        if characters_dir.exists():
-            for file in characters_dir.glob('*.json'):
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        character_data = json.load(f)
-                        characters.append(character_data)
-                except Exception as e:
-                    print(f"인물 파일 읽기 오류 {file}: {e}")
-        
-        return characters
+        return self._load(novel_name, 'characters')
     
     def get_world_settings(self, novel_name: str) -> List[Dict[str, Any]]:
         """소설의 세계관 설정을 가져옴"""
-        world_settings = []
-        world_dir = self.database_path / novel_name / 'world'
-        
-        if world_dir.exists():
-            for file in world_dir.glob('*.json'):
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        world_data = json.load(f)
-                        world_settings.append(world_data)
-                except Exception as e:
-                    print(f"세계관 설정 파일 읽기 오류 {file}: {e}")
-        
-        return world_settings
+        return self._load(novel_name, 'world')
     
     def get_timeline_events(self, novel_name: str) -> List[Dict[str, Any]]:
         """소설의 타임라인 이벤트를 가져옴"""
+        return self._load(novel_name, 'Timeline')
+    
+    def sorted_timeline_events(self, novel_name: str) -> List[Dict[str, Any]]:
+        """타임라인 이벤트를 date_key 순서로 (날짜를 해석할 수 없는 이벤트는 저장 순서대로 뒤에)"""
+        return sort_events(self._load(novel_name, 'Timeline'))
+
+    def timeline_between(self, novel_name: str, start=None, end=None) -> List[Dict[str, Any]]:
+        """
+        날짜가 [start, end] 범위에 드는 타임라인 이벤트 (date_key 순서)
+
+        Args:
+            start, end: 날짜 문자열 또는 date_key (None이면 그쪽 끝은 제한 없음)
+        """
+        start_key = date_key(start) if isinstance(start, str) else start
+        end_key = date_key(end) if isinstance(end, str) else end
+        if (start is not None and start_key is None) or (end is not None and end_key is None):
+            raise ValueError(f"날짜를 해석할 수 없습니다: {start if start_key is None else end}")
         events = []
-        timeline_dir = self.database_path / novel_name / 'Timeline'
-        
-        if timeline_dir.exists():
-            for file in timeline_dir.glob('*.json'):
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        timeline_data = json.load(f)
-                        events.append(timeline_data)
-                except Exception as e:
-                    print(f"타임라인 파일 읽기 오류 {file}: {e}")
-        
+        for event in self.sorted_timeline_events(novel_name):
+            key = event_date_key(event)
+            if key is None:
+                break
+            if (start_key is None or key >= start_key) and (end_key is None or key <= end_key):
+                events.append(event)
         return events
     
     def get_storyboards(self, novel_name: str) -> List[Dict[str, Any]]:
         """소설의 스토리보드를 가져옴"""
-        storyboards = []
-        storyboard_dir = self.database_path / novel_name / 'Storyboard'
-        
-        if storyboard_dir.exists():
-            for file in storyboard_dir.glob('*.json'):
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        storyboard_data = json.load(f)
-                        storyboards.append(storyboard_data)
-                except Exception as e:
-                    print(f"스토리보드 파일 읽기 오류 {file}: {e}")
-        
-        return storyboards
+        return self._load(novel_name, 'Storyboard')
+
+    def get_entity(self, novel_name: str, category: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        키(이름/제목)로 엔티티 하나를 가져옴 (카테고리 전체를 읽지 않음)
+
+        Args:
+            novel_name: 소설 이름
+            category: 'characters', 'world', 'Timeline', 'Storyboard' 중 하나
+            key: name/이름/title 등 KEY_FIELDS의 값
+
+        Returns:
+            엔티티 딕셔너리, 없으면 None
+        """
+        if category not in CATEGORIES:
+            raise ValueError(f"알 수 없는 카테고리입니다: {category}")
+        return self.storage.get(novel_name, category, key)
+
+    def get_character(self, novel_name: str, name: str) -> Optional[Dict[str, Any]]:
+        """이름으로 인물 하나를 가져옴"""
+        return self.get_entity(novel_name, 'characters', name)
+
+    def get_world_setting(self, novel_name: str, name: str) -> Optional[Dict[str, Any]]:
+        """이름(또는 title)으로 세계관 요소 하나를 가져옴"""
+        return self.get_entity(novel_name, 'world', name)
+
+    def get_timeline_event(self, novel_name: str, title: str) -> Optional[Dict[str, Any]]:
+        """제목으로 타임라인 이벤트 하나를 가져옴"""
+        return self.get_entity(novel_name, 'Timeline', title)
+
+    def get_storyboard(self, novel_name: str, title: str) -> Optional[Dict[str, Any]]:
+        """제목으로 스토리보드 하나를 가져옴"""
+        return self.get_entity(novel_name, 'Storyboard', title)
+
+    def iter_entities(self, novel_name: str, category: str,
+                      fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        카테고리의 엔티티를 하나씩 반환 (전체 목록을 메모리에 만들지 않음)
+
+        캐시에 유효한 목록이 있으면 그것을 쓰고, 없으면 저장소에서 바로 스트리밍하며
+        이 경우 캐시는 채우지 않음
+
+        Args:
+            novel_name: 소설 이름
+            category: 'characters', 'world', 'Timeline', 'Storyboard' 중 하나
+            fields: 지정하면 해당 필드만 남긴 딕셔너리를 반환 (없는 필드는 생략)
+        """
+        if category not in CATEGORIES:
+            raise ValueError(f"알 수 없는 카테고리입니다: {category}")
+        records = None
+        if self.cache is not None:
+            signature = self.storage.signature(novel_name, category)
+            records = self.cache.get(self._cache_root, novel_name, category, signature)
+        if records is None:
+            records = self.storage.iter(novel_name, category)
+        if fields is None:
+            yield from records
+            return
+        fields = tuple(fields)
+        for record in records:
+            yield {field: record[field] for field in fields if field in record}
+
+    def iter_characters(self, novel_name: str, fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """인물 정보를 하나씩 반환"""
+        return self.iter_entities(novel_name, 'characters', fields)
+
+    def iter_world_settings(self, novel_name: str, fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """세계관 설정을 하나씩 반환"""
+        return self.iter_entities(novel_name, 'world', fields)
+
+    def iter_timeline_events(self, novel_name: str, fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """타임라인 이벤트를 하나씩 반환"""
+        return self.iter_entities(novel_name, 'Timeline', fields)
+
+    def iter_storyboards(self, novel_name: str, fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """스토리보드를 하나씩 반환"""
+        return self.iter_entities(novel_name, 'Storyboard', fields)
+
+    def get_records(self, novel_name: str, category: str) -> List[EntityRecord]:
+        """
+        카테고리 전체를 정규화된 레코드(Character, WorldElement, TimelineEvent, StoryboardChapter)로 가져옴
+        name/이름 같은 필드 이름 차이는 여기서 한 번만 정리되며 record.to_dict()는 원래 JSON을 그대로 돌려줌
+        """
+        if category not in CATEGORIES:
+            raise ValueError(f"알 수 없는 카테고리입니다: {category}")
+        return to_records(category, self._load(novel_name, category))
+
+    def iter_records(self, novel_name: str, category: str) -> Iterator[EntityRecord]:
+        """get_records의 스트리밍 버전"""
+        for record in self.iter_entities(novel_name, category):
+            yield to_record(category, record)
+
+    def entity_names(self, novel_name: str, category: str) -> List[str]:
+        """카테고리 엔티티의 키(이름/제목) 목록만 가져옴"""
+        names = []
+        for record in self.iter_entities(novel_name, category, KEY_FIELDS[category]):
+            name = entity_key(category, record)
+            if name:
+                names.append(name)
+        return names
+
+    def count_entities(self, novel_name: str, category: str) -> int:
+        """카테고리 엔티티 수 (가능하면 레코드를 읽지 않음)"""
+        if category not in CATEGORIES:
+            raise ValueError(f"알 수 없는 카테고리입니다: {category}")
+        return self.storage.count(novel_name, category)
+
+    def _record_key(self, category: str, record: dict) -> str:
+        """저장용 키 (키 필드가 없으면 시각 기반 임시 키)"""
+        return entity_key(category, record) or f"unknown_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
 
     def save_world_setting(self, novel_name: str, world_element: dict):
         """
         세계관 요소를 DB에 저장
         같은 title(또는 name)이 이미 존재하면 해당 파일을 덮어쓰고, 없으면 새로 저장
         """
-        world_dir = self.database_path / novel_name / 'world'
-        world_dir.mkdir(parents=True, exist_ok=True)
-        name = world_element.get('name') or world_element.get('title') or f"unknown_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-        file_path = world_dir / f"world_{safe_filename(name)}.json"
-        # 이미 같은 파일이 있으면 덮어쓰기, 없으면 새로 생성
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(world_element, f, ensure_ascii=False, indent=2)
+        self._save(novel_name, 'world', world_element)
 
     def save_timeline_event(self, novel_name: str, event: dict):
         """
         타임라인 이벤트를 DB에 저장
         """
-        timeline_dir = self.database_path / novel_name / 'Timeline'
-        timeline_dir.mkdir(parents=True, exist_ok=True)
-        title = event.get('title') or event.get('date') or f"unknown_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-        # explicit_events -> type 필드로 변환
-        if 'explicit_events' in event:
-            event['type'] = '명시적' if event['explicit_events'] else '암묵적'
-        file_path = timeline_dir / f"timeline_{safe_filename(title)}.json"
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(event, f, ensure_ascii=False, indent=2)
+        self._save(novel_name, 'Timeline', event)
 
     def save_character(self, novel_name: str, character: dict):
         """
         인물 정보를 DB에 저장
         같은 name(또는 '이름')이 이미 존재하면 해당 파일을 덮어쓰고, 없으면 새로 저장
         """
-        char_dir = self.database_path / novel_name / 'characters'
-        char_dir.mkdir(parents=True, exist_ok=True)
-        name = character.get('name') or character.get('이름') or f"unknown_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-        file_path = char_dir / f"character_{safe_filename(name)}.json"
-        # 이미 같은 파일이 있으면 덮어쓰기, 없으면 새로 생성
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(character, f, ensure_ascii=False, indent=2)
+        self._save(novel_name, 'characters', character)
 
     def save_storyboard(self, novel_name: str, storyboard: dict):
         """
         스토리보드(씬)를 DB에 저장
         """
-        sb_dir = self.database_path / novel_name / 'Storyboard'
-        sb_dir.mkdir(parents=True, exist_ok=True)
-        title = storyboard.get('title') or f"unknown_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-        file_path = sb_dir / f"storyboard_{safe_filename(title)}.json"
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(storyboard, f, ensure_ascii=False, indent=2)
+        self._save(novel_name, 'Storyboard', storyboard)
 
 class ContentAnalyzer:
     """
     텍스트 내용을 분석하는 클래스
+
+    analyze_content()는 입력마다 Document(문장 오프셋, 소문자 텍스트)를 한 번 만들고
+    모든 추출기가 이를 함께 쓰므로 분석 시간이 텍스트 길이에 비례함
+    역할/세계관/시간/주제 키워드는 KeywordMatcher로 문서를 한 번 훑어 등장 위치를 모두 찾으므로
+    키워드가 수백 개여도 훑는 횟수는 같음
+    인물 후보는 CandidateFilter로 불용어, 최소 등장 횟수, 기존 인물 이름(known_names)에 따라 거른 뒤
+    남은 이름에 대해서만 역할/설명을 추출함
+    limits가 주어지면 카테고리별로 점수가 높은 상위 k개만 남김 (apply_limits 참고)
+
+    Args:
+        custom_keywords: 기본 키워드에 더할 사용자 키워드
+            {"role": [...], "world": [...], "time": [...], "theme": [...], "stopword": [...]}
+        min_mentions: 인물 후보로 남길 최소 등장 횟수 (기존 인물 이름은 예외)
+        context_window: 인물 역할을 찾을 이름 앞뒤 문맥 크기(글자)
+        limits: 카테고리별 최대 개수 {"characters": k, "world_elements": k, "events": k} (없는 카테고리는 제한 없음)
     """
     
-    def __init__(self):
+    def __init__(self, custom_keywords: Optional[Dict[str, List[str]]] = None, min_mentions: int = 2,
+                 context_window: int = 50, limits: Optional[Dict[str, int]] = None):
+        # 병렬 분석 작업 프로세스에서 같은 분석기를 만들기 위해 보관
+        self.custom_keywords = custom_keywords
+        self.min_mentions = min_mentions
+        self.limits = dict(limits or {})
         # 한국어 인명 패턴 (성+이름)
         self.korean_name_pattern = r'[가-힣]{2,4}\s*(?:씨|님|군|양)?'
         # 영어 인명 패턴
@@ -158,148 +669,486 @@ class ContentAnalyzer:
             '년', '월', '일', '시', '분', '초', '아침', '점심', '저녁', '밤',
             'year', 'month', 'day', 'hour', 'minute', 'second', 'morning', 'afternoon', 'evening', 'night'
         ]
+        # 주제 키워드
+        self.theme_keywords = [
+            '사랑', '우정', '가족', '성장', '모험', '복수', '희생', '희망',
+            'love', 'friendship', 'family', 'growth', 'adventure', 'revenge', 'sacrifice', 'hope'
+        ]
+        # 세계관 요소 분류 (앞에서부터 우선, 해당 키워드가 문장에 있으면 그 분류)
+        self.world_categories = [
+            ('마법', ['마법', 'magic']),
+            ('기술', ['기술', 'technology']),
+            ('정치', ['국가', 'country']),
+        ]
+        # 인물 후보에서 뺄 일반 낱말
+        self.stopwords = list(COMMON_WORDS)
+        # 인물 역할을 찾을 이름 앞뒤 문맥 크기(글자)
+        self.context_window = context_window
+        for kind, keywords in (custom_keywords or {}).items():
+            target = {
+                'role': self.role_keywords,
+                'world': self.world_keywords,
+                'time': self.time_keywords,
+                'theme': self.theme_keywords,
+                'stopword': self.stopwords,
+            }.get(kind)
+            if target is None:
+                raise ValueError(f"알 수 없는 키워드 종류입니다: {kind}")
+            target.extend(keyword for keyword in keywords if keyword not in target)
+        # 장소 패턴
+        self.location_patterns = [
+            r'[가-힣]+시',  # 서울시, 부산시 등
+            r'[가-힣]+동',  # 강남동, 서초동 등
+            r'[가-힣]+학교',  # 서울대학교 등
+            r'[가-힣]+회사',  # 삼성전자 등
+        ]
+        # 날짜 패턴 (앞에서부터 우선, 맞는 것이 없으면 date_normalizer로 상대 표현 등을 찾음)
+        self.date_patterns = [
+            r'\d{4}년\s*\d{1,2}월\s*\d{1,2}일',
+            r'\d{1,2}월\s*\d{1,2}일',
+            r'\d{1,2}일',
+        ]
+        self._compile_patterns()
+
+    def _compile_patterns(self):
+        """패턴과 키워드 목록을 정규식으로 한 번만 컴파일"""
+        self._name_re = re.compile(f"(?P<korean>{self.korean_name_pattern})|(?P<english>{self.english_name_pattern})")
+        self._korean_name_re = re.compile(self.korean_name_pattern)
+        self._english_name_re = re.compile(self.english_name_pattern)
+        self._role_matcher = KeywordMatcher(self.role_keywords)
+        self._world_matcher = KeywordMatcher(self.world_keywords, ignore_case=True)
+        self._time_matcher = KeywordMatcher(self.time_keywords, ignore_case=True)
+        self._theme_matcher = KeywordMatcher(self.theme_keywords)
+        self._category_matcher = KeywordMatcher(
+            [keyword for _, keywords in self.world_categories for keyword in keywords], ignore_case=True)
+        self._location_res = [re.compile(pattern) for pattern in self.location_patterns]
+        self._date_res = [re.compile(pattern) for pattern in self.date_patterns]
+        self.date_normalizer = DateNormalizer()
+        # 키워드 목록의 낱말도 인물 이름이 아니므로 불용어로 씀
+        self._stopword_set = set(self.stopwords).union(
+            self.role_keywords, self.world_keywords, self.time_keywords, self.theme_keywords)
+
+    def candidate_filter(self, known_names: Optional[Iterable[str]] = None,
+                         min_mentions: Optional[int] = None) -> CandidateFilter:
+        """
+        인물 후보 필터
+
+        Args:
+            known_names: 소설 DB의 기존 인물 이름 (항상 남기고 조사가 붙은 형태는 합침)
+            min_mentions: 최소 등장 횟수 (None이면 self.min_mentions)
+        """
+        return CandidateFilter(self._stopword_set, self.min_mentions if min_mentions is None else min_mentions,
+                               known_names)
+
+    @staticmethod
+    def _hits_by_sentence(document: Document, matcher: KeywordMatcher) -> Dict[int, Set[str]]:
+        """문서를 한 번 훑어 문장 번호별로 등장한 키워드를 모음 (문장 경계에 걸친 등장은 제외)"""
+        hits = {}
+        for start, end, keyword in matcher.finditer(document):
+            index = document.sentence_index_at(start)
+            if end <= document.sentence_ends[index]:
+                hits.setdefault(index, set()).add(keyword)
+        return hits
     
-    def analyze_content(self, content: str) -> Dict[str, Any]:
+    def analyze_content(self, content, known_names: Optional[Iterable[str]] = None,
+                        min_mentions: Optional[int] = None, limited: bool = True) -> Dict[str, Any]:
         """
         텍스트 내용을 분석하여 인물, 세계관 요소, 이벤트 등을 추출
         
         Args:
-            content: 분석할 텍스트 내용
+            content: 분석할 텍스트 내용 (문자열 또는 Document)
+            known_names: 소설 DB의 기존 인물 이름 (인물 후보 필터에 씀)
+            min_mentions: 인물 후보 최소 등장 횟수 (None이면 self.min_mentions)
+            limited: False면 limits를 적용하지 않음 (구간별 결과를 합친 뒤 적용할 때)
             
         Returns:
             분석 결과 딕셔너리
         """
+        document = content if isinstance(content, Document) else Document(content)
+        limits = self.limits if limited else {}
         analysis_result = {
-            "characters": self._extract_characters(content),
-            "world_elements": self._extract_world_elements(content),
-            "events": self._extract_events(content),
-            "locations": self._extract_locations(content),
-            "themes": self._extract_themes(content)
+            "characters": self._extract_characters(document, self.candidate_filter(known_names, min_mentions),
+                                                   limits.get("characters")),
+            "world_elements": self._extract_world_elements(document, limits.get("world_elements")),
+            "events": self._extract_events(document),
+            "locations": self._extract_locations(document),
+            "themes": self._extract_themes(document)
         }
+        if limits.get("events") is not None:
+            analysis_result["events"] = self._top_k(analysis_result["events"], limits["events"], self._event_score)
         
         return analysis_result
+
+    @staticmethod
+    def _top_k(items: List[Any], k: int, score) -> List[Any]:
+        """점수가 높은 k개를 힙으로 골라 원래 순서대로 (점수가 같으면 앞선 것)"""
+        if len(items) <= k:
+            return items
+        chosen = heapq.nlargest(k, range(len(items)), key=lambda index: (score(items[index]), -index))
+        return [items[index] for index in sorted(chosen)]
+
+    @staticmethod
+    def _character_score(character: Dict[str, Any]) -> tuple:
+        # 등장 횟수가 많을수록, 같으면 먼저 등장할수록
+        return character["mention_count"], -character["first_mention"]
+
+    def _world_element_score(self, element: Dict[str, Any]) -> int:
+        # 문장에 든 서로 다른 세계관 키워드 수
+        return len(self._world_matcher.found(element["description"]))
+
+    def _event_score(self, event: Dict[str, Any]) -> tuple:
+        # 날짜를 해석할 수 있는 이벤트 우선, 다음으로 참여자 수, 시간 키워드 수
+        return (event.get("date_key") is not None, len(event.get("participants", ())),
+                len(self._time_matcher.found(event["description"])))
+
+    def apply_limits(self, analysis_result: Dict[str, Any], limits: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        카테고리별 상위 k개만 남긴 분석 결과 (입력은 바꾸지 않음)
+
+        - characters: 등장 횟수 (같으면 먼저 등장한 인물)
+        - world_elements: 문장에 든 서로 다른 세계관 키워드 수
+        - events: 날짜 키 유무, 참여자 수, 시간 키워드 수
+        점수가 같으면 텍스트에서 앞선 것을 남기며, 남은 항목은 원래 순서를 유지함
+
+        Args:
+            limits: {"characters": k, "world_elements": k, "events": k} (None이면 self.limits)
+        """
+        limits = self.limits if limits is None else limits
+        result = dict(analysis_result)
+        for key, score in (("characters", self._character_score),
+                           ("world_elements", self._world_element_score),
+                           ("events", self._event_score)):
+            if limits.get(key) is not None and key in result:
+                result[key] = self._top_k(result[key], limits[key], score)
+        return result
     
-    def _extract_characters(self, content: str) -> List[Dict[str, Any]]:
-        """인물 정보 추출"""
+    # analyze_stream 구간 크기(글자): 최소 크기를 넘긴 뒤 처음 나오는 문장 끝에서 자르고,
+    # 문장 끝을 찾지 못해도 최대 크기를 넘으면 마지막 줄바꿈(없으면 끝)에서 자름
+    STREAM_MIN_SEGMENT = 65536
+    STREAM_MAX_BUFFER = 1 << 20
+
+    def _iter_stream_segments(self, chunks: Iterable, min_segment: Optional[int] = None) -> Iterator[str]:
+        """
+        조각들을 이어 min_segment(기본 STREAM_MIN_SEGMENT) 글자를 넘긴 뒤 처음 나오는 문장 구분 기호([.!?])까지를
+        한 구간으로 내보냄 (큰 조각 하나도 여러 구간으로 나뉘므로 구간 크기는 조각 크기와 관계없이 min_segment + 문장 하나 정도)
+
+        구간은 항상 문장 구분 기호 바로 뒤에서 끝나므로 문장 경계가 조각 경계에 걸쳐도
+        전체 텍스트를 re.split(r'[.!?]')로 나눈 것과 같은 문장이 됨
+        bytes 조각은 UTF-8로 이어서 디코딩함 (문자가 조각 사이에 걸쳐도 됨)
+        """
+        min_segment = self.STREAM_MIN_SEGMENT if min_segment is None else min_segment
+        delimiter = Document.SENTENCE_DELIMITER
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        # 버퍼를 조각 목록으로 들고, 자를 위치(min_segment 이후 첫 구분 기호)와 마지막 줄바꿈은 새로 붙은 조각에서만 찾음
+        pieces: List[str] = []
+        length = 0
+        cut = -1
+        last_newline = -1
+        for chunk in chunks:
+            if isinstance(chunk, (bytes, bytearray, memoryview)):
+                chunk = decoder.decode(bytes(chunk))
+            if not chunk:
+                continue
+            if cut == -1 and length + len(chunk) >= min_segment:
+                match = delimiter.search(chunk, max(0, min_segment - 1 - length))
+                if match is not None:
+                    cut = length + match.end()
+            found = chunk.rfind('\n')
+            if found != -1:
+                last_newline = length + found
+            pieces.append(chunk)
+            length += len(chunk)
+            if cut == -1:
+                if length <= self.STREAM_MAX_BUFFER:
+                    continue
+                cut = last_newline + 1 or length
+            buffer = ''.join(pieces)
+            start = 0
+            while cut != -1:
+                yield buffer[start:cut]
+                start = cut
+                # 남은 부분이 아직 min_segment보다 길면 계속 자름
+                match = delimiter.search(buffer, start + max(min_segment - 1, 0)) \
+                    if length - start >= min_segment else None
+                cut = match.end() if match is not None else -1
+            rest = buffer[start:]
+            pieces = [rest] if rest else []
+            length = len(rest)
+            last_newline = rest.rfind('\n')
+        pieces.append(decoder.decode(b'', final=True))
+        buffer = ''.join(pieces)
+        if buffer:
+            yield buffer
+
+    def analyze_stream(self, chunks: Iterable, known_names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        텍스트를 조각 단위로 받아 분석 (원고 전체를 문자열 하나로 만들지 않음)
+
+        문장 구분 기호까지 끊은 구간마다 analyze_content와 같은 추출을 하고 결과를 합침
+        - characters: 이름별로 합치며 first_mention은 전체 텍스트 기준 위치, mention_count는 합계,
+          역할은 역할 키워드가 처음 발견된 구간의 것 (구간 경계 근처 등장은 역할 문맥이 경계에서 잘림)
+        - world_elements, events: 구간 순서대로 이어 붙임
+        - locations, themes: 합집합 (themes는 주제 키워드 목록 순서)
+        구간은 최소 등장 횟수와 limits 없이 분석하고 합친 결과에 적용함
+        메모리는 가장 긴 구간(STREAM_MIN_SEGMENT 글자에 문장 하나 정도)과 추출 결과에 비례함
+
+        Args:
+            chunks: 문자열 또는 UTF-8 bytes 조각들 (파일 객체, ManuscriptView.iter_blocks() 등)
+            known_names: 소설 DB의 기존 인물 이름
+
+        Returns:
+            analyze_content와 같은 형식의 분석 결과 딕셔너리
+        """
+        known_names = list(known_names or ())
+        return self.merge_results(self._iter_stream_results(chunks, known_names), known_names, self.min_mentions,
+                                  limited=True)
+
+    def _iter_stream_results(self, chunks: Iterable, known_names: Optional[List[str]] = None) -> Iterator[tuple]:
+        base = 0
+        for segment in self._iter_stream_segments(chunks):
+            yield base, self.analyze_content(segment, known_names, min_mentions=1, limited=False)
+            base += len(segment)
+
+    def merge_results(self, parts: Iterable[tuple], known_names: Optional[Iterable[str]] = None,
+                      min_mentions: int = 1, limited: bool = False) -> Dict[str, Any]:
+        """
+        텍스트 구간별 분석 결과를 하나로 합침 (입력 결과는 바꾸지 않음)
+
+        Args:
+            parts: 텍스트 순서대로 (구간 시작 위치, 구간의 analyze_content 결과)
+            known_names: 기존 인물 이름 (min_mentions와 관계없이 남김)
+            min_mentions: 합친 등장 횟수가 이보다 적은 인물은 뺌 (구간을 min_mentions=1로 분석했을 때)
+            limited: True면 합친 결과에 limits 적용 (구간을 limited=False로 분석했을 때)
+        """
+        characters = {}
+        world_elements = []
+        events = []
+        locations = set()
+        themes = set()
+        reference = None
+        rechain = False
+        for base, result in parts:
+            for character in result["characters"]:
+                merged = characters.get(character["name"])
+                if merged is None:
+                    character = dict(character)
+                    character["first_mention"] += base
+                    characters[character["name"]] = character
+                    continue
+                merged["mention_count"] += character["mention_count"]
+                if merged["role"] == "미정" and character["role"] != "미정":
+                    merged["role"] = character["role"]
+            world_elements.extend(result["world_elements"])
+            for event in result["events"]:
+                if rechain:
+                    # 앞 구간 이벤트의 날짜를 기준으로 date_key를 다시 계산 (구간 안에서는 기준 없이 계산됨)
+                    event = dict(event, date_key=self.date_normalizer.key(event.get("date"), reference))
+                events.append(event)
+                if event.get("date_key") is not None:
+                    reference = event["date_key"]
+            rechain = True
+            locations.update(result["locations"])
+            themes.update(result["themes"])
+
+        if min_mentions > 1:
+            known = set(known_names or ())
+            characters = {name: character for name, character in characters.items()
+                          if character["mention_count"] >= min_mentions or name in known}
+
+        merged = {
+            "characters": list(characters.values()),
+            "world_elements": world_elements,
+            "events": events,
+            "locations": list(locations),
+            "themes": [keyword for keyword in self._theme_matcher.keywords if keyword in themes]
+        }
+        return self.apply_limits(merged) if limited else merged
+
+    def split_shards(self, content, shard_size: int = 65536) -> tuple:
+        """
+        텍스트를 shard_size 글자를 넘긴 뒤 처음 나오는 문장 끝에서 잘라 구간(shard)으로 나눔
+
+        문자열 하나도 여러 구간으로 나뉘므로 구간 수는 대략 len(content) / shard_size
+
+        Args:
+            content: 문자열 또는 문자열/UTF-8 bytes 조각들
+            shard_size: 구간 최소 크기(글자)
+
+        Returns:
+            (구간 시작 위치 목록, 구간 문자열 목록)
+        """
+        chunks = [content] if isinstance(content, str) else content
+        bases = []
+        shards = []
+        base = 0
+        for segment in self._iter_stream_segments(chunks, shard_size):
+            bases.append(base)
+            shards.append(segment)
+            base += len(segment)
+        return bases, shards
+
+    def analyze_parallel(self, content, max_workers: Optional[int] = None,
+                         shard_size: int = 65536, known_names: Optional[Iterable[str]] = None,
+                         min_mentions: Optional[int] = None, limited: bool = True) -> Dict[str, Any]:
+        """
+        텍스트를 split_shards로 문장 경계에 맞춘 구간(shard)으로 나눠 여러 프로세스에서 분석한 뒤 합침
+
+        구간 나누기와 결과 합치기는 analyze_stream과 같으므로 결과도 같음 (이름별 중복 제거, 위치는 전체 기준)
+        구간이 하나뿐이면 프로세스를 띄우지 않고 바로 분석함
+
+        Args:
+            content: 문자열 또는 문자열/UTF-8 bytes 조각들
+            max_workers: 작업 프로세스 수 (None이면 CPU 수)
+            shard_size: 구간 최소 크기(글자)
+            known_names: 소설 DB의 기존 인물 이름
+            min_mentions: 합친 등장 횟수 기준 인물 후보 최소 등장 횟수 (None이면 self.min_mentions)
+            limited: False면 limits를 적용하지 않음
+
+        Returns:
+            analyze_content와 같은 형식의 분석 결과 딕셔너리
+        """
+        min_mentions = self.min_mentions if min_mentions is None else min_mentions
+        bases, shards = self.split_shards(content, shard_size)
+        known_names = list(known_names or ())
+        if len(shards) <= 1 or max_workers == 1:
+            results = (self.analyze_content(shard, known_names, min_mentions=1, limited=False) for shard in shards)
+            return self.merge_results(zip(bases, results), known_names, min_mentions, limited)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_shard_analyzer,
+                                 initargs=(self.custom_keywords, self.context_window, known_names)) as executor:
+            results = executor.map(_analyze_shard, shards)
+            return self.merge_results(zip(bases, results), known_names, min_mentions, limited)
+
+    def mention_index(self, content) -> MentionIndex:
+        """
+        후보 인명별 모든 등장 위치 (문서를 한 번 훑음, 거르기 전 후보 전체)
+
+        Args:
+            content: 문자열 또는 Document
+
+        Returns:
+            MentionIndex (mentions/count/chapter_counts/most_mentioned로 조회)
+        """
+        document = content if isinstance(content, Document) else Document(content)
+        return MentionIndex.from_pattern(document, self._name_re, min_length=2)
+
+    def _extract_characters(self, document: Document, candidate_filter: Optional[CandidateFilter] = None,
+                            limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        인물 정보 추출 (MentionIndex 후보를 candidate_filter로 거른 뒤 이름별 등장 위치를 사용)
+
+        limit이 있으면 역할/설명을 찾기 전에 등장 횟수 상위 limit명만 고름
+        """
         characters = []
         
-        # 한국어 인명 찾기
-        korean_names = re.findall(self.korean_name_pattern, content)
-        # 영어 인명 찾기
-        english_names = re.findall(self.english_name_pattern, content)
+        mentions = (candidate_filter or self.candidate_filter()).apply(self.mention_index(document))
+        names = mentions.names()
+        if limit is not None and len(names) > limit:
+            chosen = {name for name, _ in mentions.most_mentioned(limit)}
+            names = [name for name in names if name in chosen]
         
-        all_names = list(set(korean_names + english_names))
+        # 역할 키워드 등장 위치 (시작 위치순)
+        role_hits = sorted(self._role_matcher.finditer(document))
+        role_starts = [start for start, _, _ in role_hits]
         
-        for name in all_names:
-            if len(name.strip()) > 1:  # 의미있는 이름만
-                character_info = {
-                    "name": name.strip(),
-                    "role": self._identify_character_role(content, name),
-                    "description": self._extract_character_description(content, name),
-                    "first_mention": self._find_first_mention(content, name)
-                }
-                characters.append(character_info)
+        for name in names:
+            offsets = mentions.mentions(name)
+            character_info = {
+                "name": name,
+                "role": self._identify_character_role(name, offsets, role_hits, role_starts, len(document)),
+                "description": self._extract_character_description(document, offsets[0]),
+                "first_mention": offsets[0],
+                "mention_count": len(offsets)
+            }
+            characters.append(character_info)
         
         return characters
     
-    def _extract_world_elements(self, content: str) -> List[Dict[str, Any]]:
-        """세계관 요소 추출"""
+    def _extract_world_elements(self, document: Document, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """세계관 요소 추출 (limit이 있으면 서로 다른 세계관 키워드가 많은 문장 limit개만)"""
         world_elements = []
         
         # 세계관 관련 키워드가 포함된 문장 찾기
-        sentences = re.split(r'[.!?]', content)
-        
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in self.world_keywords):
-                element_info = {
-                    "name": self._extract_element_name(sentence),
-                    "description": sentence.strip(),
-                    "category": self._categorize_world_element(sentence)
-                }
-                world_elements.append(element_info)
+        world_hits = self._hits_by_sentence(document, self._world_matcher)
+        category_hits = self._hits_by_sentence(document, self._category_matcher)
+        indexes = sorted(world_hits)
+        if limit is not None and len(indexes) > limit:
+            indexes = sorted(heapq.nlargest(limit, indexes, key=lambda index: (len(world_hits[index]), -index)))
+        for index in indexes:
+            sentence = document.sentence(index)
+            element_info = {
+                "name": self._extract_element_name(sentence),
+                "description": sentence.strip(),
+                "category": self._categorize_world_element(category_hits.get(index, set()))
+            }
+            world_elements.append(element_info)
         
         return world_elements
     
-    def _extract_events(self, content: str) -> List[Dict[str, Any]]:
-        """이벤트 추출"""
+    def _extract_events(self, document: Document) -> List[Dict[str, Any]]:
+        """
+        이벤트 추출
+
+        date_key는 날짜의 정렬 키이며, 연/월이 빠진 날짜와 상대 표현("다음 날")은 앞 이벤트의 날짜를 기준으로 계산함
+        """
         events = []
+        reference = None
         
         # 시간 관련 키워드가 포함된 문장 찾기
-        sentences = re.split(r'[.!?]', content)
-        
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in self.time_keywords):
-                event_info = {
-                    "date": self._extract_date(sentence),
-                    "description": sentence.strip(),
-                    "participants": self._extract_event_participants(content, sentence)
-                }
-                events.append(event_info)
+        for index in sorted(self._hits_by_sentence(document, self._time_matcher)):
+            sentence = document.sentence(index)
+            date = self._extract_date(sentence)
+            key = self.date_normalizer.key(date, reference)
+            if key is not None:
+                reference = key
+            event_info = {
+                "date": date,
+                "date_key": key,
+                "description": sentence.strip(),
+                "participants": self._extract_event_participants(sentence)
+            }
+            events.append(event_info)
         
         return events
     
-    def _extract_locations(self, content: str) -> List[str]:
+    def _extract_locations(self, document: Document) -> List[str]:
         """장소 정보 추출"""
-        # 간단한 장소 패턴 (도시, 마을, 건물 등)
-        location_patterns = [
-            r'[가-힣]+시',  # 서울시, 부산시 등
-            r'[가-힣]+동',  # 강남동, 서초동 등
-            r'[가-힣]+학교',  # 서울대학교 등
-            r'[가-힣]+회사',  # 삼성전자 등
-        ]
-        
         locations = []
-        for pattern in location_patterns:
-            found = re.findall(pattern, content)
-            locations.extend(found)
+        for pattern in self._location_res:
+            locations.extend(pattern.findall(document.text))
         
         return list(set(locations))
     
-    def _extract_themes(self, content: str) -> List[str]:
-        """주제 추출"""
-        # 간단한 주제 키워드
-        theme_keywords = [
-            '사랑', '우정', '가족', '성장', '모험', '복수', '희생', '희망',
-            'love', 'friendship', 'family', 'growth', 'adventure', 'revenge', 'sacrifice', 'hope'
-        ]
-        
-        themes = []
-        for keyword in theme_keywords:
-            if keyword in content:
-                themes.append(keyword)
-        
-        return themes
+    def _extract_themes(self, document: Document) -> List[str]:
+        """주제 추출 (주제 키워드 목록 순서)"""
+        found = self._theme_matcher.found(document)
+        return [keyword for keyword in self._theme_matcher.keywords if keyword in found]
     
-    def _identify_character_role(self, content: str, character_name: str) -> str:
-        """인물의 역할 식별"""
-        # 캐릭터 이름 주변 문맥에서 역할 키워드 찾기
-        name_index = content.find(character_name)
-        if name_index != -1:
-            # 이름 주변 50자 내에서 역할 키워드 찾기
-            start = max(0, name_index - 50)
-            end = min(len(content), name_index + len(character_name) + 50)
-            context = content[start:end]
-            
-            for keyword in self.role_keywords:
-                if keyword in context:
-                    return keyword
+    def _identify_character_role(self, character_name: str, offsets: List[int],
+                                 role_hits: List[tuple], role_starts: List[int], text_length: int) -> str:
+        """
+        인물의 역할 식별
+
+        등장 위치를 앞에서부터 보며 이름 앞뒤 context_window 글자 안에 역할 키워드가 있는 첫 등장을 찾고,
+        그 안의 키워드 중 목록에서 가장 앞선 것을 역할로 씀
+        """
+        for offset in offsets:
+            window_start = max(0, offset - self.context_window)
+            window_end = min(text_length, offset + len(character_name) + self.context_window)
+            best = None
+            for position in range(bisect.bisect_left(role_starts, window_start), len(role_hits)):
+                start, end, keyword = role_hits[position]
+                if start >= window_end:
+                    break
+                if end <= window_end and (best is None or self._role_matcher.priority(keyword) < self._role_matcher.priority(best)):
+                    best = keyword
+            if best is not None:
+                return best
         
         return "미정"
     
-    def _extract_character_description(self, content: str, character_name: str) -> str:
-        """인물 설명 추출"""
-        # 캐릭터 이름이 처음 등장하는 문장 찾기
-        sentences = re.split(r'[.!?]', content)
-        
-        for sentence in sentences:
-            if character_name in sentence:
-                return sentence.strip()
-        
-        return ""
-    
-    def _find_first_mention(self, content: str, character_name: str) -> int:
-        """인물의 첫 등장 위치 찾기"""
-        return content.find(character_name)
+    def _extract_character_description(self, document: Document, offset: int) -> str:
+        """인물 설명 추출 (이름이 처음 등장하는 문장)"""
+        return document.sentence_at(offset).strip()
     
     def _extract_element_name(self, sentence: str) -> str:
         """세계관 요소의 이름 추출"""
@@ -309,46 +1158,50 @@ class ContentAnalyzer:
             return words[0]
         return "Unknown"
     
-    def _categorize_world_element(self, sentence: str) -> str:
-        """세계관 요소 분류"""
-        if any(keyword in sentence.lower() for keyword in ['마법', 'magic']):
-            return "마법"
-        elif any(keyword in sentence.lower() for keyword in ['기술', 'technology']):
-            return "기술"
-        elif any(keyword in sentence.lower() for keyword in ['국가', 'country']):
-            return "정치"
-        else:
-            return "기타"
+    def _categorize_world_element(self, sentence_keywords: Set[str]) -> str:
+        """세계관 요소 분류 (문장에 등장한 분류 키워드 집합을 받음)"""
+        for category, keywords in self.world_categories:
+            if any(keyword.lower() in sentence_keywords for keyword in keywords):
+                return category
+        return "기타"
     
     def _extract_date(self, sentence: str) -> str:
-        """날짜 정보 추출"""
-        # 간단한 날짜 패턴
-        date_patterns = [
-            r'\d{4}년\s*\d{1,2}월\s*\d{1,2}일',
-            r'\d{1,2}월\s*\d{1,2}일',
-            r'\d{1,2}일',
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, sentence)
+        """날짜 정보 추출 (date_patterns에 맞는 것이 없으면 상대 표현 등 date_normalizer가 찾은 표현)"""
+        for pattern in self._date_res:
+            match = pattern.search(sentence)
             if match:
                 return match.group()
         
-        return ""
+        found = self.date_normalizer.find(sentence)
+        return found[0] if found else ""
     
-    def _extract_event_participants(self, content: str, event_sentence: str) -> List[str]:
+    def _extract_event_participants(self, event_sentence: str) -> List[str]:
         """이벤트 참여자 추출"""
         participants = []
         
         # 이벤트 문장에서 인명 찾기
-        korean_names = re.findall(self.korean_name_pattern, event_sentence)
-        english_names = re.findall(self.english_name_pattern, event_sentence)
-        
-        participants.extend(korean_names)
-        participants.extend(english_names)
+        participants.extend(self._korean_name_re.findall(event_sentence))
+        participants.extend(self._english_name_re.findall(event_sentence))
         
         return list(set(participants))
 
+# 병렬 분석 작업 프로세스마다 한 번 만드는 분석기
+_shard_analyzer = None
+_shard_known_names = []
+
+
+def _init_shard_analyzer(custom_keywords: Optional[Dict[str, List[str]]], context_window: int,
+                         known_names: List[str]):
+    global _shard_analyzer, _shard_known_names
+    _shard_analyzer = ContentAnalyzer(custom_keywords, context_window=context_window)
+    _shard_known_names = known_names
+
+
+def _analyze_shard(text: str) -> Dict[str, Any]:
+    # 구간에서는 최소 등장 횟수와 limits 없이 분석하고, 합친 뒤 적용함
+    return _shard_analyzer.analyze_content(text, _shard_known_names, min_mentions=1, limited=False)
+
+
 class RecommendationEngine:
     """
     추천 옵션을 생성하는 클래스
@@ -8,13 +8,16 @@ import sys
 from dotenv import load_dotenv
 import datetime
 import json
+import itertools
 
 # .env 파일 로드
 load_dotenv()
 
 # Agent 모듈 import (test_simple.py와 동일한 방식)
 sys.path.append(str(Path(__file__).parent.parent))
-from Agent import OpenAINovelAnalysisAgent
+from Agent import OpenAINovelAnalysisAgent, DatabaseManager, ManuscriptStore, AgentConfig
+from Agent.storage import entity_key
+from Agent.dates import sort_events
 
 # --- 사용자 정의 스타일 ---
 st.markdown(
@@ -139,6 +142,57 @@ st.markdown(
 # --- 컬럼 비율 조정: 세로선 column 제거 ---
 left_col, center_col, right_col = st.columns([0.5, 7, 4.5], gap="small")
 
+# --- 탭(스토리보드/인물/세계관/타임라인) 데이터 동기화 ---
+def get_tab_db_manager():
+    """탭 화면이 읽고 쓰는 Database 폴더 저장소 (분석 에이전트와 같은 storage_settings 백엔드)"""
+    if 'tab_db_manager' not in st.session_state:
+        st.session_state['tab_db_manager'] = DatabaseManager.from_config('Database', AgentConfig())
+    return st.session_state['tab_db_manager']
+
+def sync_entities(novel_name, category, state_key):
+    """
+    st.session_state[state_key][novel_name] 목록에 마지막 동기화 이후 변경분만 반영
+    처음이거나 기록되지 않은 파일 수정이 감지되면 카테고리 전체를 다시 읽음
+    """
+    lists = st.session_state.setdefault(state_key, {})
+    cursors = st.session_state.setdefault('db_cursors', {})
+    records = lists.get(novel_name)
+    cursor = cursors.get((novel_name, category)) if records is not None else None
+    delta = get_tab_db_manager().changes_since(novel_name, cursor, [category])
+    cursors[(novel_name, category)] = delta['cursor']
+    change = delta['changes'].get(category)
+    if change is None:
+        return
+    if change['reset']:
+        lists[novel_name] = change['upserted']
+        return
+    positions = {entity_key(category, record): i for i, record in enumerate(records)}
+    for record in change['upserted']:
+        key = entity_key(category, record)
+        if key in positions:
+            records[positions[key]] = record
+        else:
+            positions[key] = len(records)
+            records.append(record)
+    if change['deleted']:
+        deleted = set(change['deleted'])
+        lists[novel_name] = [record for record in records if entity_key(category, record) not in deleted]
+
+def save_tab_entity(novel_name, category, record, previous=None):
+    """탭에서 추가/수정한 항목 저장 (수정하면서 이름/제목이 바뀌면 이전 항목은 삭제)"""
+    tab_db = get_tab_db_manager()
+    tab_db.save_many(novel_name, category, [record])
+    if previous is not None:
+        old_key = entity_key(category, previous)
+        if old_key and old_key != entity_key(category, record):
+            tab_db.delete_entity(novel_name, category, old_key)
+
+def delete_tab_entity(novel_name, category, record):
+    """탭에서 선택한 항목 삭제"""
+    key = entity_key(category, record)
+    if key:
+        get_tab_db_manager().delete_entity(novel_name, category, key)
+
 # --- 상태 관리: 선택된 소설/하위 항목 ---
 if 'selected_novel' not in st.session_state:
     st.session_state['selected_novel'] = ''
@@ -153,15 +207,12 @@ if 'show_analysis_logs' not in st.session_state:
 # --- 좌측 사이드바 (Streamlit Sidebar 사용) ---
 with st.sidebar:
     st.header('소설 관리')
-    # Database 폴더에서 소설 목록 불러오기
+    # 서재 카탈로그(Database/.catalog/catalog.json)에서 소설 목록 불러오기
     db_dir = Path('Database')
     db_dir.mkdir(exist_ok=True)
-    novel_dirs = [d.name for d in db_dir.iterdir() if d.is_dir()]
-    if 'novels' not in st.session_state:
-        st.session_state['novels'] = novel_dirs
-    else:
-        # 파일 시스템과 동기화
-        st.session_state['novels'] = novel_dirs
+    library = {entry['name']: entry for entry in get_tab_db_manager().library_overview()}
+    # 파일 시스템과 동기화 (카탈로그가 Database 폴더 수정 시각으로 확인)
+    st.session_state['novels'] = list(library)
     sidebar_options = ["소설 추가"]
     sidebar_icons = ["plus-circle"]
     if st.session_state['novels']:
@@ -192,6 +243,12 @@ with st.sidebar:
             novel = st.selectbox('소설 선택', st.session_state['novels'], key='novel_select')
             st.session_state['selected_novel'] = novel
             st.markdown(f'### "{novel}" 관리')
+            summary = library.get(novel)
+            if summary:
+                counts = summary['counts']
+                st.caption(f"원고 {summary['manuscript_files']}개 ({summary['manuscript_bytes'] / 1024:.1f}KB) · "
+                           f"인물 {counts['characters']} · 세계관 {counts['world']} · "
+                           f"타임라인 {counts['Timeline']} · 스토리보드 {counts['Storyboard']}")
             # 하위 메뉴(버튼)
             submenu_items = ["소설파일", "소설 스토리보드", "인물", "세계관", "타임라인"]
             st.markdown('<div class="novel-submenu">', unsafe_allow_html=True)
@@ -397,18 +454,19 @@ with center_col:
         st.session_state['info_extract_clicked'] = False
         st.session_state['last_tab'] = tab
 
+    # 원고는 조각 단위로 중복 없이 저장 (기존 Files/ 폴더의 원고도 그대로 읽음)
+    manuscript_store = ManuscriptStore.shared(str(db_dir))
+
     def sync_novel_files(novel_name):
-        file_dir = db_dir / novel_name / 'Files'
+        # 세션에는 제목과 크기만 두고 내용은 선택한 파일을 열람/수정할 때만 읽음
         files = []
-        if file_dir.exists():
-            for file in file_dir.glob('*'):
-                if file.is_file():
-                    try:
-                        with open(file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        files.append({'title': file.name, 'content': content})
-                    except Exception as e:
-                        pass  # 파일 읽기 실패 시 무시
+        for file_name in manuscript_store.list_files(novel_name):
+            try:
+                size = manuscript_store.size(novel_name, file_name)
+                if size is not None:
+                    files.append({'title': file_name, 'size': size})
+            except Exception as e:
+                pass  # 파일 읽기 실패 시 무시
         st.session_state['novel_files'][novel_name] = files
 
     if tab == '소설파일':
@@ -517,11 +575,8 @@ with center_col:
                 st.warning(f'"{file_to_delete}" 파일을 삭제하시겠습니까?')
                 
                 if st.button('삭제 확인', key=f'confirm_delete_{current_novel}'):
-                    # 파일 시스템에서 삭제
-                    file_save_dir = db_dir / current_novel / 'Files'
-                    file_path = file_save_dir / file_to_delete
-                    if file_path.exists():
-                        file_path.unlink()
+                    # 원고 저장소에서 삭제
+                    manuscript_store.delete(current_novel, file_to_delete)
                     sync_novel_files(current_novel)
                     st.success(f'"{file_to_delete}" 파일이 삭제되었습니다.')
                     
@@ -563,12 +618,8 @@ with center_col:
                         # 저장 버튼
                         if st.button('파일 저장', key=f'confirm_file_upload_{current_novel}_{st.session_state["file_input_key"]}'):
                             if file_name.strip() and current_novel:
-                                # 파일을 Database/[소설이름]/Files/에 저장
-                                file_save_dir = db_dir / current_novel / 'Files'
-                                file_save_dir.mkdir(parents=True, exist_ok=True)
-                                file_path = file_save_dir / file_name
-                                with open(file_path, 'w', encoding='utf-8') as f:
-                                    f.write(modified_content)
+                                # 원고 저장소(Database/[소설이름])에 저장
+                                manuscript_store.write(current_novel, file_name, modified_content)
                                 
                                 # AI 분석 수행
                                 
@@ -588,11 +639,7 @@ with center_col:
                     file_content = st.text_area('내용', value='', key=f'file_content_input_{current_novel}_{st.session_state["file_input_key"]}', height=200)
                     if st.button('확인', key=f'confirm_file_write_{current_novel}_{st.session_state["file_input_key"]}'):
                         if file_title.strip() and current_novel:
-                            file_save_dir = db_dir / current_novel / 'Files'
-                            file_save_dir.mkdir(parents=True, exist_ok=True)
-                            file_path = file_save_dir / file_title
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                f.write(file_content)
+                            manuscript_store.write(current_novel, file_title, file_content)
                             
                             # AI 분석 수행
                             st.write("🔍 AI 분석 시작...")
@@ -642,15 +689,11 @@ with center_col:
                 st.markdown('---')
                 st.subheader('파일 수정')
                 edit_title = st.text_input('제목', value=files[selected_file_idx]['title'], key=f'edit_file_title_{current_novel}_{selected_file_idx}')
-                edit_content = st.text_area('내용', value=files[selected_file_idx]['content'], key=f'edit_file_content_{current_novel}_{selected_file_idx}', height=200)
+                edit_content = st.text_area('내용', value=manuscript_store.read(current_novel, files[selected_file_idx]['title']) or '', key=f'edit_file_content_{current_novel}_{selected_file_idx}', height=200)
                 if st.button('수정 확인', key=f'confirm_file_edit_{current_novel}_{selected_file_idx}'):
                     if edit_title.strip():
-                        # 파일 시스템에도 반영
-                        file_save_dir = db_dir / current_novel / 'Files'
-                        file_save_dir.mkdir(parents=True, exist_ok=True)
-                        file_path = file_save_dir / edit_title
-                        with open(file_path, 'w', encoding='utf-8') as f:
-                            f.write(edit_content)
+                        # 원고 저장소에도 반영 (바뀐 조각만 기록됨)
+                        manuscript_store.write(current_novel, edit_title, edit_content)
                         sync_novel_files(current_novel)
                         st.success('파일이 수정 및 저장되었습니다.')
                         st.session_state['show_edit_form'] = False
@@ -664,18 +707,34 @@ with center_col:
                 st.markdown('---')
                 st.subheader('파일 열람')
                 st.markdown(f"**제목:** {files[selected_file_idx]['title']}")
-                st.markdown(f"**내용:**\n\n{files[selected_file_idx]['content']}")
-                # AI 분석 버튼 추가
+                # 원고 전체를 문자열로 만들지 않고 장 단위로 읽어 표시
+                manuscript_view = manuscript_store.open(current_novel, files[selected_file_idx]['title'])
+                if manuscript_view is not None:
+                    with manuscript_view:
+                        chapters = manuscript_view.iter_chapters()
+                        first_chapter = next(chapters, ('', 0, ''))
+                        second_chapter = next(chapters, None)
+                        if second_chapter is None:
+                            st.markdown(f"**내용:**\n\n{first_chapter[2]}")
+                        else:
+                            st.markdown("**내용:**")
+                            for chapter_title, _, chapter_text in itertools.chain([first_chapter, second_chapter], chapters):
+                                with st.expander(chapter_title or '머리말'):
+                                    st.markdown(chapter_text)
+                # AI 분석 버튼 추가 (원고와 DB가 그대로면 저장된 결과를 씀, 체크하면 처음부터 다시 분석)
+                force_refresh = st.checkbox('저장된 분석 결과 무시하고 새로 분석', key=f'force_refresh_{current_novel}_{selected_file_idx}')
                 if st.button('🤖 AI 분석', key=f'analyze_file_{current_novel}_{selected_file_idx}', use_container_width=True):
                     file_title = files[selected_file_idx]['title']
-                    file_content = files[selected_file_idx]['content']
+                    file_content = manuscript_store.read(current_novel, file_title) or ''
                     st.session_state['ai_analysis_progress'] = []
                     def progress_callback(msg):
                         st.session_state['ai_analysis_progress'].append(msg)
                         st.session_state['ai_analysis_progress'] = st.session_state['ai_analysis_progress'][-30:]
                     with st.spinner('AI 분석 중입니다...'):
                         agent = OpenAINovelAnalysisAgent()
-                        analysis_result = agent.analyze_new_file(current_novel, file_title, file_content, progress_callback=progress_callback)
+                        analysis_result = agent.analyze_new_file(current_novel, file_title, file_content,
+                                                                 progress_callback=progress_callback,
+                                                                 force_refresh=force_refresh)
                     analysis_report = agent.get_analysis_report(analysis_result)
                     st.session_state['last_analysis_result'] = analysis_result
                     st.session_state['last_analysis_report'] = analysis_report
@@ -716,19 +775,7 @@ with center_col:
             
             # 스토리보드 동기화 함수
             def sync_storyboards(novel_name):
-                storyboard_dir = db_dir / novel_name / 'Storyboard'
-                storyboards = []
-                if storyboard_dir.exists():
-                    for file in storyboard_dir.glob('*.json'):
-                        if file.is_file():
-                            try:
-                                with open(file, 'r', encoding='utf-8') as f:
-                                    import json
-                                    data = json.load(f)
-                                    storyboards.append(data)
-                            except Exception as e:
-                                pass
-                st.session_state['storyboards'][novel_name] = storyboards
+                sync_entities(novel_name, 'Storyboard', 'storyboards')
             
             # 초기 동기화
             sync_storyboards(current_novel)
@@ -780,11 +827,7 @@ with center_col:
                                 st.rerun()
                         with col3:
                             if st.button('챕터 삭제', key=f'delete_chapter_{i}', use_container_width=True):
-                                # 파일 삭제
-                                storyboard_dir = db_dir / current_novel / 'Storyboard'
-                                storyboard_file = storyboard_dir / f'storyboard_{i+1}.json'
-                                if storyboard_file.exists():
-                                    storyboard_file.unlink()
+                                delete_tab_entity(current_novel, 'Storyboard', chapter)
                                 sync_storyboards(current_novel)
                                 st.success(f'챕터가 삭제되었습니다.')
                                 st.rerun()
@@ -816,21 +859,8 @@ with center_col:
                                 'scenes': chapter.get('scenes', [])
                             }
                             
-                            # 파일 저장
-                            storyboard_dir = db_dir / current_novel / 'Storyboard'
-                            storyboard_dir.mkdir(parents=True, exist_ok=True)
-                            
-                            if editing_idx is not None:
-                                # 수정
-                                file_path = storyboard_dir / f'storyboard_{editing_idx+1}.json'
-                            else:
-                                # 새로 추가
-                                file_path = storyboard_dir / f'storyboard_{len(storyboards)+1}.json'
-                            
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                import json
-                                json.dump(chapter_data, f, ensure_ascii=False, indent=2)
-                            
+                            save_tab_entity(current_novel, 'Storyboard', chapter_data,
+                                            chapter if editing_idx is not None else None)
                             sync_storyboards(current_novel)
                             st.session_state['show_chapter_form'] = False
                             st.session_state['editing_chapter_idx'] = None
@@ -884,14 +914,7 @@ with center_col:
                                 # 챕터 데이터 업데이트
                                 chapter['scenes'] = scenes
                                 
-                                # 파일 저장
-                                storyboard_dir = db_dir / current_novel / 'Storyboard'
-                                file_path = storyboard_dir / f'storyboard_{chapter_idx+1}.json'
-                                
-                                with open(file_path, 'w', encoding='utf-8') as f:
-                                    import json
-                                    json.dump(chapter, f, ensure_ascii=False, indent=2)
-                                
+                                save_tab_entity(current_novel, 'Storyboard', chapter)
                                 sync_storyboards(current_novel)
                                 st.session_state['show_scene_form'] = False
                                 st.session_state['selected_chapter_idx'] = None
@@ -931,19 +954,7 @@ with center_col:
             
             # 인물 동기화 함수
             def sync_characters(novel_name):
-                character_dir = db_dir / novel_name / 'characters'
-                characters = []
-                if character_dir.exists():
-                    for file in character_dir.glob('*.json'):
-                        if file.is_file():
-                            try:
-                                with open(file, 'r', encoding='utf-8') as f:
-                                    import json
-                                    data = json.load(f)
-                                    characters.append(data)
-                            except Exception as e:
-                                pass
-                st.session_state['characters'][novel_name] = characters
+                sync_entities(novel_name, 'characters', 'characters')
             
             # 초기 동기화
             sync_characters(current_novel)
@@ -1002,12 +1013,10 @@ with center_col:
        
             # 인물 목록 표시
             characters = st.session_state['characters'].get(current_novel, [])
-            character_dir = db_dir / current_novel / 'characters'
-            character_files = list(character_dir.glob('*.json'))
             st.markdown('---')
             if characters:
                 st.markdown('### 인물 목록')
-                for i, (character, file_path) in enumerate(zip(characters, character_files)):
+                for i, character in enumerate(characters):
                     with st.expander(f"{character.get('이름', '이름 없음')}", expanded=True):
                         format_attrs = st.session_state['character_format']
                         for attr in format_attrs:
@@ -1023,8 +1032,7 @@ with center_col:
                                 st.rerun()
                         with col2:
                             if st.button('인물 삭제', key=f'delete_character_{i}', use_container_width=True):
-                                if file_path.exists():
-                                    file_path.unlink()
+                                delete_tab_entity(current_novel, 'characters', character)
                                 sync_characters(current_novel)
                                 st.success(f'인물이 삭제되었습니다.')
                                 st.rerun()
@@ -1056,21 +1064,8 @@ with center_col:
                 with col1:
                     if st.button('저장', key='save_character_btn'):
                         if character_data.get('이름', '').strip():
-                            # 파일 저장
-                            character_dir = db_dir / current_novel / 'characters'
-                            character_dir.mkdir(parents=True, exist_ok=True)
-                            
-                            if editing_idx is not None:
-                                # 수정
-                                file_path = character_dir / f'character_{editing_idx+1}.json'
-                            else:
-                                # 새로 추가
-                                file_path = character_dir / f'character_{len(characters)+1}.json'
-                            
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                import json
-                                json.dump(character_data, f, ensure_ascii=False, indent=2)
-                            
+                            save_tab_entity(current_novel, 'characters', character_data,
+                                            character if editing_idx is not None else None)
                             sync_characters(current_novel)
                             st.session_state['show_character_form'] = False
                             st.session_state['editing_character_idx'] = None
@@ -1107,19 +1102,7 @@ with center_col:
             
             # 세계관 동기화 함수
             def sync_world_settings(novel_name):
-                world_dir = db_dir / novel_name / 'world'
-                world_settings = []
-                if world_dir.exists():
-                    for file in world_dir.glob('*.json'):
-                        if file.is_file():
-                            try:
-                                with open(file, 'r', encoding='utf-8') as f:
-                                    import json
-                                    data = json.load(f)
-                                    world_settings.append(data)
-                            except Exception as e:
-                                pass
-                st.session_state['world_settings'][novel_name] = world_settings
+                sync_entities(novel_name, 'world', 'world_settings')
             
             # 초기 동기화
             sync_world_settings(current_novel)
@@ -1208,11 +1191,9 @@ with center_col:
             
             # 세계관 설정 목록 표시
             world_settings = st.session_state['world_settings'].get(current_novel, [])
-            world_dir = db_dir / current_novel / 'world'
-            world_files = list(world_dir.glob('*.json'))
             if world_settings:
                 st.markdown('### 설정 목록')
-                for i, (setting, file_path) in enumerate(zip(world_settings, world_files)):
+                for i, setting in enumerate(world_settings):
                     with st.expander(f"{setting.get('title', '제목 없음')}", expanded=True):
                         st.markdown(f"**카테고리:** {setting.get('category', '')}")
                         st.markdown(f"**설명:** {setting.get('description', '')}")
@@ -1226,8 +1207,7 @@ with center_col:
                                 st.rerun()
                         with col2:
                             if st.button('설정 삭제', key=f'delete_world_{i}', use_container_width=True):
-                                if file_path.exists():
-                                    file_path.unlink()
+                                delete_tab_entity(current_novel, 'world', setting)
                                 sync_world_settings(current_novel)
                                 st.success(f'설정이 삭제되었습니다.')
                                 st.rerun()
@@ -1266,21 +1246,8 @@ with center_col:
                                 'content': content
                             }
                             
-                            # 파일 저장
-                            world_dir = db_dir / current_novel / 'world'
-                            world_dir.mkdir(parents=True, exist_ok=True)
-                            
-                            if editing_idx is not None:
-                                # 수정
-                                file_path = world_dir / f'world_{editing_idx+1}.json'
-                            else:
-                                # 새로 추가
-                                file_path = world_dir / f'world_{len(world_settings)+1}.json'
-                            
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                import json
-                                json.dump(setting_data, f, ensure_ascii=False, indent=2)
-                            
+                            save_tab_entity(current_novel, 'world', setting_data,
+                                            setting if editing_idx is not None else None)
                             sync_world_settings(current_novel)
                             st.session_state['show_world_form'] = False
                             st.session_state['editing_world_idx'] = None
@@ -1318,20 +1285,7 @@ with center_col:
             
             # 타임라인 동기화 함수
             def sync_timeline_events(novel_name):
-                timeline_dir = db_dir / current_novel / 'Timeline'
-                timeline_events = []
-                if timeline_dir.exists():
-                    for file in timeline_dir.glob('*.json'):
-                        if file.is_file():
-                            try:
-                                with open(file, 'r', encoding='utf-8') as f:
-                                    import json
-                                    data = json.load(f)
-                                    
-                                    timeline_events.append(data)
-                            except Exception as e:
-                                pass
-                st.session_state['timeline_events'][novel_name] = timeline_events
+                sync_entities(novel_name, 'Timeline', 'timeline_events')
             
             # 초기 동기화
             sync_timeline_events(current_novel)
@@ -1390,21 +1344,8 @@ with center_col:
                                 'importance': importance
                             }
                             
-                            # 파일 저장
-                            timeline_dir = db_dir / current_novel / 'Timeline'
-                            timeline_dir.mkdir(parents=True, exist_ok=True)
-                            
-                            if editing_idx is not None:
-                                # 수정
-                                file_path = timeline_dir / f'timeline_{editing_idx+1}.json'
-                            else:
-                                # 새로 추가
-                                file_path = timeline_dir / f'timeline_{len(timeline_events)+1}.json'
-                            
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                import json
-                                json.dump(event_data, f, ensure_ascii=False, indent=2)
-                            
+                            save_tab_entity(current_novel, 'Timeline', event_data,
+                                            event if editing_idx is not None else None)
                             sync_timeline_events(current_novel)
                             st.session_state['show_timeline_form'] = False
                             st.session_state['editing_timeline_idx'] = None
@@ -1427,25 +1368,9 @@ with center_col:
                 explicit_events = [e for e in timeline_events if e.get('type') == '명시적']
                 implicit_events = [e for e in timeline_events if e.get('type') == '암묵적']
                 
-                # 날짜 정렬 함수
-                def sort_by_date(events):
-                    def extract_date(event):
-                        date_str = event.get('date', '')
-                        # 숫자 추출 (연도, 월, 일 등)
-                        import re
-                        numbers = re.findall(r'\d+', date_str)
-                        if numbers:
-                            # 첫 번째 숫자를 기준으로 정렬 (연도 우선)
-                            return int(numbers[0])
-                        else:
-                            # 숫자가 없으면 문자열 순서로 정렬
-                            return 0
-                    
-                    return sorted(events, key=extract_date)
-                
-                # 명시적 타임라인 (날짜 순 정렬)
+                # 명시적 타임라인 (저장 시 계산한 date_key 순서, 날짜를 해석할 수 없는 이벤트는 뒤에)
                 if explicit_events:
-                    explicit_events = sort_by_date(explicit_events)
+                    explicit_events = sort_events(explicit_events)
                     st.markdown('### 📅 명시적 타임라인')
                     for i, event in enumerate(explicit_events):
                         with st.expander(f"{event.get('date', '')} - {event.get('title', '')}", expanded=True):
@@ -1462,22 +1387,7 @@ with center_col:
                                     st.rerun()
                             with col2:
                                 if st.button('이벤트 삭제', key=f'delete_explicit_{i}', use_container_width=True):
-                                    # 파일 삭제 - 전체 이벤트 목록에서 해당 이벤트 찾기
-                                    timeline_dir = db_dir / current_novel / 'Timeline'
-                                    event_idx = timeline_events.index(event)
-                                    timeline_file = timeline_dir / f'timeline_{event_idx+1}.json'
-                                    if timeline_file.exists():
-                                        timeline_file.unlink()
-                                    
-                                    # 파일 번호 재정렬
-                                    remaining_files = list(timeline_dir.glob('*.json'))
-                                    remaining_files.sort(key=lambda x: int(x.stem.split('_')[1]))
-                                    
-                                    for idx, file_path in enumerate(remaining_files, 1):
-                                        new_name = f'timeline_{idx}.json'
-                                        if file_path.name != new_name:
-                                            file_path.rename(timeline_dir / new_name)
-                                    
+                                    delete_tab_entity(current_novel, 'Timeline', event)
                                     sync_timeline_events(current_novel)
                                     st.success(f'이벤트가 삭제되었습니다.')
                                     st.rerun()
@@ -1500,22 +1410,7 @@ with center_col:
                                     st.rerun()
                             with col2:
                                 if st.button('이벤트 삭제', key=f'delete_implicit_{i}', use_container_width=True):
-                                    # 파일 삭제 - 전체 이벤트 목록에서 해당 이벤트 찾기
-                                    timeline_dir = db_dir / current_novel / 'Timeline'
-                                    event_idx = timeline_events.index(event)
-                                    timeline_file = timeline_dir / f'timeline_{event_idx+1}.json'
-                                    if timeline_file.exists():
-                                        timeline_file.unlink()
-                                    
-                                    # 파일 번호 재정렬
-                                    remaining_files = list(timeline_dir.glob('*.json'))
-                                    remaining_files.sort(key=lambda x: int(x.stem.split('_')[1]))
-                                    
-                                    for idx, file_path in enumerate(remaining_files, 1):
-                                        new_name = f'timeline_{idx}.json'
-                                        if file_path.name != new_name:
-                                            file_path.rename(timeline_dir / new_name)
-                                    
+                                    delete_tab_entity(current_novel, 'Timeline', event)
                                     sync_timeline_events(current_novel)
                                     st.success(f'이벤트가 삭제되었습니다.')
                                     st.rerun()
@@ -1525,7 +1420,7 @@ with center_col:
                 color_map = {'낮음': '#90EE90', '보통': '#FFD700', '높음': '#FF8C00', '매우 높음': '#FF0000'}
 
                 if explicit_events:
-                    sorted_explicit_events = sort_by_date(explicit_events)
+                    sorted_explicit_events = sort_events(explicit_events)
 
                     # 모든 이벤트는 y = 0 위치에
                     y_value = 0
@@ -1535,10 +1430,9 @@ with center_col:
                     # 1️⃣ 타임라인 수평선 추가
                     x_dates = [event.get('date', '') for event in sorted_explicit_events]
                     if x_dates:
-                        x_dates_sorted = sorted(x_dates)
                         fig.add_trace(go.Scatter(
-                            x=x_dates_sorted,
-                            y=[y_value] * len(x_dates_sorted),
+                            x=x_dates,
+                            y=[y_value] * len(x_dates),
                             mode='lines',
                             line=dict(color='gray', width=2),
                             hoverinfo='skip',
@@ -1882,6 +1776,33 @@ if st.session_state.get('show_analysis_result', False):
                 elif st.session_state[f"button_state_{key_prefix}"] == "cancelled":
                     st.info("❌ 취소되었습니다")
 
+        # --- 모두 적용 UI 함수 정의 ---
+        # 대기 중인 추천 항목을 save_many로 한 번에 저장하고 rerun도 한 번만 수행
+        item_type_categories = {
+            "character": "characters",
+            "world": "world",
+            "timeline": "Timeline",
+            "storyboard": "Storyboard",
+        }
+
+        def show_apply_all_ui(entries, item_type, key):
+            # entries: (item, key_prefix) 목록
+            waiting = [
+                (item, key_prefix) for item, key_prefix in entries
+                if st.session_state.get(f"button_state_{key_prefix}", "waiting") == "waiting"
+            ]
+            if len(waiting) < 2:
+                return
+            if st.button(f"모두 적용 ({len(waiting)}개)", key=f"apply_all_{key}", use_container_width=True):
+                try:
+                    agent.db_manager.save_many(novel_name, item_type_categories[item_type], [item for item, _ in waiting])
+                except Exception as e:
+                    st.error(f"일괄 적용 실패 (아무 항목도 저장되지 않았습니다): {e}")
+                    return
+                for _, key_prefix in waiting:
+                    st.session_state[f"button_state_{key_prefix}"] = "applied"
+                st.rerun()
+
         # --- 정보 추출 시 스피너 표시 ---
         with st.spinner('정보 추출 중입니다...'):
             # --- 전체 정보 추출 ---
@@ -1924,6 +1845,10 @@ if st.session_state.get('show_analysis_result', False):
                 recommendations = all_info.get('character_recommendations', {})
                 if recommendations.get('add'):
                     st.markdown("#### ✨ 추가 추천 인물")
+                    show_apply_all_ui(
+                        [(char['data'], f"char_add_{idx}") for idx, char in enumerate(recommendations['add'])],
+                        "character", "char_add"
+                    )
                     for idx, char in enumerate(recommendations['add']):
                         name = char['data'].get('이름', 'Unknown')
                         st.markdown(f"**{name}** - {char['reason']}")
@@ -1945,6 +1870,10 @@ if st.session_state.get('show_analysis_result', False):
                 
                 if recommendations.get('update'):
                     st.markdown("#### 🔄 수정 추천 인물")
+                    show_apply_all_ui(
+                        [(char['data'], f"char_update_{idx}") for idx, char in enumerate(recommendations['update'])],
+                        "character", "char_update"
+                    )
                     for idx, char in enumerate(recommendations['update']):
                         name = char['data'].get('이름', 'Unknown')
                         st.markdown(f"**{name}** - {char['reason']}")
@@ -1975,6 +1904,10 @@ if st.session_state.get('show_analysis_result', False):
                 recommendations = all_info.get('storyboard_recommendations', {})
                 if recommendations.get('add'):
                     st.markdown("#### ✨ 추가 추천 씬")
+                    show_apply_all_ui(
+                        [(scene['data'], f"scene_add_{idx}") for idx, scene in enumerate(recommendations['add'])],
+                        "storyboard", "scene_add"
+                    )
                     for idx, scene in enumerate(recommendations['add']):
                         st.markdown(f"**{scene['name']}** - {scene['reason']}")
                         for key, value in scene.get('data', {}).items():
@@ -1984,6 +1917,10 @@ if st.session_state.get('show_analysis_result', False):
                 
                 if recommendations.get('update'):
                     st.markdown("#### 🔄 수정 추천 씬")
+                    show_apply_all_ui(
+                        [(scene['data'], f"scene_update_{idx}") for idx, scene in enumerate(recommendations['update'])],
+                        "storyboard", "scene_update"
+                    )
                     for idx, scene in enumerate(recommendations['update']):
                         st.markdown(f"**{scene['name']}** - {scene['reason']}")
                         if 'diff' in scene:
@@ -2002,6 +1939,10 @@ if st.session_state.get('show_analysis_result', False):
             # 세계관 요소 표시
             with st.expander("🌍 세계관 요소", expanded=True):
                 if st.session_state['new_world_elements']:
+                    show_apply_all_ui(
+                        [(elem, f"world_{idx}") for idx, elem in enumerate(st.session_state['new_world_elements'])],
+                        "world", "world"
+                    )
                     for idx, elem in enumerate(st.session_state['new_world_elements']):
                         st.markdown(f"**{elem.get('title', 'Unknown')}** ({elem.get('category', '기타')})")
                         if elem.get('description'):
@@ -2026,6 +1967,10 @@ if st.session_state.get('show_analysis_result', False):
             # 타임라인 표시
             with st.expander("📅 타임라인", expanded=True):
                 if st.session_state['new_timeline']:
+                    show_apply_all_ui(
+                        [(event, f"timeline_{idx}") for idx, event in enumerate(st.session_state['new_timeline'])],
+                        "timeline", "timeline"
+                    )
                     for idx, event in enumerate(st.session_state['new_timeline']):
                         title = event.get('title', 'Unknown')
                         date = event.get('date', '')
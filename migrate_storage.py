@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+JSON 파일 DB를 다른 저장소(SQLite, 세그먼트)로 이전하는 도구
+
+사용법:
+  python migrate_storage.py                    # 모든 소설을 SQLite로 이전
+  python migrate_storage.py sqlite 소설이름     # 특정 소설만 SQLite로 이전
+  python migrate_storage.py segment            # 모든 소설을 세그먼트 파일로 이전
+
+이전 후 Agent/config.py의 storage_settings["backend"]를 "sqlite" 또는 "segment"로 바꾸면 됩니다.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+from Agent.storage import migrate_json_to_sqlite, migrate_json_to_segments
+
+MIGRATORS = {
+    "sqlite": migrate_json_to_sqlite,
+    "segment": migrate_json_to_segments,
+}
+
+def main():
+    """이전 실행"""
+    backend = sys.argv[1] if len(sys.argv) > 1 else "sqlite"
+    novel_name = sys.argv[2] if len(sys.argv) > 2 else None
+
+    if backend not in MIGRATORS:
+        print(f"❌ 지원하지 않는 저장소입니다: {backend} (sqlite, segment 중 선택)")
+        return
+
+    print(f"🗄️ JSON → {backend} 이전 시작")
+    print("=" * 50)
+
+    summary = MIGRATORS[backend]("Database", novel_name)
+    for novel, counts in summary.items():
+        detail = ", ".join(f"{category} {count}개" for category, count in counts.items())
+        print(f"✅ {novel}: {detail}")
+
+    print(f"\n🎉 이전 완료! Agent/config.py에서 storage_settings['backend']를 '{backend}'로 설정하세요.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+날짜 키(date_key)와 타임라인 충돌 확인 테스트
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Agent import NovelAnalysisAgent
+from Agent.dates import date_key, sort_events
+
+
+def test_partial_dates_have_no_key_without_reference():
+    """연도를 모르는 날짜와 상대 표현은 기준 날짜가 없으면 키가 없음"""
+    assert date_key("3월 15일") is None
+    assert date_key("15일") is None
+    assert date_key("다음 날") is None
+    assert date_key("2024년 3월 15일") == date_key("2024-03-15")
+    reference = date_key("2024년 1월 1일")
+    assert date_key("3월 15일", reference) == date_key("2024-03-15")
+
+
+def test_sort_events_puts_partial_dates_last():
+    """연도를 모르는 날짜는 연도가 있는 날짜 앞으로 정렬되지 않음"""
+    events = [{"date": "3월 15일"}, {"date": "2024년 1월 1일"}, {"date": "다음 날"}, {"date": "2023-05-01"}]
+    assert [event["date"] for event in sort_events(events)] == ["2023-05-01", "2024년 1월 1일", "3월 15일", "다음 날"]
+
+
+def test_same_partial_date_is_a_timeline_conflict():
+    """DB의 "3월 15일" 이벤트와 분석에서 2024년으로 추정된 "3월 15일" 이벤트는 충돌"""
+    with tempfile.TemporaryDirectory() as database_path:
+        agent = NovelAnalysisAgent(database_path)
+        agent.db_manager.save_timeline_event("테스트소설", {"title": "성 함락", "date": "3월 15일",
+                                                        "description": "성이 함락되었다"})
+        content_analysis = agent.analyzer.analyze_content(
+            "2024년 1월 1일에 전쟁이 시작되었다. 3월 15일에 왕은 도망쳤다.")
+        events = content_analysis["events"]
+        assert [event["date"] for event in events] == ["2024년 1월 1일", "3월 15일"]
+        assert events[1]["date_key"] == date_key("2024-03-15")
+
+        conflicts = agent._check_conflicts("테스트소설", content_analysis)["timeline_conflicts"]
+        assert [conflict["new_event"]["date"] for conflict in conflicts] == ["3월 15일"]
+        assert conflicts[0]["existing_event"]["title"] == "성 함락"
+
+
+def test_same_day_in_different_notation_is_a_timeline_conflict():
+    """연도까지 적힌 날짜는 표기가 달라도 키로 비교"""
+    with tempfile.TemporaryDirectory() as database_path:
+        agent = NovelAnalysisAgent(database_path)
+        agent.db_manager.save_timeline_event("테스트소설", {"title": "건국", "date": "2024-03-15"})
+        content_analysis = agent.analyzer.analyze_content("2024년 3월 15일에 왕국이 세워졌다.")
+        conflicts = agent._check_conflicts("테스트소설", content_analysis)["timeline_conflicts"]
+        assert [conflict["existing_event"]["title"] for conflict in conflicts] == ["건국"]
+
+
+if __name__ == "__main__":
+    test_partial_dates_have_no_key_without_reference()
+    test_sort_events_puts_partial_dates_last()
+    test_same_partial_date_is_a_timeline_conflict()
+    test_same_day_in_different_notation_is_a_timeline_conflict()
+    print("✅ 날짜 테스트 통과")
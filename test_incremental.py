@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+증분 분석(IncrementalAnalysis) 테스트
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Agent.incremental import AnalysisStore, IncrementalAnalysis, merge_analyses
+from Agent.utils import ContentAnalyzer
+
+KNOWN_NAMES = ["김철수"]
+SEGMENT_SIZE = 300
+
+PARAGRAPHS = [
+    "김철수는 왕국의 기사였다. 김철수는 마법을 쓰지 못했다.\n",
+    "이영희는 김철수의 동료였다. 이영희는 마법사였다.\n",
+    "다음날 아침 두 사람은 성을 떠났다.\n",
+    "박민수는 국경의 마을에서 두 사람을 기다렸다. 박민수는 왕국의 첩자였다.\n",
+    "그들은 함께 마법의 탑으로 향했다.\n",
+    "최지우는 탑의 주인이었다. 최지우는 이영희를 알아보았다.\n",
+] * 6
+
+
+def _make(analyzer, database_path, calls):
+    """Agent.analyze_new_file과 같은 방식으로 구간을 분석하고 합치는 IncrementalAnalysis"""
+    def analyze(text):
+        calls.append(text)
+        return analyzer.analyze_content(text, KNOWN_NAMES, min_mentions=1, limited=False)
+
+    def merge(parts):
+        return analyzer.merge_results(((start, analysis) for start, _, analysis in parts),
+                                      KNOWN_NAMES, analyzer.min_mentions, limited=True)
+
+    return IncrementalAnalysis(AnalysisStore(database_path, "rule"), analyze, merge, segment_size=SEGMENT_SIZE)
+
+
+def _run(incremental, content):
+    run = incremental.run("테스트소설", "1화.txt", content)
+    incremental.save_result("테스트소설", "1화.txt", run, {"content_analysis": run["content_analysis"]})
+    return run
+
+
+def test_first_analysis_is_split_into_blocks():
+    """처음 분석하는 원고는 segment_size 글자를 넘긴 문단 끝에서 나눈 블록마다 분석"""
+    analyzer = ContentAnalyzer()
+    calls = []
+    with tempfile.TemporaryDirectory() as database_path:
+        content = ''.join(PARAGRAPHS)
+        run = _run(_make(analyzer, database_path, calls), content)
+        assert ''.join(calls) == content
+        assert all(SEGMENT_SIZE <= len(text) < SEGMENT_SIZE + max(map(len, PARAGRAPHS)) for text in calls[:-1])
+        assert run["stats"]["segments"] == run["stats"]["reanalyzed_segments"] == len(calls) > 1
+        assert run["content_analysis"] == analyzer.analyze_content(content, KNOWN_NAMES)
+
+
+def test_edit_matches_whole_analysis_and_reuses_segments():
+    """수정 후 증분 결과가 전체 분석과 같고, 바뀌지 않은 구간은 다시 분석하지 않음"""
+    analyzer = ContentAnalyzer()
+    calls = []
+    with tempfile.TemporaryDirectory() as database_path:
+        incremental = _make(analyzer, database_path, calls)
+        paragraphs = list(PARAGRAPHS)
+        _run(incremental, ''.join(paragraphs))
+
+        first_segments = len(calls)
+
+        # 바뀐 문단이 든 블록 하나만 다시 분석하고, delta는 그 블록만 합친 결과
+        for text in ("정하늘은 새로 온 기사였다. 정하늘은 김철수를 따랐다.\n",
+                     "정하늘은 새로 온 기사였다. 정하늘은 이영희를 따랐다.\n"):
+            del calls[:]
+            paragraphs[20] = text
+            content = ''.join(paragraphs)
+            run = _run(incremental, content)
+            assert run["content_analysis"] == analyzer.analyze_content(content, KNOWN_NAMES)
+            assert len(calls) == 1 and text in calls[0]
+            assert len(calls[0]) < SEGMENT_SIZE + max(map(len, paragraphs))
+            assert run["stats"]["segments"] == first_segments
+            assert run["stats"]["reanalyzed_segments"] == 1
+            assert run["stats"]["reanalyzed_paragraphs"] == calls[0].count("\n")
+            block_start = content.index(calls[0])
+            edited = analyzer.analyze_content(calls[0], KNOWN_NAMES, min_mentions=1, limited=False)
+            assert run["delta_analysis"] == analyzer.merge_results([(block_start, edited)],
+                                                                   KNOWN_NAMES, analyzer.min_mentions, limited=True)
+
+        # 같은 내용을 다시 분석하면 아무 구간도 분석하지 않음
+        del calls[:]
+        run = _run(incremental, content)
+        assert run["unchanged"] and calls == []
+
+
+def test_edit_in_large_file_reanalyzes_one_block():
+    """큰 원고에서 문단 하나를 고치면 segment_size 글자 정도만 다시 분석"""
+    analyzer = ContentAnalyzer()
+    calls = []
+    with tempfile.TemporaryDirectory() as database_path:
+        incremental = _make(analyzer, database_path, calls)
+        paragraphs = PARAGRAPHS * 20
+        _run(incremental, ''.join(paragraphs))
+        # 문단 하나를 고치고, 다른 문단을 고치고, 처음 고친 문단을 되돌림
+        for index, text in ((100, "정하늘은 새로 온 기사였다.\n"), (500, "정하늘은 성을 지켰다.\n"),
+                            (100, PARAGRAPHS[100 % len(PARAGRAPHS)])):
+            del calls[:]
+            paragraphs[index] = text
+            run = _run(incremental, ''.join(paragraphs))
+            assert sum(map(len, calls)) < SEGMENT_SIZE + max(map(len, paragraphs))
+            assert run["stats"]["reanalyzed_paragraphs"] < len(paragraphs) // 50
+
+
+def test_removed_names():
+    """수정으로 원고에서 사라진 인물 이름을 removed로 알려 줌"""
+    analyzer = ContentAnalyzer()
+    with tempfile.TemporaryDirectory() as database_path:
+        incremental = _make(analyzer, database_path, [])
+        previous = _run(incremental, ''.join(PARAGRAPHS))["content_analysis"]
+        content = ''.join(paragraph for paragraph in PARAGRAPHS if "최지우" not in paragraph)
+        run = _run(incremental, content)
+        assert run["content_analysis"] == analyzer.analyze_content(content, KNOWN_NAMES)
+        current_names = {character["name"] for character in run["content_analysis"]["characters"]}
+        expected = [character["name"] for character in previous["characters"]
+                    if character["name"] not in current_names]
+        assert expected and run["removed"]["characters"] == expected
+        assert all(name not in content for name in expected)
+
+
+def test_merge_story_structure_from_longest_segment():
+    """story_structure는 필드마다 값이 있는 가장 긴 구간의 것을 씀"""
+    merged = merge_analyses([
+        (0, 100, {"story_structure": {"conflict": "짧은 갈등", "pacing": "빠름"}}),
+        (100, 1100, {"story_structure": {"conflict": "긴 갈등", "resolution": "", "pacing": "느림"}}),
+        (1100, 1200, {"story_structure": {"resolution": "해결"}}),
+    ])
+    assert merged["story_structure"] == {"conflict": "긴 갈등", "pacing": "느림", "resolution": "해결"}
+
+
+if __name__ == "__main__":
+    test_first_analysis_is_split_into_blocks()
+    test_edit_matches_whole_analysis_and_reuses_segments()
+    test_edit_in_large_file_reanalyzes_one_block()
+    test_removed_names()
+    test_merge_story_structure_from_longest_segment()
+    print("✅ 증분 분석 테스트 통과")
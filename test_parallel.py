@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+병렬 분석(analyze_parallel) 테스트
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Agent.utils import ContentAnalyzer
+
+SHARD_SIZE = 4096
+
+CONTENT = ''.join(
+    f"김철수는 왕국의 기사였다. 이영희는 김철수의 동료였다! 박민수는 {index}번째 마을에서 기다렸다?\n"
+    f"최지우는 탑의 주인이었다. 그들은 함께 마법의 탑으로 향했다.\n"
+    for index in range(600)
+)
+
+
+def _characters(result):
+    return {character["name"]: (character["mention_count"], character["first_mention"])
+            for character in result["characters"]}
+
+
+def test_long_string_is_split_into_shards():
+    """문자열 하나도 shard_size 크기의 구간 여러 개로 나뉨"""
+    analyzer = ContentAnalyzer()
+    bases, shards = analyzer.split_shards(CONTENT, SHARD_SIZE)
+    assert ''.join(shards) == CONTENT
+    assert len(shards) == len(CONTENT) // SHARD_SIZE or len(shards) == len(CONTENT) // SHARD_SIZE + 1
+    assert all(SHARD_SIZE <= len(shard) < SHARD_SIZE + 100 for shard in shards[:-1])
+    assert bases == [len(''.join(shards[:index])) for index in range(len(shards))]
+
+
+def test_parallel_matches_whole_analysis():
+    """병렬 분석 결과의 인물 이름, 등장 횟수, 첫 등장 위치가 전체 분석과 같음"""
+    analyzer = ContentAnalyzer()
+    whole = analyzer.analyze_content(CONTENT)
+    assert _characters(analyzer.analyze_parallel(CONTENT, max_workers=2, shard_size=SHARD_SIZE)) == _characters(whole)
+    assert _characters(analyzer.analyze_parallel(CONTENT, max_workers=1, shard_size=SHARD_SIZE)) == _characters(whole)
+
+
+if __name__ == "__main__":
+    test_long_string_is_split_into_shards()
+    test_parallel_matches_whole_analysis()
+    print("✅ 병렬 분석 테스트 통과")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+저장소 일괄 저장(save_many) 테스트
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Agent.utils import DatabaseManager
+import Agent.storage as storage
+
+
+def _entity_files(category_dir: Path):
+    return sorted(path.name for path in category_dir.iterdir())
+
+
+def test_save_many_rolls_back_on_failure():
+    """묶음 중간에 rename이 실패하면 기존 레코드가 그대로 남고 임시/백업 파일도 남지 않음"""
+    with tempfile.TemporaryDirectory() as database_path:
+        db = DatabaseManager(database_path, backend="json", cache=None)
+        db.save_many("테스트소설", "characters", [
+            {"name": "김철수", "role": "주인공"},
+            {"name": "이영희", "role": "조연"},
+        ])
+        category_dir = Path(database_path) / "테스트소설" / "characters"
+        files_before = _entity_files(category_dir)
+        head_before = db.revision_marker("테스트소설")
+
+        real_replace = os.replace
+        calls = []
+
+        def failing_replace(src, dst):
+            # 첫 레코드는 백업/교체까지 끝낸 뒤 두 번째 레코드를 제자리로 옮기다가 실패
+            calls.append((src, dst))
+            if str(src).endswith(".tmp") and len([c for c in calls if str(c[0]).endswith(".tmp")]) == 2:
+                raise OSError("디스크 오류 흉내")
+            return real_replace(src, dst)
+
+        with mock.patch.object(storage.os, "replace", side_effect=failing_replace):
+            try:
+                db.save_many("테스트소설", "characters", [
+                    {"name": "김철수", "role": "악역"},
+                    {"name": "이영희", "role": "악역"},
+                    {"name": "박민수", "role": "조연"},
+                ])
+            except OSError:
+                pass
+            else:
+                raise AssertionError("save_many가 실패를 전달하지 않음")
+
+        records = {record["name"]: record["role"] for record in db.get_characters("테스트소설")}
+        assert records == {"김철수": "주인공", "이영희": "조연"}
+        assert _entity_files(category_dir) == files_before
+        assert db.revision_marker("테스트소설") == head_before
+
+        # 실패 후에도 같은 묶음을 다시 저장할 수 있음
+        db.save_many("테스트소설", "characters", [{"name": "김철수", "role": "악역"}])
+        records = {record["name"]: record["role"] for record in db.get_characters("테스트소설")}
+        assert records == {"김철수": "악역", "이영희": "조연"}
+
+
+if __name__ == "__main__":
+    test_save_many_rolls_back_on_failure()
+    print("✅ 저장소 테스트 통과")